@@ -9,7 +9,10 @@ import sys
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
 from app.database import Base
-from app.models import User, Category, Expense
+from app.models import (
+    User, Category, Expense, DeletedRecord, FxRate, Budget, MonthlySpend, BudgetAlert,
+    RecurringExpense, CategoryTerm, CategoryClosure, Tag, ExpenseTag
+)
 from app.config import get_settings
 
 # this is the Alembic Config object, which provides
@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Literal, Optional
 
 
 class Settings(BaseSettings):
@@ -10,12 +11,77 @@ class Settings(BaseSettings):
     
     # Database
     database_url: str
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    
+    # Expense amount storage: "numeric" reads Expense.amount, "cents" reads the
+    # BIGINT amount_cents column, "dual" prefers amount_cents and falls back to
+    # amount for rows written before the column existed. Both are always written.
+    amount_storage: Literal["numeric", "dual", "cents"] = "numeric"
+    
+    # FX rates are cached in memory and reloaded from fx_rates after this long.
+    fx_cache_ttl_seconds: int = 3600
+    
+    # Number of users whose expense columns the stats endpoints keep in memory.
+    analytics_cache_users: int = 32
+    
+    # Number of users whose auto-categorization model is kept in memory.
+    categorizer_cache_users: int = 256
+    
+    # Number of users whose category usage statistics are kept in memory.
+    category_stats_cache_users: int = 256
+    
+    # Recurring expenses: rules materialized per scheduler transaction, and how
+    # far back a new rule's anchor date may lie (its past occurrences are created).
+    recurring_batch_size: int = 5000
+    recurring_max_backfill_days: int = 366
+    
+    # Cold storage: scripts.archive_expenses moves the expenses of years that
+    # ended more than archive_after_years ago into one Parquet file per user and
+    # year under archive_dir. Parsed file footers (daily totals) are cached.
+    archive_dir: str = "archive"
+    archive_after_years: int = 2
+    archive_footer_cache_files: int = 1024
+    
+    # Columnar exports: rows fetched from the database cursor, and encoded and
+    # sent, per record batch.
+    export_batch_size: int = 10000
+    
+    # Live reports: "memory" delivers committed changes to the streams of the
+    # same process, "postgres" relays them between workers with LISTEN/NOTIFY.
+    # Idle streams get a keep-alive comment every live_keepalive_seconds.
+    live_updates_backend: Literal["memory", "postgres"] = "memory"
+    live_keepalive_seconds: float = 15.0
+    
+    # Platform analytics (POST /admin/analytics/jobs, scripts.platform_report) run
+    # per range of platform_shard_users user ids on platform_workers processes,
+    # each pausing platform_pause_seconds after a shard. Workers connect to
+    # analytics_database_url (e.g. a read replica) when it is set. Jobs started
+    # through the API keep their checkpoints and reports under platform_jobs_dir.
+    platform_shard_users: int = 2000
+    platform_workers: int = 2
+    platform_pause_seconds: float = 0.0
+    analytics_database_url: Optional[str] = None
+    platform_jobs_dir: str = "platform_jobs"
     
     # Security
     secret_key: str
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
     
+    # Delta sync: tokens are rewound by this much so rows from transactions
+    # still in flight when a sync page is built are picked up next time.
+    sync_overlap_seconds: int = 5
+    
+    # Batch endpoint
+    batch_max_requests: int = 20
+    
+    # Group commit: coalesce concurrent expense inserts into one transaction,
+    # waiting at most group_commit_max_delay_ms for up to group_commit_max_batch items.
+    expense_group_commit: bool = False
+    group_commit_max_delay_ms: float = 2.0
+    group_commit_max_batch: int = 100
+    
     class Config:
         env_file = ".env"
         case_sensitive = False
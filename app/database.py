@@ -1,3 +1,4 @@
+from fastapi import Request
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from app.config import get_settings
@@ -7,8 +8,8 @@ settings = get_settings()
 engine = create_engine(
     settings.database_url,
     pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
     echo=settings.debug
 )
 
@@ -17,11 +18,19 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
-def get_db():
+def get_db(request: Request):
     """
     Dependency that provides a database session.
     Ensures session is properly closed after use.
+    
+    Sub-requests dispatched by the batch endpoint reuse the session the
+    batch placed in request.state instead of opening their own.
     """
+    shared = getattr(request.state, "db", None)
+    if shared is not None:
+        yield shared
+        return
+    
     db = SessionLocal()
     try:
         yield db
@@ -1,23 +1,34 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, Request, Response, status
+from fastapi.exceptions import RequestValidationError
 from fastapi.security import OAuth2PasswordBearer
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
 from jose import JWTError
+from datetime import date, datetime
+from decimal import Decimal
+from typing import List, Optional
 from app.database import get_db
 from app.models import User
-from app.utils import decode_access_token, UnauthorizedException
-from app.services import AuthService
+from app.schemas import ExpenseFilter, ExpenseSort, TagMode
+from app.utils import decode_access_token, parse_tags, UnauthorizedException, ForbiddenException, NotModifiedException
+from app.services import AuthService, DataVersionService, FxService
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 
 def get_current_user(
+    request: Request,
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db)
 ) -> User:
     """
     Dependency to extract and validate the current authenticated user from JWT token.
     
+    Sub-requests dispatched by the batch endpoint carry the user the batch
+    already authenticated in request.state and skip the lookup.
+    
     Args:
+        request: Incoming request
         token: JWT token from Authorization header
         db: Database session
         
@@ -27,6 +38,10 @@ def get_current_user(
     Raises:
         UnauthorizedException: If token is invalid or user not found
     """
+    resolved = getattr(request.state, "user", None)
+    if resolved is not None:
+        return resolved
+    
     payload = decode_access_token(token)
     
     if payload is None:
@@ -46,3 +61,110 @@ def get_current_user(
         raise UnauthorizedException(detail="User not found")
     
     return user
+
+
+def get_current_admin(current_user: User = Depends(get_current_user)) -> User:
+    """
+    Dependency restricting an endpoint to administrators.
+    
+    Args:
+        current_user: Authenticated user
+        
+    Returns:
+        The authenticated user, who is an administrator
+        
+    Raises:
+        ForbiddenException: If the user is not an administrator
+    """
+    if not current_user.is_admin:
+        raise ForbiddenException(detail="Administrator access required")
+    return current_user
+
+
+def check_etag(
+    request: Request,
+    response: Response,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+) -> str:
+    """
+    Dependency implementing conditional GET for user-scoped resources.
+    
+    The ETag is derived from the user's data version, the version of the
+    (cached) FX rate table and the request's path and query, so it is known
+    as soon as the user has been authenticated. A matching If-None-Match is
+    answered with 304 before the endpoint runs any query of its own.
+    
+    Args:
+        request: Incoming request
+        response: Response whose ETag header is set
+        current_user: Authenticated user
+        db: Database session, used when the FX rate table has to be reloaded
+        
+    Returns:
+        ETag of the current representation
+        
+    Raises:
+        NotModifiedException: If the client's cached copy is still current
+    """
+    query = "&".join(f"{key}={value}" for key, value in sorted(request.query_params.multi_items()))
+    etag = DataVersionService.make_etag(
+        current_user.id, current_user.data_version, f"{request.url.path}?{query}",
+        FxService.rate_table(db).version
+    )
+    
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        candidates = {tag.strip() for tag in if_none_match.split(",")}
+        if etag in candidates or "*" in candidates:
+            raise NotModifiedException(etag)
+    
+    response.headers["ETag"] = etag
+    return etag
+
+
+def get_expense_filter(
+    from_date: Optional[date] = Query(None, description="Filter expenses from this date"),
+    to_date: Optional[date] = Query(None, description="Filter expenses up to this date"),
+    category_id: Optional[List[int]] = Query(None, description="Filter by category ID; repeat for several"),
+    min_amount: Optional[Decimal] = Query(None, ge=0, description="Smallest amount"),
+    max_amount: Optional[Decimal] = Query(None, ge=0, description="Largest amount"),
+    description_prefix: Optional[str] = Query(
+        None, min_length=1, max_length=100, description="Case-insensitive description prefix"
+    ),
+    created_from: Optional[datetime] = Query(None, description="Created at or after"),
+    created_to: Optional[datetime] = Query(None, description="Created at or before"),
+    updated_from: Optional[datetime] = Query(None, description="Updated at or after"),
+    updated_to: Optional[datetime] = Query(None, description="Updated at or before"),
+    tags: Optional[str] = Query(None, description="Comma-separated tags, e.g. trip-2026,reimbursable"),
+    mode: TagMode = Query("any", description="Match expenses with any or all of the tags"),
+    sort: ExpenseSort = Query("-date", description="date, amount or updated_at; prefix with - for descending")
+) -> ExpenseFilter:
+    """
+    Dependency collecting the expense list filters from the query string.
+    
+    Returns:
+        ExpenseFilter for ExpenseService
+        
+    Raises:
+        RequestValidationError: If a filter value is invalid
+        BadRequestException: If the tags parameter is malformed
+    """
+    try:
+        return ExpenseFilter(
+            from_date=from_date,
+            to_date=to_date,
+            category_ids=category_id or [],
+            min_amount=min_amount,
+            max_amount=max_amount,
+            description_prefix=description_prefix,
+            created_from=created_from,
+            created_to=created_to,
+            updated_from=updated_from,
+            updated_to=updated_to,
+            tags=list(parse_tags(tags)),
+            tag_mode=mode,
+            sort=sort
+        )
+    except ValidationError as error:
+        raise RequestValidationError(error.errors(include_url=False))
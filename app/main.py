@@ -1,16 +1,35 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.routers import auth_router, categories_router, expenses_router, reports_router
+from app.routers import (
+    auth_router, categories_router, expenses_router, reports_router, sync_router, batch_router,
+    budgets_router, recurring_router, tags_router, admin_router
+)
+from app.services import LiveService, shutdown_group_committer
 from app.config import get_settings
 
 settings = get_settings()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Listen for other workers' live report updates, and flush pending
+    group-committed writes before the process exits.
+    """
+    LiveService.start()
+    yield
+    LiveService.stop()
+    shutdown_group_committer()
+
+
 app = FastAPI(
     title=settings.app_name,
     description="A professional REST API for tracking personal expenses with authentication, categories, and reporting features.",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # CORS middleware configuration
@@ -27,6 +46,12 @@ app.include_router(auth_router)
 app.include_router(categories_router)
 app.include_router(expenses_router)
 app.include_router(reports_router)
+app.include_router(sync_router)
+app.include_router(batch_router)
+app.include_router(budgets_router)
+app.include_router(recurring_router)
+app.include_router(tags_router)
+app.include_router(admin_router)
 
 
 @app.get("/", tags=["Health Check"])
@@ -1,5 +1,17 @@
 from app.models.user import User
 from app.models.category import Category
+from app.models.category_closure import CategoryClosure
 from app.models.expense import Expense
+from app.models.deleted_record import DeletedRecord
+from app.models.fx_rate import FxRate
+from app.models.budget import Budget
+from app.models.monthly_spend import MonthlySpend
+from app.models.budget_alert import BudgetAlert
+from app.models.recurring_expense import RecurringExpense
+from app.models.category_term import CategoryTerm
+from app.models.tag import Tag, ExpenseTag
 
-__all__ = ["User", "Category", "Expense"]
+__all__ = [
+    "User", "Category", "Expense", "DeletedRecord", "FxRate", "Budget", "MonthlySpend", "BudgetAlert",
+    "RecurringExpense", "CategoryTerm", "CategoryClosure", "Tag", "ExpenseTag"
+]
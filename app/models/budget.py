@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Numeric
+from sqlalchemy.orm import relationship
+from datetime import datetime
+from app.database import Base
+
+
+class Budget(Base):
+    """
+    Monthly spending limit of a user, in the user's base currency.
+    A budget with a category covers that category; one without covers all spending.
+    """
+    __tablename__ = "budgets"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    category_id = Column(Integer, ForeignKey("categories.id", ondelete="CASCADE"), nullable=True)
+    amount = Column(Numeric(10, 2), nullable=False)
+    # Percentage of the amount at which an alert is raised (in addition to 100%).
+    alert_percent = Column(Integer, default=80, server_default="80", nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    
+    # Relationships
+    category = relationship("Category")
+    
+    def __repr__(self):
+        return f"<Budget(id={self.id}, category_id={self.category_id}, amount={self.amount}, user_id={self.user_id})>"
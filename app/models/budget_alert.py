@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, Date, DateTime, ForeignKey, Numeric, UniqueConstraint
+from datetime import datetime
+from app.database import Base
+
+
+class BudgetAlert(Base):
+    """
+    Record of a budget crossing one of its thresholds in a month.
+    Raised by the expense write that crossed it; at most once per threshold and month.
+    """
+    __tablename__ = "budget_alerts"
+    __table_args__ = (
+        UniqueConstraint("budget_id", "month", "threshold_percent", name="uq_budget_alerts_budget_month_threshold"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    budget_id = Column(Integer, ForeignKey("budgets.id", ondelete="CASCADE"), nullable=False)
+    month = Column(Date, nullable=False)
+    threshold_percent = Column(Integer, nullable=False)
+    spent = Column(Numeric(14, 2), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    def __repr__(self):
+        return f"<BudgetAlert(budget_id={self.budget_id}, month={self.month}, threshold_percent={self.threshold_percent})>"
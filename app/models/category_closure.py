@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, ForeignKey, Index
+from app.database import Base
+
+
+class CategoryClosure(Base):
+    """
+    Closure table of the category tree: one row per (ancestor, descendant)
+    pair, including each category paired with itself at depth 0. A subtree
+    is then a single indexed lookup instead of a recursive walk.
+    """
+    __tablename__ = "category_closure"
+    __table_args__ = (
+        Index("ix_category_closure_descendant_id", "descendant_id"),
+    )
+    
+    ancestor_id = Column(Integer, ForeignKey("categories.id", ondelete="CASCADE"), primary_key=True)
+    descendant_id = Column(Integer, ForeignKey("categories.id", ondelete="CASCADE"), primary_key=True)
+    depth = Column(Integer, nullable=False)
+    
+    def __repr__(self):
+        return f"<CategoryClosure(ancestor_id={self.ancestor_id}, descendant_id={self.descendant_id}, depth={self.depth})>"
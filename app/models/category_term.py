@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, String, ForeignKey
+from app.database import Base
+
+
+class CategoryTerm(Base):
+    """
+    How often a description term occurs in a user's expenses of a category.
+    These counts are the auto-categorization model's persisted state and are
+    updated incrementally by expense writes. The row with an empty term holds
+    the category's number of expenses.
+    """
+    __tablename__ = "category_terms"
+    
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    category_id = Column(Integer, ForeignKey("categories.id", ondelete="CASCADE"), primary_key=True)
+    term = Column(String(64), primary_key=True)
+    occurrences = Column(Integer, default=0, server_default="0", nullable=False)
+    
+    def __repr__(self):
+        return f"<CategoryTerm(user_id={self.user_id}, category_id={self.category_id}, term={self.term!r}, occurrences={self.occurrences})>"
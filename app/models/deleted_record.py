@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
+from datetime import datetime
+from app.database import Base
+
+
+class DeletedRecord(Base):
+    """
+    Tombstone left behind when an expense or category is deleted.
+    Lets delta sync tell offline clients which records to drop.
+    """
+    __tablename__ = "deleted_records"
+    __table_args__ = (
+        Index("ix_deleted_records_user_id_deleted_at", "user_id", "deleted_at"),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    entity_type = Column(String(20), nullable=False)
+    entity_id = Column(Integer, nullable=False)
+    deleted_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    def __repr__(self):
+        return f"<DeletedRecord(entity_type={self.entity_type}, entity_id={self.entity_id}, user_id={self.user_id})>"
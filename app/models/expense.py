@@ -1,29 +1,70 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Numeric, Date
-from sqlalchemy.orm import relationship
+from sqlalchemy import BigInteger, Column, Integer, String, DateTime, ForeignKey, Index, Numeric, Date, UniqueConstraint
+from sqlalchemy.orm import relationship, validates
 from datetime import datetime
 from app.database import Base
+from app.utils.money import to_cents
+from app.utils.fingerprint import expense_fingerprint
 
 
 class Expense(Base):
     """
     Expense model representing a financial transaction.
     Each expense belongs to a user and is associated with a category.
-    Uses NUMERIC for precise decimal arithmetic (not float).
+    Uses NUMERIC for precise decimal arithmetic (not float), mirrored as
+    integer minor units in amount_cents for fast aggregation.
+    fingerprint hashes amount, currency, date and normalized description so
+    probable duplicates are found with one probe of a (user_id, fingerprint) index.
+    Tags are linked through expense_tags.
     """
     __tablename__ = "expenses"
+    __table_args__ = (
+        Index("ix_expenses_user_id_updated_at", "user_id", "updated_at"),
+        # Expense list filters and sort orders (see ExpenseFilterService).
+        Index("ix_expenses_user_id_date", "user_id", "date"),
+        Index("ix_expenses_user_id_category_id_date", "user_id", "category_id", "date"),
+        Index("ix_expenses_user_id_amount_cents", "user_id", "amount_cents"),
+        # One expense per occurrence of a recurring rule; keeps the scheduler idempotent.
+        UniqueConstraint("recurring_id", "date", name="uq_expenses_recurring_id_date"),
+        Index("ix_expenses_user_id_fingerprint", "user_id", "fingerprint"),
+        # Retried creates carrying the same Idempotency-Key resolve to the first expense.
+        UniqueConstraint("user_id", "idempotency_key", name="uq_expenses_user_id_idempotency_key"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     amount = Column(Numeric(10, 2), nullable=False)
+    amount_cents = Column(BigInteger, nullable=True)
+    currency = Column(String(3), default="USD", server_default="USD", nullable=False)
     date = Column(Date, nullable=False, index=True)
     description = Column(String(500), nullable=False)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     category_id = Column(Integer, ForeignKey("categories.id", ondelete="CASCADE"), nullable=False)
+    recurring_id = Column(Integer, ForeignKey("recurring_expenses.id", ondelete="SET NULL"), nullable=True)
+    fingerprint = Column(BigInteger, nullable=True)
+    idempotency_key = Column(String(255), nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     
     # Relationships
     user = relationship("User", back_populates="expenses")
     category = relationship("Category", back_populates="expenses")
+    tags = relationship("Tag", secondary="expense_tags", order_by="Tag.name", passive_deletes=True)
+    
+    @validates("amount", "currency", "date", "description")
+    def _sync_derived_columns(self, key, value):
+        """Keep amount_cents and fingerprint in step with the columns they derive from."""
+        if key == "amount":
+            self.amount_cents = to_cents(value)
+        
+        fields = {
+            "currency": self.currency,
+            "date": self.date,
+            "description": self.description,
+            key: value
+        }
+        self.fingerprint = expense_fingerprint(
+            self.amount_cents, fields["currency"], fields["date"], fields["description"]
+        )
+        return value
     
     def __repr__(self):
         return f"<Expense(id={self.id}, amount={self.amount}, date={self.date}, user_id={self.user_id})>"
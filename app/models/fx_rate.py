@@ -0,0 +1,19 @@
+from sqlalchemy import Column, String, Date, Numeric
+from app.database import Base
+
+
+class FxRate(Base):
+    """
+    Exchange rate of a currency on a given day.
+    Rates are quoted as units of the currency per one unit of a common pivot
+    currency, so any pair converts as amount * rate[to] / rate[from].
+    Loaded from files by scripts.load_fx_rates.
+    """
+    __tablename__ = "fx_rates"
+    
+    currency = Column(String(3), primary_key=True)
+    rate_date = Column(Date, primary_key=True)
+    rate = Column(Numeric(18, 8), nullable=False)
+    
+    def __repr__(self):
+        return f"<FxRate(currency={self.currency}, rate_date={self.rate_date}, rate={self.rate})>"
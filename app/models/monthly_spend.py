@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, Date, ForeignKey, Numeric
+from app.database import Base
+
+
+class MonthlySpend(Base):
+    """
+    Running spend of a user per category and month, in the user's base currency.
+    Maintained incrementally by expense writes so budget status never has to
+    aggregate raw expenses.
+    """
+    __tablename__ = "monthly_spend"
+    
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    category_id = Column(Integer, ForeignKey("categories.id", ondelete="CASCADE"), primary_key=True)
+    # First day of the month.
+    month = Column(Date, primary_key=True)
+    total = Column(Numeric(14, 2), default=0, server_default="0", nullable=False)
+    expense_count = Column(Integer, default=0, server_default="0", nullable=False)
+    
+    def __repr__(self):
+        return f"<MonthlySpend(user_id={self.user_id}, category_id={self.category_id}, month={self.month}, total={self.total})>"
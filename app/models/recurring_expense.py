@@ -0,0 +1,59 @@
+from sqlalchemy import BigInteger, Column, Integer, String, DateTime, ForeignKey, Numeric, Date
+from sqlalchemy.orm import relationship, validates
+from datetime import date, datetime, timedelta
+from app.database import Base
+from app.utils.money import to_cents
+
+EPOCH = date(1970, 1, 1)
+
+
+class RecurringExpense(Base):
+    """
+    Rule that repeats an expense every `interval` days, weeks, months or years
+    starting from anchor_date. The scheduler materializes due occurrences as
+    Expense rows and advances materialized_through.
+    
+    The anchor is also stored as integers (day number, month number and day of
+    month) so the scheduler can match occurrences in portable SQL.
+    """
+    __tablename__ = "recurring_expenses"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    category_id = Column(Integer, ForeignKey("categories.id", ondelete="CASCADE"), nullable=False)
+    amount = Column(Numeric(10, 2), nullable=False)
+    amount_cents = Column(BigInteger, nullable=False)
+    currency = Column(String(3), default="USD", server_default="USD", nullable=False)
+    description = Column(String(500), nullable=False)
+    frequency = Column(String(10), nullable=False)
+    interval = Column(Integer, default=1, server_default="1", nullable=False)
+    anchor_date = Column(Date, nullable=False)
+    end_date = Column(Date, nullable=True)
+    # Last date whose occurrences have been materialized (anchor_date - 1 for a new rule).
+    materialized_through = Column(Date, nullable=False)
+    anchor_epoch_day = Column(Integer, nullable=False)
+    anchor_month = Column(Integer, nullable=False)
+    anchor_day = Column(Integer, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    
+    # Relationships
+    category = relationship("Category")
+    
+    @validates("amount")
+    def _sync_amount_cents(self, key, value):
+        """Keep amount_cents in step with every assignment to amount."""
+        self.amount_cents = to_cents(value)
+        return value
+    
+    @validates("anchor_date")
+    def _sync_anchor(self, key, value):
+        """Derive the integer anchor columns and reset the materialization cursor."""
+        self.anchor_epoch_day = (value - EPOCH).days
+        self.anchor_month = value.year * 12 + value.month - 1
+        self.anchor_day = value.day
+        self.materialized_through = value - timedelta(days=1)
+        return value
+    
+    def __repr__(self):
+        return f"<RecurringExpense(id={self.id}, frequency={self.frequency}, anchor_date={self.anchor_date}, user_id={self.user_id})>"
@@ -0,0 +1,40 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, UniqueConstraint
+from datetime import datetime
+from app.database import Base
+
+
+class Tag(Base):
+    """
+    Free-form label of a user's expenses (e.g. trip-2026, reimbursable).
+    Unlike categories, an expense can carry any number of tags.
+    """
+    __tablename__ = "tags"
+    __table_args__ = (
+        UniqueConstraint("user_id", "name", name="uq_tags_user_id_name"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    name = Column(String(50), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    def __repr__(self):
+        return f"<Tag(id={self.id}, name={self.name}, user_id={self.user_id})>"
+
+
+class ExpenseTag(Base):
+    """
+    Association of expenses and tags, doubling as an inverted index: the
+    primary key leads with tag_id, so the expenses carrying a tag are one
+    index range scan, already sorted by expense_id for set operations.
+    """
+    __tablename__ = "expense_tags"
+    __table_args__ = (
+        Index("ix_expense_tags_expense_id", "expense_id"),
+    )
+    
+    tag_id = Column(Integer, ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True)
+    expense_id = Column(Integer, ForeignKey("expenses.id", ondelete="CASCADE"), primary_key=True)
+    
+    def __repr__(self):
+        return f"<ExpenseTag(tag_id={self.tag_id}, expense_id={self.expense_id})>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy import Boolean, Column, Integer, String, DateTime, false
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
@@ -14,6 +14,12 @@ class User(Base):
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String(255), unique=True, index=True, nullable=False)
     hashed_password = Column(String(255), nullable=False)
+    # Currency reports are converted into.
+    base_currency = Column(String(3), default="USD", server_default="USD", nullable=False)
+    # Bumped on every write to the user's expenses or categories; drives ETags.
+    data_version = Column(Integer, default=0, server_default="0", nullable=False)
+    # Grants the /admin endpoints; set with scripts.set_admin.
+    is_admin = Column(Boolean, default=False, server_default=false(), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     
@@ -2,5 +2,15 @@ from app.routers.auth import router as auth_router
 from app.routers.categories import router as categories_router
 from app.routers.expenses import router as expenses_router
 from app.routers.reports import router as reports_router
+from app.routers.sync import router as sync_router
+from app.routers.batch import router as batch_router
+from app.routers.budgets import router as budgets_router
+from app.routers.recurring import router as recurring_router
+from app.routers.tags import router as tags_router
+from app.routers.admin import router as admin_router
 
-__all__ = ["auth_router", "categories_router", "expenses_router", "reports_router"]
+__all__ = [
+    "auth_router", "categories_router", "expenses_router", "reports_router",
+    "sync_router", "batch_router", "budgets_router", "recurring_router", "tags_router",
+    "admin_router"
+]
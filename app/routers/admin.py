@@ -0,0 +1,106 @@
+from fastapi import APIRouter, Depends, Path, Query, status
+from fastapi.responses import StreamingResponse
+from typing import Optional
+from datetime import date
+from app.database import SessionLocal
+from app.schemas import ExportFormat, PlatformJob, CurrencyCode, DEFAULT_CURRENCY
+from app.services import ExportService, PlatformAnalyticsService
+from app.services.export_service import EXPORT_MEDIA_TYPES, EXPORT_EXTENSIONS
+from app.dependencies import get_current_admin
+from app.models import User
+from app.utils import BadRequestException, NotFoundException
+
+router = APIRouter(prefix="/admin", tags=["Admin"])
+
+# Platform job ids are hex digests of the job parameters.
+JOB_ID_PATTERN = r"^[0-9a-f]{16}$"
+
+
+@router.get("/expenses/export", response_class=StreamingResponse)
+def export_all_expenses(
+    from_date: Optional[date] = Query(None, description="Export expenses from this date"),
+    to_date: Optional[date] = Query(None, description="Export expenses up to this date"),
+    export_format: ExportFormat = Query("arrow", alias="format", description="arrow (IPC stream) or parquet"),
+    current_user: User = Depends(get_current_admin)
+):
+    """
+    Export every user's expenses in a columnar format. Administrators only.
+    
+    Same columns and formats as `GET /expenses/export`; rows of all users
+    are streamed in batches of `EXPORT_BATCH_SIZE`, archived expenses first,
+    then the database rows ordered by user and date.
+    """
+    if from_date is not None and to_date is not None and from_date > to_date:
+        raise BadRequestException(detail="from_date must not be after to_date")
+    
+    def body():
+        with SessionLocal() as db:
+            batches = ExportService.iter_all_batches(db, from_date, to_date)
+            yield from ExportService.stream(batches, export_format)
+    
+    return StreamingResponse(body(), media_type=EXPORT_MEDIA_TYPES[export_format], headers={
+        "Content-Disposition": f'attachment; filename="expenses.{EXPORT_EXTENSIONS[export_format]}"'
+    })
+
+
+@router.post("/analytics/jobs", response_model=PlatformJob, status_code=status.HTTP_202_ACCEPTED)
+def start_platform_analytics(
+    from_date: Optional[date] = Query(None, description="Only expenses from this date"),
+    to_date: Optional[date] = Query(None, description="Only expenses up to this date"),
+    currency: CurrencyCode = Query(DEFAULT_CURRENCY, description="Currency all amounts are converted into"),
+    top: int = Query(10, ge=1, le=100, description="Number of top spenders"),
+    current_user: User = Depends(get_current_admin)
+):
+    """
+    Start computing spend across all users in the background. Administrators only.
+    
+    Totals per category name (case-insensitive), per signup month and the
+    top spenders, converted into `currency`. Users are aggregated in ranges
+    of `PLATFORM_SHARD_USERS` ids on `PLATFORM_WORKERS` worker processes,
+    each with its own connection to `ANALYTICS_DATABASE_URL` (or the main
+    database), and every finished range is checkpointed under
+    `PLATFORM_JOBS_DIR`.
+    
+    Returns the job at once; poll `GET /admin/analytics/jobs/{id}` for its
+    progress and report. The same parameters map to the same job, so
+    posting them again returns the running or finished job, or resumes an
+    interrupted or failed one from its checkpoint.
+    """
+    if from_date is not None and to_date is not None and from_date > to_date:
+        raise BadRequestException(detail="from_date must not be after to_date")
+    
+    return PlatformAnalyticsService.start_job(from_date, to_date, currency, top)
+
+
+@router.get("/analytics/jobs/{job_id}", response_model=PlatformJob)
+def get_platform_analytics(
+    job_id: str = Path(..., pattern=JOB_ID_PATTERN),
+    current_user: User = Depends(get_current_admin)
+):
+    """
+    Get a platform analytics job. Administrators only.
+    
+    `status` is `running` (with `completed_shards` of `total_shards`),
+    `done` (with the `report`), `failed` (with the `error`) or
+    `interrupted` when the process running it stopped; start it again to
+    resume.
+    """
+    job = PlatformAnalyticsService.get_job(job_id)
+    if job is None:
+        raise NotFoundException(detail="Platform job not found")
+    return job
+
+
+@router.delete("/analytics/jobs/{job_id}", status_code=status.HTTP_204_NO_CONTENT)
+def discard_platform_analytics(
+    job_id: str = Path(..., pattern=JOB_ID_PATTERN),
+    current_user: User = Depends(get_current_admin)
+):
+    """
+    Discard a platform analytics job. Administrators only.
+    
+    Deletes the job's report and checkpoint, so starting it again computes
+    the numbers afresh. A running job cannot be discarded.
+    """
+    if not PlatformAnalyticsService.discard_job(job_id):
+        raise NotFoundException(detail="Platform job not found")
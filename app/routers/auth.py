@@ -2,8 +2,10 @@ from fastapi import APIRouter, Depends, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from app.database import get_db
-from app.schemas import UserCreate, UserResponse, Token
+from app.schemas import UserCreate, UserUpdate, UserResponse, Token
 from app.services import AuthService
+from app.dependencies import get_current_user
+from app.models import User
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
@@ -15,6 +17,7 @@ def register(user_data: UserCreate, db: Session = Depends(get_db)):
     
     - **email**: Valid email address (must be unique)
     - **password**: Password for the account
+    - **base_currency**: Currency reports are converted into (default USD)
     
     Returns the created user information (without password).
     """
@@ -39,3 +42,27 @@ def login(
     access_token = AuthService.create_user_token(user)
     
     return Token(access_token=access_token, token_type="bearer")
+
+
+@router.get("/me", response_model=UserResponse)
+def get_me(current_user: User = Depends(get_current_user)):
+    """
+    Get the authenticated user's account information.
+    """
+    return current_user
+
+
+@router.patch("/me", response_model=UserResponse)
+def update_me(
+    user_data: UserUpdate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Update the authenticated user's settings.
+    
+    - **base_currency**: Currency reports are converted into; every currency
+      already used by the user's expenses must have FX rates to it
+    """
+    user = AuthService.update_user(db, current_user, user_data)
+    return user
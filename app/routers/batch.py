@@ -0,0 +1,39 @@
+from fastapi import APIRouter, Depends, Request
+from sqlalchemy.orm import Session
+from app.database import get_db
+from app.schemas import BatchRequest, BatchResponse
+from app.services import BatchService
+from app.dependencies import get_current_user
+from app.models import User
+from app.utils import BadRequestException
+from app.config import get_settings
+
+settings = get_settings()
+
+router = APIRouter(prefix="/batch", tags=["Batch"])
+
+
+@router.post("", response_model=BatchResponse)
+async def run_batch(
+    batch: BatchRequest,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Execute several API calls in a single round-trip.
+    
+    - **requests**: List of `{method, path, query, body}` sub-requests
+    
+    The caller is authenticated once for the whole batch. Writes run in
+    order; consecutive GET sub-requests run concurrently. Each sub-request
+    gets its own status, headers and body, in request order. A failing
+    sub-request does not stop the rest.
+    """
+    if len(batch.requests) > settings.batch_max_requests:
+        raise BadRequestException(
+            detail=f"A batch may contain at most {settings.batch_max_requests} requests"
+        )
+    
+    responses = await BatchService.execute(request, db, current_user, batch.requests)
+    return BatchResponse(responses=responses)
@@ -0,0 +1,121 @@
+from fastapi import APIRouter, Depends, status, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from datetime import datetime
+from app.database import get_db
+from app.schemas import BudgetCreate, BudgetUpdate, BudgetResponse, BudgetStatus, BudgetAlertResponse
+from app.services import BudgetService
+from app.dependencies import get_current_user, check_etag
+from app.models import User
+
+router = APIRouter(prefix="/budgets", tags=["Budgets"])
+
+
+@router.post("/", response_model=BudgetResponse, status_code=status.HTTP_201_CREATED)
+def create_budget(
+    budget_data: BudgetCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Create a monthly budget.
+    
+    - **category_id**: Category covered (omit for an overall budget)
+    - **amount**: Monthly limit in the user's base currency
+    - **alert_percent**: Share of the limit that raises an alert (default 80)
+    
+    A user can have one budget per category and one overall budget.
+    """
+    budget = BudgetService.create_budget(db, budget_data, current_user.id)
+    return budget
+
+
+@router.get("/", response_model=List[BudgetResponse])
+def get_budgets(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Retrieve all budgets for the authenticated user.
+    """
+    budgets = BudgetService.get_user_budgets(db, current_user.id)
+    return budgets
+
+
+@router.get("/status", response_model=List[BudgetStatus])
+def get_budget_status(
+    year: Optional[int] = Query(None, ge=2000, le=2100, description="Year (defaults to the current month)"),
+    month: Optional[int] = Query(None, ge=1, le=12, description="Month (defaults to the current month)"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    etag: str = Depends(check_etag)
+):
+    """
+    Get spent, remaining and projected month-end spend for every budget.
+    
+    Projections extrapolate the current month's pace; for past months they
+    equal the final spend. Supports conditional requests through ETag / If-None-Match.
+    """
+    today = datetime.utcnow().date()
+    statuses = BudgetService.get_status(db, current_user, year or today.year, month or today.month, today)
+    return statuses
+
+
+@router.get("/alerts", response_model=List[BudgetAlertResponse])
+def get_budget_alerts(
+    limit: int = Query(50, ge=1, le=500, description="Maximum number of alerts"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    etag: str = Depends(check_etag)
+):
+    """
+    Get the most recent budget threshold crossings, newest first.
+    
+    Alerts are raised by the expense write that crosses a budget's
+    alert_percent or 100% of its amount, once per month and threshold.
+    """
+    alerts = BudgetService.get_alerts(db, current_user.id, limit)
+    return alerts
+
+
+@router.get("/{budget_id}", response_model=BudgetResponse)
+def get_budget(
+    budget_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Retrieve a specific budget by ID.
+    
+    Returns 404 if budget doesn't exist.
+    Returns 403 if budget doesn't belong to the current user.
+    """
+    budget = BudgetService.get_budget_by_id(db, budget_id, current_user.id)
+    return budget
+
+
+@router.patch("/{budget_id}", response_model=BudgetResponse)
+def update_budget(
+    budget_id: int,
+    budget_data: BudgetUpdate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Update a budget's amount or alert threshold.
+    """
+    budget = BudgetService.update_budget(db, budget_id, budget_data, current_user.id)
+    return budget
+
+
+@router.delete("/{budget_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_budget(
+    budget_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Delete a budget and its alerts.
+    """
+    BudgetService.delete_budget(db, budget_id, current_user.id)
+    return None
@@ -1,11 +1,13 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, status, Query
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional, Union
 from app.database import get_db
-from app.schemas import CategoryCreate, CategoryResponse
+from app.schemas import CategoryCreate, CategoryUpdate, CategoryResponse, CategoryWithStats
 from app.services import CategoryService
-from app.dependencies import get_current_user
+from app.services.category_service import CATEGORY_ROW_FIELDS
+from app.dependencies import get_current_user, check_etag
 from app.models import User
+from app.utils import category_rows_adapter, category_stats_rows_adapter, parse_fields, render_json
 
 router = APIRouter(prefix="/categories", tags=["Categories"])
 
@@ -21,6 +23,7 @@ def create_category(
     
     - **name**: Category name (required)
     - **description**: Optional category description
+    - **parent_id**: Optional parent, making this a subcategory
     
     Each category is associated with the authenticated user.
     """
@@ -28,18 +31,31 @@ def create_category(
     return category
 
 
-@router.get("/", response_model=List[CategoryResponse])
+@router.get("/", response_model=Union[List[CategoryWithStats], List[CategoryResponse]])
 def get_categories(
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,name"),
+    with_stats: bool = Query(False, description="Include each category's expense count, total and last expense date"),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    etag: str = Depends(check_etag)
 ):
     """
     Retrieve all categories for the authenticated user.
     
+    - **fields**: Return only these fields (only they are loaded from the database)
+    - **with_stats**: Add expense_count, total_amount (in your base currency),
+      currency and last_expense_date to each category
+    
     Returns a list of all categories created by the current user.
+    Supports conditional requests through ETag / If-None-Match.
     """
-    categories = CategoryService.get_user_categories(db, current_user.id)
-    return categories
+    selected = parse_fields(fields, CATEGORY_ROW_FIELDS)
+    if with_stats:
+        rows = CategoryService.get_user_category_stats_rows(db, current_user, selected)
+        return render_json(category_stats_rows_adapter, rows, headers={"ETag": etag})
+    
+    rows = CategoryService.get_user_category_rows(db, current_user.id, selected)
+    return render_json(category_rows_adapter, rows, headers={"ETag": etag})
 
 
 @router.get("/{category_id}", response_model=CategoryResponse)
@@ -58,6 +74,24 @@ def get_category(
     return category
 
 
+@router.patch("/{category_id}", response_model=CategoryResponse)
+def update_category(
+    category_id: int,
+    category_data: CategoryUpdate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Update a category.
+    
+    Setting **parent_id** moves the category together with its subcategories;
+    `null` makes it top-level. A category cannot be moved below itself or one
+    of its own subcategories.
+    """
+    category = CategoryService.update_category(db, category_id, category_data, current_user.id)
+    return category
+
+
 @router.delete("/{category_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_category(
     category_id: int,
@@ -68,6 +102,7 @@ def delete_category(
     Delete a category.
     
     Warning: This will also delete all expenses associated with this category.
+    Its subcategories are kept and move up to its parent.
     """
     CategoryService.delete_category(db, category_id, current_user.id)
     return None
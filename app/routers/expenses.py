@@ -1,19 +1,33 @@
-from fastapi import APIRouter, Depends, status, Query
+from fastapi import APIRouter, Depends, Header, Request, status, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List, Optional
-from datetime import date
-from app.database import get_db
-from app.schemas import ExpenseCreate, ExpenseResponse
-from app.services import ExpenseService
-from app.dependencies import get_current_user
+from typing import List, Literal, Optional, Union
+from app.database import get_db, SessionLocal
+from app.schemas import (
+    ExpenseCreate, ExpenseCreated, ExpenseResponse, ExpenseWithCategory, DuplicatePolicy,
+    CategorySuggestionRequest, CategorySuggestion, ExpenseTags, ExpenseFilter, ExportFormat
+)
+from app.services import (
+    ExpenseService, CategorizerService, ExpenseFilterService, ExportService, get_group_committer
+)
+from app.services.expense_service import EXPENSE_ROW_FIELDS
+from app.services.export_service import EXPORT_MEDIA_TYPES, EXPORT_EXTENSIONS
+from app.dependencies import get_current_user, check_etag, get_expense_filter
 from app.models import User
+from app.utils import expense_rows_adapter, category_suggestions_adapter, parse_fields, render_json
+from app.config import get_settings
+
+settings = get_settings()
 
 router = APIRouter(prefix="/expenses", tags=["Expenses"])
 
 
-@router.post("/", response_model=ExpenseResponse, status_code=status.HTTP_201_CREATED)
+@router.post("/", response_model=ExpenseCreated, status_code=status.HTTP_201_CREATED)
 def create_expense(
+    request: Request,
     expense_data: ExpenseCreate,
+    on_duplicate: DuplicatePolicy = Query("flag", description="flag or reject probable duplicates"),
+    idempotency_key: Optional[str] = Header(None, max_length=255, description="Client key making retries safe"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -24,53 +38,174 @@ def create_expense(
     - **date**: Date of the expense
     - **description**: Expense description
     - **category_id**: ID of the category (must belong to current user)
+    - **tags**: Optional tag names; new ones are created
     
     The expense is automatically associated with the authenticated user.
+    
+    An expense with the same amount, currency, date and description (ignoring
+    case and spacing) as an existing one is a probable duplicate: it is created
+    with **duplicate_of** set, or refused with 409 when **on_duplicate** is
+    `reject`. Retrying with the same **Idempotency-Key** header returns the
+    expense created by the first attempt instead of a new one.
     """
-    expense = ExpenseService.create_expense(db, expense_data, current_user.id)
+    # Sub-requests of POST /batch write in the batch's shared session instead.
+    if settings.expense_group_commit and getattr(request.state, "db", None) is None:
+        # Hand the pooled connection back while waiting, otherwise queued
+        # requests can starve the committer of a connection.
+        user_id = current_user.id
+        db.close()
+        return get_group_committer().submit(expense_data, user_id, idempotency_key, on_duplicate)
+    
+    expense = ExpenseService.create_expense(
+        db, expense_data, current_user.id, idempotency_key, on_duplicate
+    )
     return expense
 
 
-@router.get("/", response_model=List[ExpenseResponse])
-def get_expenses(
-    from_date: Optional[date] = Query(None, description="Filter expenses from this date"),
-    to_date: Optional[date] = Query(None, description="Filter expenses up to this date"),
-    category_id: Optional[int] = Query(None, description="Filter by category ID"),
+@router.post("/suggest-category", response_model=List[CategorySuggestion])
+def suggest_category(
+    request: CategorySuggestionRequest,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
+):
+    """
+    Suggest a category for each of up to 1000 descriptions, e.g. for imported rows.
+    
+    Suggestions come from a model of the user's own categorized expenses,
+    updated by every expense write. A description without any word the
+    model has seen gets no suggestion.
+    """
+    suggestions = CategorizerService.suggest(db, current_user, request.descriptions)
+    return render_json(category_suggestions_adapter, suggestions)
+
+
+@router.get("/", response_model=List[Union[ExpenseWithCategory, ExpenseResponse]])
+def get_expenses(
+    expense_filter: ExpenseFilter = Depends(get_expense_filter),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,amount,date"),
+    include: Optional[Literal["category"]] = Query(None, description="Embed related data: category"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    etag: str = Depends(check_etag)
 ):
     """
     Retrieve expenses for the authenticated user.
     
-    Optional filters:
-    - **from_date**: Get expenses from this date onwards
-    - **to_date**: Get expenses up to this date
-    - **category_id**: Get expenses only from specific category
+    Optional filters (combined with AND):
+    - **from_date** / **to_date**: Date range
+    - **category_id**: Only these categories; repeat the parameter for several
+    - **min_amount** / **max_amount**: Amount range, in the expense's currency
+    - **description_prefix**: Description starts with this text (any case)
+    - **created_from** / **created_to**, **updated_from** / **updated_to**: Timestamp windows
+    - **tags**: Get expenses only with these tags; **mode** `any` (default)
+      matches expenses with at least one of them, `all` those with every one
+    - **sort**: `date`, `amount` or `updated_at`, prefixed with `-` for
+      descending (default `-date`, newest first)
+    - **fields**: Return only these fields (only they are loaded from the database)
+    - **include**: `category` adds `category_name`, joined in the same query
+    
+    Every filter maps onto an index. **description_prefix** and the created
+    window have none, so they are refused with 400 unless another filter
+    narrows the list first.
     
-    Results are ordered by date (newest first).
+    Supports conditional requests: send the returned ETag in If-None-Match
+    to get 304 Not Modified while nothing has changed.
     """
-    expenses = ExpenseService.get_user_expenses(
-        db, current_user.id, from_date, to_date, category_id
+    selected = parse_fields(fields, EXPENSE_ROW_FIELDS)
+    rows = ExpenseService.get_user_expense_rows(
+        db, current_user.id, expense_filter, selected,
+        include_category=include == "category"
     )
-    return expenses
+    return render_json(expense_rows_adapter, rows, headers={"ETag": etag})
+
+
+@router.get("/export", response_class=StreamingResponse)
+def export_expenses(
+    expense_filter: ExpenseFilter = Depends(get_expense_filter),
+    export_format: ExportFormat = Query("arrow", alias="format", description="arrow (IPC stream) or parquet"),
+    current_user: User = Depends(get_current_user),
+    etag: str = Depends(check_etag)
+):
+    """
+    Export expenses in a columnar format for analytics tools (e.g. pandas).
+    
+    Takes the filters of `GET /expenses`. **format** `arrow` returns an Arrow
+    IPC stream (`pyarrow.ipc.open_stream`), `parquet` a Parquet file with one
+    row group per batch. Columns: id, user_id, date, amount (decimal), currency,
+    description, category_id, created_at, updated_at.
+    
+    Rows are read and sent in batches of `EXPORT_BATCH_SIZE`, so exports of
+    any size use constant memory. Archived expenses come first.
+    Supports conditional requests through ETag / If-None-Match.
+    """
+    ExpenseFilterService.validate(expense_filter)
+    user_id = current_user.id
+    
+    # The request's session is closed before the body is sent, so the
+    # stream reads through a session of its own.
+    def body():
+        with SessionLocal() as db:
+            batches = ExportService.iter_user_batches(db, user_id, expense_filter)
+            yield from ExportService.stream(batches, export_format)
+    
+    return StreamingResponse(body(), media_type=EXPORT_MEDIA_TYPES[export_format], headers={
+        "ETag": etag,
+        "Content-Disposition": f'attachment; filename="expenses.{EXPORT_EXTENSIONS[export_format]}"'
+    })
 
 
-@router.get("/{expense_id}", response_model=ExpenseResponse)
+@router.get("/{expense_id}", response_model=Union[ExpenseWithCategory, ExpenseResponse])
 def get_expense(
     expense_id: int,
+    include: Optional[Literal["category"]] = Query(None, description="Embed related data: category"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Retrieve a specific expense by ID.
     
+    - **include**: `category` adds `category_name`, joined in the same query
+    
     Returns 404 if expense doesn't exist.
     Returns 403 if expense doesn't belong to the current user.
     """
+    if include == "category":
+        return ExpenseService.get_expense_with_category(db, expense_id, current_user.id)
+    
     expense = ExpenseService.get_expense_by_id(db, expense_id, current_user.id)
     return expense
 
 
+@router.get("/{expense_id}/tags", response_model=ExpenseTags)
+def get_expense_tags(
+    expense_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Retrieve the tags of an expense, in alphabetical order.
+    """
+    tags = ExpenseService.get_expense_tags(db, expense_id, current_user.id)
+    return ExpenseTags(tags=tags)
+
+
+@router.put("/{expense_id}/tags", response_model=ExpenseTags)
+def set_expense_tags(
+    expense_id: int,
+    expense_tags: ExpenseTags,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Replace the tags of an expense.
+    
+    Names are case-folded and tags that don't exist yet are created. An
+    empty list removes all tags from the expense.
+    """
+    tags = ExpenseService.set_expense_tags(db, expense_id, expense_tags.tags, current_user.id)
+    return ExpenseTags(tags=tags)
+
+
 @router.delete("/{expense_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_expense(
     expense_id: int,
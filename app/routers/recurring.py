@@ -0,0 +1,89 @@
+from fastapi import APIRouter, Depends, status
+from sqlalchemy.orm import Session
+from typing import List
+from app.database import get_db
+from app.schemas import RecurringExpenseCreate, RecurringExpenseUpdate, RecurringExpenseResponse
+from app.services import RecurringService
+from app.dependencies import get_current_user
+from app.models import User
+
+router = APIRouter(prefix="/recurring-expenses", tags=["Recurring Expenses"])
+
+
+@router.post("/", response_model=RecurringExpenseResponse, status_code=status.HTTP_201_CREATED)
+def create_recurring_expense(
+    recurring_data: RecurringExpenseCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Create a recurring expense.
+    
+    - **amount**, **description**, **category_id**, **currency**: Copied to every occurrence
+    - **frequency**: daily, weekly, monthly or yearly
+    - **interval**: Repeat every `interval` periods (default 1)
+    - **anchor_date**: First occurrence; monthly and yearly rules keep its day of month
+    - **end_date**: Optional last possible occurrence date
+    
+    Occurrences up to today are created immediately; later ones are created
+    by the scheduler (`python -m scripts.materialize_recurring`).
+    """
+    recurring = RecurringService.create_recurring(db, recurring_data, current_user.id)
+    return recurring
+
+
+@router.get("/", response_model=List[RecurringExpenseResponse])
+def get_recurring_expenses(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Retrieve all recurring expenses for the authenticated user.
+    """
+    recurring = RecurringService.get_user_recurring(db, current_user.id)
+    return recurring
+
+
+@router.get("/{recurring_id}", response_model=RecurringExpenseResponse)
+def get_recurring_expense(
+    recurring_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Retrieve a specific recurring expense by ID.
+    
+    Returns 404 if it doesn't exist.
+    Returns 403 if it doesn't belong to the current user.
+    """
+    recurring = RecurringService.get_recurring_by_id(db, recurring_id, current_user.id)
+    return recurring
+
+
+@router.patch("/{recurring_id}", response_model=RecurringExpenseResponse)
+def update_recurring_expense(
+    recurring_id: int,
+    recurring_data: RecurringExpenseUpdate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Update amount, description, category or end date of a recurring expense.
+    
+    Applies to occurrences created from now on.
+    """
+    recurring = RecurringService.update_recurring(db, recurring_id, recurring_data, current_user.id)
+    return recurring
+
+
+@router.delete("/{recurring_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_recurring_expense(
+    recurring_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Delete a recurring expense. Expenses it already created are kept.
+    """
+    RecurringService.delete_recurring(db, recurring_id, current_user.id)
+    return None
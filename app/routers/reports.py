@@ -1,33 +1,60 @@
 from fastapi import APIRouter, Depends, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
 from sqlalchemy.orm import Session
-from typing import List
-from app.database import get_db
-from app.schemas import MonthlyReport, CategorySummary
-from app.services import ReportService
-from app.dependencies import get_current_user
+from typing import List, Optional
+from datetime import date
+from app.database import get_db, SessionLocal
+from app.schemas import (
+    MonthlyReport, CategorySummary, SpendingStats, DailyAverage, CategorySharePeriod, DailySpend, TagMode
+)
+from app.services import ReportService, AnalyticsService, LiveService
+from app.config import get_settings
+from app.dependencies import get_current_user, check_etag
 from app.models import User
+from app.utils import BadRequestException, daily_spend_rows_adapter, parse_tags, stream_json_array
+
+settings = get_settings()
 
 router = APIRouter(prefix="/reports", tags=["Reports"])
 
 
+def _server_sent_event(name: str, data: BaseModel) -> str:
+    """Encode a model as one Server-Sent Event."""
+    return f"event: {name}\ndata: {data.model_dump_json()}\n\n"
+
+
 @router.get("/monthly", response_model=MonthlyReport)
 def get_monthly_report(
     year: int = Query(..., ge=2000, le=2100, description="Year for the report"),
     month: int = Query(..., ge=1, le=12, description="Month for the report (1-12)"),
+    category_id: Optional[int] = Query(None, description="Only count this category and its subcategories"),
+    tags: Optional[str] = Query(None, description="Only count expenses with these comma-separated tags"),
+    mode: TagMode = Query("any", description="Match expenses with any or all of the tags"),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    etag: str = Depends(check_etag)
 ):
     """
     Get monthly expense summary.
     
     - **year**: Year for the report
     - **month**: Month for the report (1-12)
+    - **category_id**: Restrict the summary to a category's subtree
+    - **tags**: Restrict the summary to expenses with any (or, with **mode**
+      `all`, every one) of these tags
     
     Returns aggregated expense data including:
-    - Total expenses for the month
+    - Total expenses for the month, converted to the user's base currency
     - Count of expense records
+    
+    Supports conditional requests through ETag / If-None-Match.
     """
-    report = ReportService.get_monthly_report(db, current_user.id, year, month)
+    report = ReportService.get_monthly_report(
+        db, current_user.id, year, month, current_user.base_currency, category_id,
+        parse_tags(tags), mode
+    )
     return report
 
 
@@ -35,16 +62,181 @@ def get_monthly_report(
 def get_monthly_by_category(
     year: int = Query(..., ge=2000, le=2100, description="Year for the report"),
     month: int = Query(..., ge=1, le=12, description="Month for the report (1-12)"),
+    rollup: bool = Query(False, description="Include subcategories in each category's totals"),
+    tags: Optional[str] = Query(None, description="Only count expenses with these comma-separated tags"),
+    mode: TagMode = Query("any", description="Match expenses with any or all of the tags"),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    etag: str = Depends(check_etag)
 ):
     """
     Get monthly expense breakdown by category.
     
     - **year**: Year for the report
     - **month**: Month for the report (1-12)
+    - **rollup**: Roll subcategory totals up into every ancestor category
+    - **tags**: Only count expenses with any (or, with **mode** `all`, every
+      one) of these tags
     
-    Returns expense totals grouped by category for the specified month.
+    Returns expense totals grouped by category for the specified month,
+    converted to the user's base currency.
+    Supports conditional requests through ETag / If-None-Match.
     """
-    report = ReportService.get_expenses_by_category(db, current_user.id, year, month)
+    report = ReportService.get_expenses_by_category(
+        db, current_user.id, year, month, current_user.base_currency, rollup,
+        parse_tags(tags), mode
+    )
     return report
+
+
+@router.get("/monthly/live")
+async def stream_monthly_report(
+    year: Optional[int] = Query(None, ge=2000, le=2100, description="Year of the month (defaults to the current month)"),
+    month: Optional[int] = Query(None, ge=1, le=12, description="Month (1-12)"),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Stream a month's totals as Server-Sent Events while expenses change.
+    
+    The first `snapshot` event holds the month's total and count, as
+    `GET /reports/monthly` returns them, with the categories of
+    `GET /reports/monthly/by-category` in `categories`. Each committed
+    change to the month then sends a `delta` event with the new total and
+    count, the categories that changed (new totals plus `amount_delta` and
+    `count_delta`) and `removed_category_ids`. A new `snapshot` replaces the
+    state whenever the stream could not follow the changes one by one.
+    Idle streams receive a keep-alive comment.
+    
+    Changes are pushed as they commit, so dashboards need not poll. Amounts
+    in other currencies are converted per expense, as for budgets.
+    """
+    if (year is None) != (month is None):
+        raise BadRequestException(detail="year and month must be given together")
+    if year is None:
+        today = date.today()
+        year, month = today.year, today.month
+    
+    user_id = current_user.id
+    
+    # The request's session is closed before the body is sent, so each
+    # snapshot reads through a session of its own.
+    def load():
+        with SessionLocal() as db:
+            return ReportService.get_live_month(db, user_id, year, month)
+    
+    async def body():
+        subscription = LiveService.subscribe(user_id)
+        try:
+            live = await run_in_threadpool(load)
+            yield _server_sent_event("snapshot", live.snapshot())
+            while True:
+                message = await subscription.get(settings.live_keepalive_seconds)
+                if message is None:
+                    yield ": keep-alive\n\n"
+                    continue
+                
+                delta = live.apply(message)
+                if live.stale:
+                    live = await run_in_threadpool(load)
+                    yield _server_sent_event("snapshot", live.snapshot())
+                elif delta is not None:
+                    yield _server_sent_event("delta", delta)
+        finally:
+            LiveService.unsubscribe(subscription)
+    
+    return StreamingResponse(
+        body(), media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/daily", response_model=List[DailySpend])
+def get_daily_spend(
+    from_date: date = Query(..., description="First day of the series"),
+    to_date: date = Query(..., description="Last day of the series"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    etag: str = Depends(check_etag)
+):
+    """
+    Get spend per day with a running cumulative total.
+    
+    Returns one entry per day of the range, including days without expenses,
+    converted to the user's base currency. The series is streamed as it is
+    read, so long ranges cost constant memory; the FX rates it needs are
+    checked before streaming starts, so a missing rate is still a 400.
+    Supports conditional requests through ETag / If-None-Match.
+    """
+    if to_date < from_date:
+        raise BadRequestException(detail="to_date must not be before from_date")
+    
+    user_id = current_user.id
+    base_currency = current_user.base_currency
+    # Missing FX rates are reported here, while the status can still be 400.
+    factors = ReportService.get_daily_spend_factors(db, user_id, from_date, to_date, base_currency)
+    
+    # The request's session is closed before the body is sent, so the
+    # stream reads through a session of its own.
+    def body():
+        with SessionLocal() as db:
+            rows = ReportService.iter_daily_spend(db, user_id, from_date, to_date, base_currency, factors)
+            yield from stream_json_array(daily_spend_rows_adapter, rows)
+    
+    return StreamingResponse(body(), media_type="application/json", headers={"ETag": etag})
+
+
+@router.get("/stats/summary", response_model=SpendingStats)
+def get_stats_summary(
+    from_date: Optional[date] = Query(None, description="Include expenses from this date"),
+    to_date: Optional[date] = Query(None, description="Include expenses up to this date"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    etag: str = Depends(check_etag)
+):
+    """
+    Get distribution statistics of expense amounts.
+    
+    Returns count, total, mean, minimum, maximum and percentiles (p25 to p99)
+    of individual expenses, in the user's base currency.
+    Supports conditional requests through ETag / If-None-Match.
+    """
+    stats = AnalyticsService.get_summary(db, current_user, from_date, to_date)
+    return stats
+
+
+@router.get("/stats/rolling-average", response_model=List[DailyAverage])
+def get_stats_rolling_average(
+    from_date: date = Query(..., description="First day of the series"),
+    to_date: date = Query(..., description="Last day of the series"),
+    window: int = Query(30, ge=1, le=365, description="Rolling window in days"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    etag: str = Depends(check_etag)
+):
+    """
+    Get daily spend with a trailing rolling average.
+    
+    - **window**: Number of days averaged, ending on each day (default 30)
+    
+    Returns one entry per day of the range, including days without expenses.
+    Supports conditional requests through ETag / If-None-Match.
+    """
+    series = AnalyticsService.get_rolling_average(db, current_user, from_date, to_date, window)
+    return series
+
+
+@router.get("/stats/category-share", response_model=List[CategorySharePeriod])
+def get_stats_category_share(
+    from_date: Optional[date] = Query(None, description="Include expenses from this date"),
+    to_date: Optional[date] = Query(None, description="Include expenses up to this date"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    etag: str = Depends(check_etag)
+):
+    """
+    Get each category's share of spend per month.
+    
+    Returns months with spending, oldest first, with per-category totals and
+    shares between 0 and 1. Supports conditional requests through ETag / If-None-Match.
+    """
+    periods = AnalyticsService.get_category_share(db, current_user, from_date, to_date)
+    return periods
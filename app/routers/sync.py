@@ -0,0 +1,30 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from typing import Optional
+from app.database import get_db
+from app.schemas import SyncResponse
+from app.services import SyncService
+from app.dependencies import get_current_user
+from app.models import User
+from app.utils import sync_payload_adapter, render_json
+
+router = APIRouter(prefix="/sync", tags=["Sync"])
+
+
+@router.get("", response_model=SyncResponse)
+def sync(
+    since: Optional[str] = Query(None, description="Token returned by the previous sync"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get everything that changed since the last sync.
+    
+    - **since**: `next_token` from the previous response; omit for a full snapshot
+    
+    Returns created or updated expenses and categories, the IDs of deleted
+    ones, and the token to pass on the next call. Pages may overlap slightly,
+    so apply them as upserts.
+    """
+    payload = SyncService.get_changes(db, current_user.id, since)
+    return render_json(sync_payload_adapter, payload)
@@ -0,0 +1,37 @@
+from fastapi import APIRouter, Depends, status
+from sqlalchemy.orm import Session
+from typing import List
+from app.database import get_db
+from app.schemas import TagResponse
+from app.services import TagService
+from app.dependencies import get_current_user
+from app.models import User
+
+router = APIRouter(prefix="/tags", tags=["Tags"])
+
+
+@router.get("/", response_model=List[TagResponse])
+def get_tags(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Retrieve all tags of the authenticated user, ordered by name.
+    
+    Tags are created by tagging an expense with a new name.
+    """
+    tags = TagService.get_user_tags(db, current_user.id)
+    return tags
+
+
+@router.delete("/{tag_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_tag(
+    tag_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Delete a tag. The tagged expenses are kept; only the tag is removed from them.
+    """
+    TagService.delete_tag(db, tag_id, current_user.id)
+    return None
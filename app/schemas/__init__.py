@@ -1,13 +1,47 @@
-from app.schemas.user import UserBase, UserCreate, UserResponse, UserInDB
-from app.schemas.category import CategoryBase, CategoryCreate, CategoryUpdate, CategoryResponse
-from app.schemas.expense import ExpenseBase, ExpenseCreate, ExpenseUpdate, ExpenseResponse, ExpenseWithCategory
+from app.schemas.currency import CurrencyCode, DEFAULT_CURRENCY
+from app.schemas.user import UserBase, UserCreate, UserUpdate, UserResponse, UserInDB
+from app.schemas.category import (
+    CategoryBase, CategoryCreate, CategoryUpdate, CategoryResponse, CategoryRow,
+    CategoryWithStats, CategoryStatsRow
+)
+from app.schemas.expense import (
+    ExpenseBase, ExpenseCreate, ExpenseUpdate, ExpenseResponse, ExpenseCreated, ExpenseWithCategory, ExpenseRow,
+    DuplicatePolicy, CategorySuggestionRequest, CategorySuggestion, CategorySuggestionRow,
+    ExpenseFilter, ExpenseSort, MAX_FILTER_CATEGORIES, ExportFormat
+)
 from app.schemas.token import Token, TokenData
-from app.schemas.report import MonthlyReport, CategorySummary, DateRangeReport
+from app.schemas.report import (
+    MonthlyReport, CategorySummary, CategoryDelta, LiveMonthlySnapshot, LiveMonthlyDelta, DateRangeReport,
+    SpendingStats, DailyAverage, CategoryShare, CategorySharePeriod, DailySpend, DailySpendRow,
+    PlatformCategoryTotal, CohortTotal, TopSpender, PlatformReport, PlatformJob, PlatformJobStatus
+)
+from app.schemas.sync import SyncResponse, SyncPayload
+from app.schemas.batch import BatchSubRequest, BatchRequest, BatchSubResponse, BatchResponse
+from app.schemas.budget import (
+    BudgetBase, BudgetCreate, BudgetUpdate, BudgetResponse, BudgetStatus, BudgetAlertResponse
+)
+from app.schemas.tag import (
+    TagName, TagMode, TagResponse, ExpenseTags, normalize_tag, MAX_TAG_LENGTH, MAX_TAGS_PER_EXPENSE
+)
+from app.schemas.recurring_expense import (
+    RecurringExpenseBase, RecurringExpenseCreate, RecurringExpenseUpdate, RecurringExpenseResponse
+)
 
 __all__ = [
-    "UserBase", "UserCreate", "UserResponse", "UserInDB",
-    "CategoryBase", "CategoryCreate", "CategoryUpdate", "CategoryResponse",
-    "ExpenseBase", "ExpenseCreate", "ExpenseUpdate", "ExpenseResponse", "ExpenseWithCategory",
+    "CurrencyCode", "DEFAULT_CURRENCY",
+    "UserBase", "UserCreate", "UserUpdate", "UserResponse", "UserInDB",
+    "CategoryBase", "CategoryCreate", "CategoryUpdate", "CategoryResponse", "CategoryRow",
+    "CategoryWithStats", "CategoryStatsRow",
+    "ExpenseBase", "ExpenseCreate", "ExpenseUpdate", "ExpenseResponse", "ExpenseCreated", "ExpenseWithCategory", "ExpenseRow",
+    "DuplicatePolicy", "CategorySuggestionRequest", "CategorySuggestion", "CategorySuggestionRow",
+    "ExpenseFilter", "ExpenseSort", "MAX_FILTER_CATEGORIES", "ExportFormat",
     "Token", "TokenData",
-    "MonthlyReport", "CategorySummary", "DateRangeReport"
+    "MonthlyReport", "CategorySummary", "CategoryDelta", "LiveMonthlySnapshot", "LiveMonthlyDelta", "DateRangeReport",
+    "SpendingStats", "DailyAverage", "CategoryShare", "CategorySharePeriod", "DailySpend", "DailySpendRow",
+    "PlatformCategoryTotal", "CohortTotal", "TopSpender", "PlatformReport", "PlatformJob", "PlatformJobStatus",
+    "SyncResponse", "SyncPayload",
+    "BatchSubRequest", "BatchRequest", "BatchSubResponse", "BatchResponse",
+    "BudgetBase", "BudgetCreate", "BudgetUpdate", "BudgetResponse", "BudgetStatus", "BudgetAlertResponse",
+    "RecurringExpenseBase", "RecurringExpenseCreate", "RecurringExpenseUpdate", "RecurringExpenseResponse",
+    "TagName", "TagMode", "TagResponse", "ExpenseTags", "normalize_tag", "MAX_TAG_LENGTH", "MAX_TAGS_PER_EXPENSE"
 ]
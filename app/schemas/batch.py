@@ -0,0 +1,29 @@
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Literal, Optional
+
+
+class BatchSubRequest(BaseModel):
+    """Schema for one API call inside a batch."""
+    method: Literal["GET", "POST", "PUT", "PATCH", "DELETE"] = "GET"
+    path: str = Field(
+        ..., pattern=r"^/[^?#]*$", description="API path without a query string, e.g. /expenses/; parameters go in query"
+    )
+    query: Dict[str, Any] = Field(default_factory=dict)
+    body: Optional[Any] = None
+
+
+class BatchRequest(BaseModel):
+    """Schema for a batch of API calls."""
+    requests: List[BatchSubRequest] = Field(..., min_length=1)
+
+
+class BatchSubResponse(BaseModel):
+    """Schema for the result of one API call inside a batch."""
+    status: int
+    headers: Dict[str, str]
+    body: Optional[Any] = None
+
+
+class BatchResponse(BaseModel):
+    """Schema for the results of a batch, in request order."""
+    responses: List[BatchSubResponse]
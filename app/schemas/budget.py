@@ -0,0 +1,58 @@
+from pydantic import BaseModel, Field
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Annotated, Optional
+
+
+class BudgetBase(BaseModel):
+    """Base budget schema with common attributes."""
+    category_id: Optional[int] = Field(None, description="Category covered; omit for an overall budget")
+    amount: Decimal = Field(..., gt=0, decimal_places=2, description="Monthly limit in the user's base currency")
+    alert_percent: int = Field(80, ge=1, le=100, description="Raise an alert when this share of the limit is spent")
+
+
+class BudgetCreate(BudgetBase):
+    """Schema for creating a new budget."""
+    pass
+
+
+class BudgetUpdate(BaseModel):
+    """Schema for updating an existing budget."""
+    amount: Optional[Annotated[Decimal, Field(gt=0, decimal_places=2)]] = None
+    alert_percent: Optional[int] = Field(None, ge=1, le=100)
+
+
+class BudgetResponse(BudgetBase):
+    """Schema for budget data in API responses."""
+    id: int
+    user_id: int
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+
+class BudgetStatus(BaseModel):
+    """Schema for a budget's progress in a month."""
+    budget_id: int
+    category_id: Optional[int]
+    category_name: Optional[str]
+    amount: Decimal
+    spent: Decimal
+    remaining: Decimal
+    projected: Decimal
+    percent_used: float
+    currency: str
+
+
+class BudgetAlertResponse(BaseModel):
+    """Schema for a budget threshold crossing."""
+    id: int
+    budget_id: int
+    month: date
+    threshold_percent: int
+    spent: Decimal
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
@@ -1,12 +1,15 @@
-from pydantic import BaseModel
-from datetime import datetime
+from pydantic import BaseModel, Field
+from datetime import date, datetime
+from decimal import Decimal
 from typing import Optional
+from typing_extensions import TypedDict
 
 
 class CategoryBase(BaseModel):
     """Base category schema with common attributes."""
     name: str
     description: Optional[str] = None
+    parent_id: Optional[int] = Field(None, description="Parent category; omit for a top-level category")
 
 
 class CategoryCreate(CategoryBase):
@@ -15,9 +18,10 @@ class CategoryCreate(CategoryBase):
 
 
 class CategoryUpdate(BaseModel):
-    """Schema for updating an existing category."""
+    """Schema for updating an existing category. Setting parent_id moves its subtree; null makes it top-level."""
     name: Optional[str] = None
     description: Optional[str] = None
+    parent_id: Optional[int] = None
 
 
 class CategoryResponse(CategoryBase):
@@ -28,3 +32,32 @@ class CategoryResponse(CategoryBase):
     
     class Config:
         from_attributes = True
+
+
+class CategoryRow(TypedDict, total=False):
+    """
+    Plain-dict form of CategoryResponse used by list fast paths.
+    Keys are declared in CategoryResponse field order.
+    """
+    name: str
+    description: Optional[str]
+    parent_id: Optional[int]
+    id: int
+    user_id: int
+    created_at: datetime
+
+
+class CategoryWithStats(CategoryResponse):
+    """Category with usage statistics, totals in the user's base currency."""
+    expense_count: int
+    total_amount: Decimal
+    currency: str
+    last_expense_date: Optional[date] = None
+
+
+class CategoryStatsRow(CategoryRow, total=False):
+    """Plain-dict form of CategoryWithStats used by the list fast path."""
+    expense_count: int
+    total_amount: Decimal
+    currency: str
+    last_expense_date: Optional[date]
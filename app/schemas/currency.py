@@ -0,0 +1,7 @@
+from pydantic import Field
+from typing import Annotated
+
+DEFAULT_CURRENCY = "USD"
+
+# ISO 4217 alphabetic code, e.g. "EUR".
+CurrencyCode = Annotated[str, Field(pattern=r"^[A-Z]{3}$", description="ISO 4217 currency code")]
@@ -1,7 +1,21 @@
 from pydantic import BaseModel, Field, field_validator
 from datetime import date, datetime
 from decimal import Decimal
-from typing import Optional
+from typing import Annotated, List, Literal, Optional
+from typing_extensions import TypedDict
+from app.schemas.currency import CurrencyCode
+from app.schemas.tag import TagName, TagMode, MAX_TAGS_PER_EXPENSE
+
+# What to do when a new expense matches the fingerprint of an existing one.
+DuplicatePolicy = Literal["flag", "reject"]
+
+# Sort orders of expense lists; a leading "-" sorts descending.
+ExpenseSort = Literal["date", "-date", "amount", "-amount", "updated_at", "-updated_at"]
+
+MAX_FILTER_CATEGORIES = 100
+
+# Columnar export formats: Arrow IPC stream or Parquet file.
+ExportFormat = Literal["arrow", "parquet"]
 
 
 class ExpenseBase(BaseModel):
@@ -13,7 +27,9 @@ class ExpenseBase(BaseModel):
 
 
 class ExpenseCreate(ExpenseBase):
-    """Schema for creating a new expense."""
+    """Schema for creating a new expense. Currency defaults to the user's base currency."""
+    currency: Optional[CurrencyCode] = None
+    tags: List[TagName] = Field(default_factory=list, max_length=MAX_TAGS_PER_EXPENSE)
     
     @field_validator('amount')
     @classmethod
@@ -25,14 +41,33 @@ class ExpenseCreate(ExpenseBase):
 
 class ExpenseUpdate(BaseModel):
     """Schema for updating an existing expense."""
-    amount: Optional[Decimal] = Field(None, gt=0, decimal_places=2)
+    amount: Optional[Annotated[Decimal, Field(gt=0, decimal_places=2)]] = None
     date: Optional[date] = None
     description: Optional[str] = Field(None, min_length=1, max_length=500)
     category_id: Optional[int] = None
+    currency: Optional[CurrencyCode] = None
+
+
+class ExpenseFilter(BaseModel):
+    """Filters of an expense list. All are optional and combine with AND."""
+    from_date: Optional[date] = None
+    to_date: Optional[date] = None
+    category_ids: List[int] = Field(default_factory=list, max_length=MAX_FILTER_CATEGORIES)
+    min_amount: Optional[Annotated[Decimal, Field(ge=0, decimal_places=2)]] = None
+    max_amount: Optional[Annotated[Decimal, Field(ge=0, decimal_places=2)]] = None
+    description_prefix: Optional[str] = Field(None, min_length=1, max_length=100)
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
+    updated_from: Optional[datetime] = None
+    updated_to: Optional[datetime] = None
+    tags: List[TagName] = Field(default_factory=list, max_length=MAX_TAGS_PER_EXPENSE)
+    tag_mode: TagMode = "any"
+    sort: ExpenseSort = "-date"
 
 
 class ExpenseResponse(ExpenseBase):
     """Schema for expense data in API responses."""
+    currency: str
     id: int
     user_id: int
     created_at: datetime
@@ -41,9 +76,54 @@ class ExpenseResponse(ExpenseBase):
         from_attributes = True
 
 
+class ExpenseCreated(ExpenseResponse):
+    """Schema for a created expense, with the expense it probably duplicates."""
+    duplicate_of: Optional[int] = None
+    
+    class Config:
+        from_attributes = True
+
+
 class ExpenseWithCategory(ExpenseResponse):
     """Schema for expense with category details."""
     category_name: str
     
     class Config:
         from_attributes = True
+
+
+class CategorySuggestionRequest(BaseModel):
+    """Schema for descriptions to suggest categories for."""
+    descriptions: List[Annotated[str, Field(min_length=1, max_length=500)]] = Field(
+        ..., min_length=1, max_length=1000
+    )
+
+
+class CategorySuggestion(BaseModel):
+    """Schema for the suggested category of one description."""
+    category_id: Optional[int] = Field(None, description="None when no term of the description is known")
+    category_name: Optional[str] = None
+    confidence: Optional[float] = Field(None, description="Model probability of the suggested category")
+
+
+class CategorySuggestionRow(TypedDict):
+    """Plain-dict form of CategorySuggestion returned by batch prediction."""
+    category_id: Optional[int]
+    category_name: Optional[str]
+    confidence: Optional[float]
+
+
+class ExpenseRow(TypedDict, total=False):
+    """
+    Plain-dict form of ExpenseWithCategory used by list fast paths.
+    Keys are declared in response field order.
+    """
+    amount: Decimal
+    date: date
+    description: str
+    category_id: int
+    currency: str
+    id: int
+    user_id: int
+    created_at: datetime
+    category_name: str
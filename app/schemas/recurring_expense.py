@@ -0,0 +1,52 @@
+from pydantic import BaseModel, Field, model_validator
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Annotated, Literal, Optional
+from app.schemas.currency import CurrencyCode
+
+Frequency = Literal["daily", "weekly", "monthly", "yearly"]
+
+
+class RecurringExpenseBase(BaseModel):
+    """Base recurring expense schema with common attributes."""
+    amount: Decimal = Field(..., gt=0, decimal_places=2, description="Amount of each occurrence")
+    description: str = Field(..., min_length=1, max_length=500)
+    category_id: int
+    frequency: Frequency
+    interval: int = Field(1, ge=1, le=366, description="Repeat every `interval` periods")
+    anchor_date: date = Field(..., description="Date of the first occurrence; later ones keep its day of month")
+    end_date: Optional[date] = Field(None, description="Last date an occurrence may fall on")
+
+
+class RecurringExpenseCreate(RecurringExpenseBase):
+    """Schema for creating a recurring expense. Currency defaults to the user's base currency."""
+    currency: Optional[CurrencyCode] = None
+    
+    @model_validator(mode="after")
+    def validate_end_date(self) -> "RecurringExpenseCreate":
+        if self.end_date is not None and self.end_date < self.anchor_date:
+            raise ValueError("end_date must not be before anchor_date")
+        return self
+
+
+class RecurringExpenseUpdate(BaseModel):
+    """
+    Schema for updating a recurring expense. Changes apply to occurrences
+    materialized afterwards; the schedule itself cannot be changed.
+    """
+    amount: Optional[Annotated[Decimal, Field(gt=0, decimal_places=2)]] = None
+    description: Optional[str] = Field(None, min_length=1, max_length=500)
+    category_id: Optional[int] = None
+    end_date: Optional[date] = None
+
+
+class RecurringExpenseResponse(RecurringExpenseBase):
+    """Schema for recurring expense data in API responses."""
+    currency: str
+    id: int
+    user_id: int
+    materialized_through: date
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
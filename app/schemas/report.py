@@ -1,6 +1,10 @@
 from decimal import Decimal
 from pydantic import BaseModel
 from datetime import date
+from typing import Dict, List, Literal, Optional
+from typing_extensions import TypedDict
+
+PlatformJobStatus = Literal["running", "done", "failed", "interrupted"]
 
 
 class MonthlyReport(BaseModel):
@@ -8,6 +12,7 @@ class MonthlyReport(BaseModel):
     year: int
     month: int
     total_expenses: Decimal
+    currency: str
     expense_count: int
     
     class Config:
@@ -18,13 +23,32 @@ class CategorySummary(BaseModel):
     """Schema for expense summary by category."""
     category_id: int
     category_name: str
+    parent_id: Optional[int] = None
     total_amount: Decimal
+    currency: str
     expense_count: int
     
     class Config:
         from_attributes = True
 
 
+class CategoryDelta(CategorySummary):
+    """Schema for a category's new monthly totals and how much they changed."""
+    amount_delta: Decimal
+    count_delta: int
+
+
+class LiveMonthlySnapshot(MonthlyReport):
+    """Schema for the full state of a month sent by the live report stream."""
+    categories: List[CategorySummary]
+
+
+class LiveMonthlyDelta(MonthlyReport):
+    """Schema for a change to a month sent by the live report stream."""
+    categories: List[CategoryDelta]
+    removed_category_ids: List[int] = []
+
+
 class DateRangeReport(BaseModel):
     """Schema for date range expense report."""
     start_date: date
@@ -35,3 +59,102 @@ class DateRangeReport(BaseModel):
     
     class Config:
         from_attributes = True
+
+
+class SpendingStats(BaseModel):
+    """Schema for distribution statistics of expense amounts."""
+    currency: str
+    expense_count: int
+    total: Decimal
+    mean: Optional[Decimal] = None
+    minimum: Optional[Decimal] = None
+    maximum: Optional[Decimal] = None
+    percentiles: Dict[str, Decimal]
+
+
+class DailyAverage(BaseModel):
+    """Schema for one day of spend with its trailing rolling average."""
+    date: date
+    total: Decimal
+    rolling_average: Decimal
+
+
+class CategoryShare(BaseModel):
+    """Schema for a category's share of spend within a period."""
+    category_id: int
+    category_name: str
+    total: Decimal
+    share: float
+
+
+class CategorySharePeriod(BaseModel):
+    """Schema for category shares of spend in one month."""
+    year: int
+    month: int
+    total: Decimal
+    currency: str
+    categories: List[CategoryShare]
+
+
+class DailySpend(BaseModel):
+    """Schema for one day of spend with the running total of the range."""
+    date: date
+    total: Decimal
+    cumulative: Decimal
+
+
+class DailySpendRow(TypedDict):
+    """Plain-dict form of DailySpend used for streaming."""
+    date: date
+    total: Decimal
+    cumulative: Decimal
+
+
+class PlatformCategoryTotal(BaseModel):
+    """Schema for spend of all users in categories of the same name."""
+    category_name: str
+    users: int
+    expense_count: int
+    total: Decimal
+
+
+class CohortTotal(BaseModel):
+    """Schema for spend of the users who signed up in one month."""
+    year: int
+    month: int
+    users: int
+    active_users: int
+    expense_count: int
+    total: Decimal
+
+
+class TopSpender(BaseModel):
+    """Schema for one of the users with the highest spend."""
+    user_id: int
+    email: str
+    expense_count: int
+    total: Decimal
+
+
+class PlatformReport(BaseModel):
+    """Schema for spend across all users."""
+    from_date: Optional[date] = None
+    to_date: Optional[date] = None
+    currency: str
+    users: int
+    active_users: int
+    expense_count: int
+    total: Decimal
+    categories: List[PlatformCategoryTotal]
+    cohorts: List[CohortTotal]
+    top_spenders: List[TopSpender]
+
+
+class PlatformJob(BaseModel):
+    """Schema for a platform analytics run in the background."""
+    id: str
+    status: PlatformJobStatus
+    completed_shards: int
+    total_shards: Optional[int] = None
+    error: Optional[str] = None
+    report: Optional[PlatformReport] = None
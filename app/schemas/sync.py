@@ -0,0 +1,23 @@
+from pydantic import BaseModel
+from typing import List
+from typing_extensions import TypedDict
+from app.schemas.expense import ExpenseResponse, ExpenseRow
+from app.schemas.category import CategoryResponse, CategoryRow
+
+
+class SyncResponse(BaseModel):
+    """Schema for a delta sync page."""
+    expenses: List[ExpenseResponse]
+    categories: List[CategoryResponse]
+    deleted_expense_ids: List[int]
+    deleted_category_ids: List[int]
+    next_token: str
+
+
+class SyncPayload(TypedDict):
+    """Plain-dict form of SyncResponse used for fast rendering."""
+    expenses: List[ExpenseRow]
+    categories: List[CategoryRow]
+    deleted_expense_ids: List[int]
+    deleted_category_ids: List[int]
+    next_token: str
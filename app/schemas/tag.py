@@ -0,0 +1,39 @@
+from pydantic import BaseModel, BeforeValidator, Field
+from datetime import datetime
+from typing import Annotated, Any, List, Literal
+
+MAX_TAG_LENGTH = 50
+MAX_TAGS_PER_EXPENSE = 20
+
+# How a multi-tag filter combines its tags: expenses with any or with all of them.
+TagMode = Literal["any", "all"]
+
+
+def normalize_tag(name: Any) -> Any:
+    """Case-fold a tag name and collapse its whitespace."""
+    if isinstance(name, str):
+        return " ".join(name.split()).casefold()
+    return name
+
+
+# Tags are stored normalized, so "Trip 2026" and "trip  2026" are the same tag.
+TagName = Annotated[
+    str,
+    BeforeValidator(normalize_tag),
+    Field(min_length=1, max_length=MAX_TAG_LENGTH, pattern=r"^[^,]+$", description="Tag name, without commas")
+]
+
+
+class TagResponse(BaseModel):
+    """Schema for tag data in API responses."""
+    id: int
+    name: str
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+
+class ExpenseTags(BaseModel):
+    """Schema for the complete set of tags of an expense."""
+    tags: List[TagName] = Field(..., max_length=MAX_TAGS_PER_EXPENSE)
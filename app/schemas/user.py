@@ -1,5 +1,6 @@
 from pydantic import BaseModel, EmailStr
 from datetime import datetime
+from app.schemas.currency import CurrencyCode, DEFAULT_CURRENCY
 
 
 class UserBase(BaseModel):
@@ -10,11 +11,18 @@ class UserBase(BaseModel):
 class UserCreate(UserBase):
     """Schema for user registration."""
     password: str
+    base_currency: CurrencyCode = DEFAULT_CURRENCY
+
+
+class UserUpdate(BaseModel):
+    """Schema for updating the current user's settings."""
+    base_currency: CurrencyCode
 
 
 class UserResponse(UserBase):
     """Schema for user data in API responses."""
     id: int
+    base_currency: str
     created_at: datetime
     
     class Config:
@@ -2,5 +2,27 @@ from app.services.auth_service import AuthService
 from app.services.category_service import CategoryService
 from app.services.expense_service import ExpenseService
 from app.services.report_service import ReportService
+from app.services.data_version_service import DataVersionService
+from app.services.amount_service import AmountService
+from app.services.fx_service import FxService
+from app.services.analytics_service import AnalyticsService
+from app.services.budget_service import BudgetService
+from app.services.categorizer_service import CategorizerService
+from app.services.tag_service import TagService
+from app.services.expense_filter_service import ExpenseFilterService
+from app.services.archive_service import ArchiveService
+from app.services.export_service import ExportService
+from app.services.platform_analytics_service import PlatformAnalyticsService
+from app.services.live_service import LiveService, LiveBackend, PostgresBackend
+from app.services.recurring_service import RecurringService, MaterializeResult
+from app.services.sync_service import SyncService
+from app.services.batch_service import BatchService
+from app.services.group_commit import GroupCommitter, get_group_committer, shutdown_group_committer
 
-__all__ = ["AuthService", "CategoryService", "ExpenseService", "ReportService"]
+__all__ = [
+    "AuthService", "CategoryService", "ExpenseService", "ReportService",
+    "DataVersionService", "SyncService", "BatchService", "AmountService", "FxService",
+    "AnalyticsService", "BudgetService", "CategorizerService", "TagService", "ExpenseFilterService", "ArchiveService", "ExportService",
+    "PlatformAnalyticsService", "LiveService", "LiveBackend", "PostgresBackend", "RecurringService", "MaterializeResult",
+    "GroupCommitter", "get_group_committer", "shutdown_group_committer"
+]
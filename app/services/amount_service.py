@@ -0,0 +1,54 @@
+from sqlalchemy import BigInteger, cast, func
+from sqlalchemy.sql.elements import ColumnElement
+from app.models import Expense
+from app.utils import from_cents
+from app.config import get_settings
+from decimal import Decimal
+from typing import Any, Dict, List
+
+settings = get_settings()
+
+
+class AmountService:
+    """
+    Reads expense amounts in the configured storage mode.
+    
+    In "dual" and "cents" modes amounts are selected and summed as integer
+    minor units and only turned into Decimals at the API edge.
+    """
+    
+    @staticmethod
+    def uses_cents() -> bool:
+        """Whether amounts are read from integer minor units."""
+        return settings.amount_storage != "numeric"
+    
+    @staticmethod
+    def column() -> ColumnElement:
+        """SQL expression for an expense amount in the configured storage mode."""
+        if settings.amount_storage == "cents":
+            return Expense.amount_cents
+        if settings.amount_storage == "dual":
+            return func.coalesce(
+                Expense.amount_cents, cast(func.round(Expense.amount * 100), BigInteger)
+            )
+        return Expense.amount
+    
+    @staticmethod
+    def total() -> ColumnElement:
+        """SQL SUM of expense amounts, zero when there are no rows."""
+        return func.coalesce(func.sum(AmountService.column()), 0)
+    
+    @staticmethod
+    def to_decimal(value: Any) -> Decimal:
+        """Convert a selected amount or total into its API Decimal."""
+        if AmountService.uses_cents():
+            return from_cents(int(value))
+        return Decimal(str(value))
+    
+    @staticmethod
+    def rows_to_decimal(rows: List[Dict[str, Any]], key: str = "amount") -> List[Dict[str, Any]]:
+        """Convert selected cents to Decimals in place for rows that carry ``key``."""
+        if AmountService.uses_cents() and rows and key in rows[0]:
+            for row in rows:
+                row[key] = from_cents(row[key])
+        return rows
@@ -0,0 +1,329 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import select, String, type_coerce
+from app.models import Expense, Category, User
+from app.schemas import SpendingStats, DailyAverage, CategoryShare, CategorySharePeriod
+from app.services.amount_service import AmountService
+from app.services.fx_service import FxService
+from app.services.archive_service import ArchiveService
+from app.utils import BadRequestException
+from app.config import get_settings
+from collections import OrderedDict
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+import threading
+import numpy as np
+
+settings = get_settings()
+
+EPOCH = date(1970, 1, 1)
+PERCENTILES = (25, 50, 75, 90, 95, 99)
+MAX_SERIES_DAYS = 3660
+
+# Rows fetched from the database cursor per chunk when a user's columns are loaded.
+LOAD_BATCH_SIZE = 50000
+
+
+def _money(value: float) -> Decimal:
+    """Round a float amount to a two-decimal Decimal."""
+    return Decimal(f"{value:.2f}")
+
+
+class UserColumns:
+    """
+    A user's expenses as parallel NumPy arrays, sorted by date.
+    
+    days holds dates as day numbers since 1970-01-01, amounts holds
+    amounts converted to the base currency and categories holds positions
+    into category_ids.
+    """
+    
+    def __init__(
+        self,
+        days: np.ndarray,
+        amounts: np.ndarray,
+        categories: np.ndarray,
+        category_ids: np.ndarray,
+        category_names: Dict[int, str]
+    ):
+        self.days = days
+        self.amounts = amounts
+        self.categories = categories
+        self.category_ids = category_ids
+        self.category_names = category_names
+    
+    def window(self, from_date: Optional[date], to_date: Optional[date]) -> slice:
+        """Slice of the arrays covering an inclusive date range."""
+        start = 0 if from_date is None else int(np.searchsorted(self.days, (from_date - EPOCH).days, "left"))
+        stop = len(self.days) if to_date is None else int(np.searchsorted(self.days, (to_date - EPOCH).days, "right"))
+        return slice(start, stop)
+
+
+_cache: "OrderedDict[int, Tuple[Tuple[int, str, str], UserColumns]]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+class AnalyticsService:
+    """
+    Statistics computed in-process over a user's expenses.
+    
+    Each user's (date, amount, category) columns are loaded with one query
+    and cached. Cache entries carry the user's data version, which every
+    expense or category write bumps, and the FX rate table's version, so a
+    write or a rate reload makes the next request reload instead of serving
+    stale numbers.
+    """
+    
+    @staticmethod
+    def get_columns(db: Session, user: User) -> UserColumns:
+        """
+        Return a user's cached columns, loading them if they are missing or stale.
+        
+        Args:
+            db: Database session
+            user: Authenticated user
+            
+        Returns:
+            The user's expense columns in their base currency
+            
+        Raises:
+            BadRequestException: If an FX rate needed for conversion is missing
+        """
+        version = (user.data_version, user.base_currency, FxService.rate_table(db).version)
+        with _cache_lock:
+            entry = _cache.get(user.id)
+            if entry is not None and entry[0] == version:
+                _cache.move_to_end(user.id)
+                return entry[1]
+        
+        columns = AnalyticsService._load_columns(db, user.id, user.base_currency)
+        
+        with _cache_lock:
+            _cache[user.id] = (version, columns)
+            _cache.move_to_end(user.id)
+            while len(_cache) > settings.analytics_cache_users:
+                _cache.popitem(last=False)
+        
+        return columns
+    
+    @staticmethod
+    def _load_columns(db: Session, user_id: int, base_currency: str) -> UserColumns:
+        """
+        Load a user's expenses, archived ones included, into arrays with a single query.
+        
+        Rows are fetched on the session's connection in chunks of
+        LOAD_BATCH_SIZE, each turned straight into column arrays, with dates
+        left as the driver returns them (ISO text on SQLite) for NumPy to
+        parse. Foreign amounts are converted with one factor per
+        distinct (currency, day): the factors are looked up once and applied
+        to all rows with a vectorized take.
+        """
+        statement = select(
+            type_coerce(Expense.date, String), AmountService.column(), Expense.category_id, Expense.currency
+        ).where(Expense.user_id == user_id).order_by(Expense.date)
+        
+        parts = []
+        for rows in db.connection().execute(statement.execution_options(yield_per=LOAD_BATCH_SIZE)).partitions():
+            dates, amounts, category_ids, currencies = zip(*rows)
+            amounts = np.array(amounts, dtype=np.float64)
+            parts.append((
+                np.array(dates, dtype="datetime64[D]"),
+                amounts / 100 if AmountService.uses_cents() else amounts,
+                np.array(category_ids, dtype=np.int64),
+                np.array(currencies, dtype=object),
+            ))
+        
+        archived = ArchiveService.get_column_arrays(user_id, ("date", "amount_cents", "category_id", "currency"))
+        if archived is not None:
+            parts.append((
+                archived["date"].astype("datetime64[D]"),
+                archived["amount_cents"] / 100,
+                archived["category_id"].astype(np.int64),
+                archived["currency"].astype(object),
+            ))
+        
+        if parts:
+            days, amounts, raw_categories, currencies = (np.concatenate(column) for column in zip(*parts))
+            days = days.astype(np.int64)
+        else:
+            days, amounts, raw_categories, currencies = (
+                np.empty(0, np.int64), np.empty(0, np.float64), np.empty(0, np.int64), np.empty(0, object)
+            )
+        if archived is not None:
+            order = np.argsort(days, kind="stable")
+            days, amounts, raw_categories, currencies = days[order], amounts[order], raw_categories[order], currencies[order]
+        
+        foreign = np.flatnonzero(currencies != base_currency)
+        if len(foreign):
+            amounts[foreign] *= AnalyticsService._conversion_factors(
+                db, currencies[foreign], days[foreign], base_currency
+            )
+        
+        category_ids, categories = np.unique(raw_categories, return_inverse=True)
+        names = dict(db.query(Category.id, Category.name).filter(Category.user_id == user_id))
+        
+        return UserColumns(days, amounts, categories.reshape(-1), category_ids, names)
+    
+    @staticmethod
+    def _conversion_factors(db: Session, currencies: np.ndarray, days: np.ndarray, base_currency: str) -> np.ndarray:
+        """
+        Factor converting each (currency, day number) into a base currency.
+        
+        Rows are keyed by currency code and day, the distinct keys are
+        looked up once and their factors taken back to every row.
+        """
+        codes, code_index = np.unique(currencies, return_inverse=True)
+        first_day = int(days.min())
+        span = int(days.max()) - first_day + 1
+        keys, key_index = np.unique(code_index.reshape(-1) * span + (days - first_day), return_inverse=True)
+        pairs = [(codes[key // span], EPOCH + timedelta(days=int(key % span) + first_day)) for key in keys]
+        factors = FxService.conversion_factors(db, pairs, base_currency)
+        return np.take(np.array([float(factors[pair]) for pair in pairs]), key_index.reshape(-1))
+    
+    @staticmethod
+    def get_summary(
+        db: Session,
+        user: User,
+        from_date: Optional[date] = None,
+        to_date: Optional[date] = None
+    ) -> SpendingStats:
+        """
+        Distribution statistics of individual expense amounts.
+        
+        Args:
+            db: Database session
+            user: Authenticated user
+            from_date: Optional inclusive start date
+            to_date: Optional inclusive end date
+            
+        Returns:
+            SpendingStats in the user's base currency
+        """
+        columns = AnalyticsService.get_columns(db, user)
+        amounts = columns.amounts[columns.window(from_date, to_date)]
+        
+        if not len(amounts):
+            return SpendingStats(
+                currency=user.base_currency, expense_count=0, total=Decimal("0.00"),
+                mean=None, minimum=None, maximum=None, percentiles={}
+            )
+        
+        percentiles = np.percentile(amounts, PERCENTILES)
+        return SpendingStats(
+            currency=user.base_currency,
+            expense_count=len(amounts),
+            total=_money(amounts.sum()),
+            mean=_money(amounts.mean()),
+            minimum=_money(amounts.min()),
+            maximum=_money(amounts.max()),
+            percentiles={f"p{p}": _money(value) for p, value in zip(PERCENTILES, percentiles)}
+        )
+    
+    @staticmethod
+    def get_rolling_average(
+        db: Session,
+        user: User,
+        from_date: date,
+        to_date: date,
+        window: int = 30
+    ) -> List[DailyAverage]:
+        """
+        Daily spend with a trailing rolling average of daily spend.
+        
+        The average for a day covers the ``window`` days ending on it,
+        including days before from_date and days without expenses.
+        
+        Args:
+            db: Database session
+            user: Authenticated user
+            from_date: Inclusive start date
+            to_date: Inclusive end date
+            window: Rolling window length in days
+            
+        Returns:
+            One DailyAverage per day of the range
+            
+        Raises:
+            BadRequestException: If the range is reversed or too long
+        """
+        if to_date < from_date:
+            raise BadRequestException(detail="to_date must not be before from_date")
+        if (to_date - from_date).days >= MAX_SERIES_DAYS:
+            raise BadRequestException(detail=f"Date range is limited to {MAX_SERIES_DAYS} days")
+        
+        columns = AnalyticsService.get_columns(db, user)
+        history_start = from_date - timedelta(days=window - 1)
+        selected = columns.window(history_start, to_date)
+        
+        length = (to_date - history_start).days + 1
+        offsets = columns.days[selected] - (history_start - EPOCH).days
+        daily = np.bincount(offsets, weights=columns.amounts[selected], minlength=length)
+        
+        cumulative = np.concatenate(([0.0], np.cumsum(daily)))
+        rolling = (cumulative[window:] - cumulative[:-window]) / window
+        
+        return [
+            DailyAverage(
+                date=from_date + timedelta(days=index),
+                total=_money(total),
+                rolling_average=_money(average)
+            )
+            for index, (total, average) in enumerate(zip(daily[window - 1:], rolling))
+        ]
+    
+    @staticmethod
+    def get_category_share(
+        db: Session,
+        user: User,
+        from_date: Optional[date] = None,
+        to_date: Optional[date] = None
+    ) -> List[CategorySharePeriod]:
+        """
+        Each category's share of monthly spend.
+        
+        Args:
+            db: Database session
+            user: Authenticated user
+            from_date: Optional inclusive start date
+            to_date: Optional inclusive end date
+            
+        Returns:
+            One CategorySharePeriod per month with spending, oldest first
+        """
+        columns = AnalyticsService.get_columns(db, user)
+        selected = columns.window(from_date, to_date)
+        days = columns.days[selected]
+        if not len(days):
+            return []
+        
+        months = days.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+        first_month = int(months[0])
+        month_count = int(months[-1]) - first_month + 1
+        category_count = len(columns.category_ids)
+        
+        cells = (months - first_month) * category_count + columns.categories[selected]
+        totals = np.bincount(
+            cells, weights=columns.amounts[selected], minlength=month_count * category_count
+        ).reshape(month_count, category_count)
+        month_totals = totals.sum(axis=1)
+        
+        periods = []
+        for index in np.flatnonzero(month_totals):
+            month_total = month_totals[index]
+            year, month = divmod(first_month + int(index), 12)
+            periods.append(CategorySharePeriod(
+                year=1970 + year,
+                month=month + 1,
+                total=_money(month_total),
+                currency=user.base_currency,
+                categories=[
+                    CategoryShare(
+                        category_id=int(columns.category_ids[position]),
+                        category_name=columns.category_names.get(int(columns.category_ids[position]), ""),
+                        total=_money(totals[index, position]),
+                        share=round(float(totals[index, position] / month_total), 4)
+                    )
+                    for position in np.flatnonzero(totals[index])
+                ]
+            ))
+        return periods
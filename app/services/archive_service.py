@@ -0,0 +1,619 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import extract, func, insert, select
+from app.models import Expense, ExpenseTag, Tag
+from app.schemas import ExpenseFilter, TagMode
+from app.utils import from_cents, to_cents, expense_fingerprint
+from app.services.data_version_service import DataVersionService
+from app.services.tag_service import TagService
+from app.services.expense_filter_service import SORT_COLUMNS
+from app.config import get_settings
+from collections import OrderedDict
+from datetime import date
+from functools import reduce
+from heapq import merge
+from operator import and_, itemgetter
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+import json
+import os
+import threading
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from pyarrow.fs import LocalFileSystem
+
+settings = get_settings()
+
+# Columns of an archive file; user_id is implied by the file's directory.
+ARCHIVE_SCHEMA = pa.schema([
+    ("id", pa.int64()),
+    ("date", pa.date32()),
+    ("amount_cents", pa.int64()),
+    ("currency", pa.string()),
+    ("description", pa.string()),
+    ("category_id", pa.int64()),
+    ("recurring_id", pa.int64()),
+    ("tags", pa.list_(pa.string())),
+    ("created_at", pa.timestamp("us")),
+    ("updated_at", pa.timestamp("us")),
+])
+
+# Footer key holding a file's totals per category, currency and day as JSON.
+DAILY_TOTALS_KEY = b"expense_tracker.daily_totals"
+
+# Rows are sorted by date, so each row group's min/max statistics cover a
+# narrow date range and date filters skip whole groups.
+ROW_GROUP_SIZE = 4096
+
+# Keys of the sort value and id that list rows carry while being merged.
+MERGE_KEYS = ("_sort", "_id")
+
+_filesystem = LocalFileSystem(use_mmap=True)
+
+
+class DailyTotal(NamedTuple):
+    """Archived expenses of one category, currency and day."""
+    category_id: int
+    currency: str
+    date: date
+    total_cents: int
+    count: int
+
+
+_footers: "OrderedDict[str, Tuple[Tuple[int, int], List[DailyTotal]]]" = OrderedDict()
+_footers_lock = threading.Lock()
+_write_lock = threading.Lock()
+
+
+class ArchiveService:
+    """
+    Cold storage of old expenses in compressed columnar files.
+    
+    scripts.archive_expenses moves the expenses of whole past years out of
+    the expenses table into one zstd-compressed Parquet file per user and
+    year, ``{archive_dir}/{user_id}/{year}.parquet``, sorted by date. The
+    files are read through memory maps; date filters skip files by name and
+    row groups by their statistics. Each footer also stores the file's
+    totals per category, currency and day, so reports over archived months
+    convert those totals without reading any rows.
+    
+    Archived expenses keep their ids and still appear in lists, reports and
+    statistics, but they are read-only until their year is restored.
+    """
+    
+    @staticmethod
+    def path(user_id: int, year: int) -> str:
+        """Location of a user's archive file for a year."""
+        return os.path.join(settings.archive_dir, str(user_id), f"{year}.parquet")
+    
+    @staticmethod
+    def years(user_id: int, from_date: Optional[date] = None, to_date: Optional[date] = None) -> List[int]:
+        """
+        Years a user has archive files for, optionally only those overlapping a date range.
+        
+        Args:
+            user_id: User ID
+            from_date: First day of the range, or None for no lower bound
+            to_date: Last day of the range, or None for no upper bound
+            
+        Returns:
+            Archived years in ascending order
+        """
+        try:
+            names = os.listdir(os.path.join(settings.archive_dir, str(user_id)))
+        except FileNotFoundError:
+            return []
+        
+        years = sorted(int(name[:-8]) for name in names if name.endswith(".parquet") and name[:-8].isdigit())
+        return [
+            year for year in years
+            if (from_date is None or year >= from_date.year) and (to_date is None or year <= to_date.year)
+        ]
+    
+    @staticmethod
+    def user_ids() -> List[int]:
+        """Users that have archive files, in ascending order."""
+        try:
+            names = os.listdir(settings.archive_dir)
+        except FileNotFoundError:
+            return []
+        return sorted(int(name) for name in names if name.isdigit())
+    
+    @staticmethod
+    def archive_user(db: Session, user_id: int, before_year: int) -> int:
+        """
+        Move a user's expenses dated before a year into archive files.
+        
+        Each year is archived in its own transaction. Its expenses are merged
+        with the year's existing file, if any, replacing rows archived before
+        under the same id, so expenses added to an archived year later are
+        picked up by the next run. The new file is written aside and swapped
+        in right before the rows' deletion is committed; if the commit fails
+        the previous file is put back. Budgets' monthly spend and the
+        categorization model keep counting archived expenses, and no sync
+        tombstones are written because the expenses still exist.
+        
+        Args:
+            db: Database session
+            user_id: Owner of the expenses
+            before_year: First year to keep in the database
+            
+        Returns:
+            Number of expenses archived
+        """
+        year_column = extract("year", Expense.date)
+        years = [int(year) for (year,) in db.query(func.distinct(year_column)).filter(
+            Expense.user_id == user_id, Expense.date < date(before_year, 1, 1)
+        ).order_by(year_column)]
+        
+        archived = 0
+        for year in years:
+            in_year = (
+                Expense.user_id == user_id,
+                Expense.date >= date(year, 1, 1),
+                Expense.date <= date(year, 12, 31)
+            )
+            rows = db.query(
+                Expense.id, Expense.date, Expense.amount, Expense.currency, Expense.description,
+                Expense.category_id, Expense.recurring_id, Expense.created_at, Expense.updated_at
+            ).filter(*in_year).all()
+            
+            tags: Dict[int, List[str]] = {}
+            for expense_id, name in db.query(ExpenseTag.expense_id, Tag.name).join(
+                Tag, Tag.id == ExpenseTag.tag_id
+            ).filter(ExpenseTag.expense_id.in_(select(Expense.id).where(*in_year))).order_by(Tag.name):
+                tags.setdefault(expense_id, []).append(name)
+            
+            table = pa.Table.from_pydict({
+                "id": [row.id for row in rows],
+                "date": [row.date for row in rows],
+                "amount_cents": [to_cents(row.amount) for row in rows],
+                "currency": [row.currency for row in rows],
+                "description": [row.description for row in rows],
+                "category_id": [row.category_id for row in rows],
+                "recurring_id": [row.recurring_id for row in rows],
+                "tags": [tags.get(row.id, []) for row in rows],
+                "created_at": [row.created_at for row in rows],
+                "updated_at": [row.updated_at for row in rows],
+            }, schema=ARCHIVE_SCHEMA)
+            
+            TagService.remove_expenses(db, select(Expense.id).where(*in_year))
+            db.query(Expense).filter(*in_year).delete(synchronize_session=False)
+            DataVersionService.bump(db, user_id)
+            
+            path = ArchiveService.path(user_id, year)
+            with _write_lock:
+                if os.path.exists(path):
+                    previous = pq.read_table(path, memory_map=True)
+                    kept = pc.invert(pc.is_in(previous["id"], value_set=table["id"]))
+                    table = pa.concat_tables([previous.filter(kept), table])
+                ArchiveService._replace(path, table, db.commit)
+            archived += len(rows)
+        
+        return archived
+    
+    @staticmethod
+    def restore_year(db: Session, user_id: int, year: int) -> int:
+        """
+        Move a user's archived expenses of a year back into the expenses table.
+        
+        Rows already present in the database (left by an interrupted restore)
+        are skipped. The file is removed once the rows are committed.
+        
+        Args:
+            db: Database session
+            user_id: Owner of the expenses
+            year: Archived year to restore
+            
+        Returns:
+            Number of expenses restored
+        """
+        path = ArchiveService.path(user_id, year)
+        if not os.path.exists(path):
+            return 0
+        
+        present = set(db.scalars(select(Expense.id).where(
+            Expense.user_id == user_id,
+            Expense.date >= date(year, 1, 1),
+            Expense.date <= date(year, 12, 31)
+        )))
+        records = [record for record in pq.read_table(path, memory_map=True).to_pylist() if record["id"] not in present]
+        
+        if records:
+            # Bulk inserts skip the model's validators, so the derived columns are set here.
+            db.execute(insert(Expense), [
+                {
+                    "id": record["id"],
+                    "amount": from_cents(record["amount_cents"]),
+                    "amount_cents": record["amount_cents"],
+                    "currency": record["currency"],
+                    "date": record["date"],
+                    "description": record["description"],
+                    "user_id": user_id,
+                    "category_id": record["category_id"],
+                    "recurring_id": record["recurring_id"],
+                    "fingerprint": expense_fingerprint(
+                        record["amount_cents"], record["currency"], record["date"], record["description"]
+                    ),
+                    "created_at": record["created_at"],
+                    "updated_at": record["updated_at"],
+                }
+                for record in records
+            ])
+            
+            tag_ids = {
+                tag.name: tag.id
+                for tag in TagService.resolve_tags(db, user_id, [name for record in records for name in record["tags"]])
+            }
+            links = [
+                {"tag_id": tag_ids[name], "expense_id": record["id"]}
+                for record in records for name in record["tags"]
+            ]
+            if links:
+                db.execute(insert(ExpenseTag), links)
+            DataVersionService.bump(db, user_id)
+        
+        db.commit()
+        with _write_lock:
+            os.remove(path)
+        return len(records)
+    
+    @staticmethod
+    def category_expense_ids(user_id: int, category_id: int) -> List[int]:
+        """Ids of a user's archived expenses in a category."""
+        years = ArchiveService.years(user_id)
+        if not years:
+            return []
+        table = ArchiveService._scan(user_id, years, ["id"], pc.field("category_id") == category_id)
+        return table["id"].to_pylist()
+    
+    @staticmethod
+    def remove_category(user_id: int, category_id: int) -> None:
+        """
+        Drop a deleted category's expenses from a user's archive files.
+        
+        Runs after the category's deletion is committed; files without
+        expenses of the category are left untouched.
+        
+        Args:
+            user_id: Owner of the category
+            category_id: Deleted category
+        """
+        with _write_lock:
+            for year in ArchiveService.years(user_id):
+                path = ArchiveService.path(user_id, year)
+                table = pq.read_table(path, memory_map=True)
+                kept = pc.not_equal(table["category_id"], category_id)
+                if pc.all(kept).as_py():
+                    continue
+                table = table.filter(kept)
+                if table.num_rows:
+                    ArchiveService._replace(path, table)
+                else:
+                    os.remove(path)
+    
+    @staticmethod
+    def get_expense_rows(
+        user_id: int,
+        years: Sequence[int],
+        expense_filter: ExpenseFilter,
+        fields: Sequence[str],
+        category_names: Optional[Dict[int, str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Read a user's archived expenses matching a filter as plain dicts.
+        
+        Only the columns behind the requested fields are decoded. Rows carry
+        MERGE_KEYS besides the fields and are ordered like
+        ExpenseFilterService.order, ready for merge_expense_rows.
+        
+        Args:
+            user_id: Owner of the expenses
+            years: Archived years to read, see years()
+            expense_filter: Filters and sort order of the list
+            fields: Response fields to return, in output order
+            category_names: Names by category id to add as category_name;
+                expenses of other categories are left out
+                
+        Returns:
+            List of expense rows keyed by response field name
+        """
+        key = expense_filter.sort.lstrip("-")
+        sort_column = SORT_COLUMNS[key].key
+        sources = {"amount": "amount_cents", MERGE_KEYS[0]: sort_column, MERGE_KEYS[1]: "id"}
+        keys = [field for field in fields if field != "user_id"] + list(MERGE_KEYS)
+        columns = {sources.get(field, field) for field in keys}
+        if category_names is not None:
+            columns.add("category_id")
+        
+        table = ArchiveService._scan(
+            user_id, years, sorted(columns), ArchiveService._expression(expense_filter),
+            expense_filter.tags, expense_filter.tag_mode
+        )
+        order = "descending" if expense_filter.sort.startswith("-") else "ascending"
+        table = table.sort_by([(sort_column, order), ("id", order)])
+        
+        rows = []
+        for record in table.to_pylist():
+            row = {field: record[sources.get(field, field)] for field in keys}
+            if "amount" in row:
+                row["amount"] = from_cents(row["amount"])
+            if "user_id" in fields:
+                row["user_id"] = user_id
+            if category_names is not None:
+                row["category_name"] = category_names.get(record["category_id"])
+                if row["category_name"] is None:
+                    continue
+            rows.append(row)
+        return rows
+    
+    @staticmethod
+    def merge_expense_rows(
+        rows: List[Dict[str, Any]],
+        archived: List[Dict[str, Any]],
+        expense_filter: ExpenseFilter
+    ) -> List[Dict[str, Any]]:
+        """
+        Merge database and archived rows, both already in the filter's order,
+        and drop the MERGE_KEYS they carry.
+        """
+        merged = list(merge(
+            rows, archived, key=itemgetter(*MERGE_KEYS), reverse=expense_filter.sort.startswith("-")
+        ))
+        for row in merged:
+            del row[MERGE_KEYS[0]], row[MERGE_KEYS[1]]
+        return merged
+    
+    @staticmethod
+    def get_column_arrays(
+        user_id: int,
+        columns: Sequence[str],
+        from_date: Optional[date] = None,
+        to_date: Optional[date] = None
+    ) -> Optional[Dict[str, np.ndarray]]:
+        """
+        Read a user's archived expenses as NumPy arrays of archive columns, ordered by date.
+        
+        Args:
+            user_id: Owner of the expenses
+            columns: Archive columns to return, e.g. ("date", "amount_cents")
+            from_date: Only expenses from this date
+            to_date: Only expenses up to this date
+            
+        Returns:
+            One array per column (dates as datetime64[D]), or None without archive files
+        """
+        years = ArchiveService.years(user_id, from_date, to_date)
+        if not years:
+            return None
+        
+        expression = ArchiveService._expression(ExpenseFilter(from_date=from_date, to_date=to_date))
+        table = ArchiveService._scan(user_id, years, sorted({*columns, "date", "id"}), expression)
+        table = table.sort_by([("date", "ascending"), ("id", "ascending")])
+        return {column: table[column].to_numpy() for column in columns}
+    
+    @staticmethod
+    def iter_batches(
+        user_id: int,
+        expense_filter: ExpenseFilter,
+        columns: Sequence[str],
+        batch_size: int
+    ) -> Iterator[pa.RecordBatch]:
+        """
+        Stream a user's archived expenses matching a filter as record batches.
+        
+        Batches are decoded from the memory-mapped files one at a time, so
+        memory is bounded by batch_size rather than by the archive's size.
+        The filter's sort order is not applied.
+        
+        Args:
+            user_id: Owner of the expenses
+            expense_filter: Filters to apply
+            columns: Archive columns to return
+            batch_size: Maximum rows per batch
+            
+        Yields:
+            Non-empty record batches of the requested columns
+        """
+        years = ArchiveService.years(user_id, expense_filter.from_date, expense_filter.to_date)
+        if not years:
+            return
+        
+        tags = expense_filter.tags
+        batches = ArchiveService._dataset(user_id, years).to_batches(
+            columns=[*columns, "tags"] if tags else list(columns),
+            filter=ArchiveService._expression(expense_filter),
+            batch_size=batch_size
+        )
+        for batch in batches:
+            if tags:
+                batch = batch.filter(ArchiveService._tag_mask(batch["tags"], tags, expense_filter.tag_mode))
+                batch = batch.select(list(columns))
+            if batch.num_rows:
+                yield batch
+    
+    @staticmethod
+    def get_daily_totals(
+        user_id: int,
+        from_date: Optional[date] = None,
+        to_date: Optional[date] = None,
+        tags: Sequence[str] = (),
+        tag_mode: TagMode = "any"
+    ) -> List[DailyTotal]:
+        """
+        Totals of a user's archived expenses per category, currency and day.
+        
+        Without tags they are read from the files' footers, which are cached,
+        so no expense rows are decoded. With tags the matching rows are
+        scanned and grouped.
+        
+        Args:
+            user_id: Owner of the expenses
+            from_date: First day to include, or None
+            to_date: Last day to include, or None
+            tags: Only count expenses carrying these tags
+            tag_mode: Whether expenses need "any" or "all" of the tags
+            
+        Returns:
+            Totals ordered by date
+        """
+        years = ArchiveService.years(user_id, from_date, to_date)
+        if not years:
+            return []
+        
+        if tags:
+            expression = ArchiveService._expression(ExpenseFilter(from_date=from_date, to_date=to_date))
+            table = ArchiveService._scan(
+                user_id, years, ["amount_cents", "category_id", "currency", "date"], expression, tags, tag_mode
+            )
+            return sorted(
+                (DailyTotal(*group) for group in ArchiveService._group(table)),
+                key=itemgetter(2)
+            )
+        
+        return [
+            total
+            for year in years
+            for total in ArchiveService._footer(ArchiveService.path(user_id, year))
+            if (from_date is None or total.date >= from_date) and (to_date is None or total.date <= to_date)
+        ]
+    
+    @staticmethod
+    def _expression(expense_filter: ExpenseFilter) -> Optional[pc.Expression]:
+        """Compile an ExpenseFilter, tags aside, into a dataset filter expression."""
+        column = pc.field
+        conditions = []
+        
+        for name, value, compare in (
+            ("date", expense_filter.from_date, "greater_equal"),
+            ("date", expense_filter.to_date, "less_equal"),
+            ("amount_cents", to_cents(expense_filter.min_amount), "greater_equal"),
+            ("amount_cents", to_cents(expense_filter.max_amount), "less_equal"),
+            ("created_at", expense_filter.created_from, "greater_equal"),
+            ("created_at", expense_filter.created_to, "less_equal"),
+            ("updated_at", expense_filter.updated_from, "greater_equal"),
+            ("updated_at", expense_filter.updated_to, "less_equal"),
+        ):
+            if value is not None:
+                conditions.append(getattr(pc, compare)(column(name), pa.scalar(value, ARCHIVE_SCHEMA.field(name).type)))
+        
+        if expense_filter.category_ids:
+            conditions.append(column("category_id").isin(expense_filter.category_ids))
+        
+        if expense_filter.description_prefix is not None:
+            conditions.append(pc.starts_with(
+                pc.utf8_lower(column("description")), expense_filter.description_prefix.lower()
+            ))
+        
+        return reduce(and_, conditions) if conditions else None
+    
+    @staticmethod
+    def _scan(
+        user_id: int,
+        years: Sequence[int],
+        columns: Sequence[str],
+        expression: Optional[pc.Expression],
+        tags: Sequence[str] = (),
+        tag_mode: TagMode = "any"
+    ) -> pa.Table:
+        """Read columns of the rows matching an expression and tags from a user's archive files."""
+        dataset = ArchiveService._dataset(user_id, years)
+        if not tags:
+            return dataset.to_table(columns=list(columns), filter=expression)
+        
+        table = dataset.to_table(columns=[*columns, "tags"], filter=expression)
+        return table.filter(ArchiveService._tag_mask(table["tags"], tags, tag_mode)).select(list(columns))
+    
+    @staticmethod
+    def _dataset(user_id: int, years: Sequence[int]) -> ds.Dataset:
+        """Memory-mapped dataset over a user's archive files of some years."""
+        return ds.dataset(
+            [ArchiveService.path(user_id, year) for year in years],
+            schema=ARCHIVE_SCHEMA, format="parquet", filesystem=_filesystem
+        )
+    
+    @staticmethod
+    def _tag_mask(tags_column, tags: Sequence[str], tag_mode: TagMode) -> pa.Array:
+        """Which rows of a tags column carry any (or all) of some tags."""
+        flat = pc.list_flatten(tags_column)
+        parents = pc.list_parent_indices(tags_column).to_numpy()
+        hits = np.asarray(pc.is_in(flat, value_set=pa.array(sorted(set(tags)), pa.string())))
+        matched = np.bincount(parents[hits], minlength=len(tags_column))
+        needed = len(set(tags)) if tag_mode == "all" else 1
+        return pa.array(matched >= needed)
+    
+    @staticmethod
+    def _group(table: pa.Table) -> List[tuple]:
+        """(category_id, currency, date, total_cents, count) groups of an archive table."""
+        grouped = table.group_by(["category_id", "currency", "date"]).aggregate([
+            ("amount_cents", "sum"), ("amount_cents", "count")
+        ])
+        return list(zip(*(grouped[column].to_pylist() for column in (
+            "category_id", "currency", "date", "amount_cents_sum", "amount_cents_count"
+        ))))
+    
+    @staticmethod
+    def _replace(path: str, table: pa.Table, commit=None) -> None:
+        """
+        Write an archive file aside and swap it in, computing its footer totals.
+        
+        With commit, the swap happens before calling it and is undone if it raises.
+        """
+        table = table.sort_by([("date", "ascending"), ("id", "ascending")])
+        totals = sorted(ArchiveService._group(table), key=itemgetter(2, 0, 1))
+        table = table.replace_schema_metadata({
+            DAILY_TOTALS_KEY: json.dumps([
+                [category_id, currency, day.isoformat(), cents, count]
+                for category_id, currency, day, cents, count in totals
+            ], separators=(",", ":")).encode()
+        })
+        
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        staged = f"{path}.{os.getpid()}.tmp"
+        pq.write_table(table, staged, compression="zstd", row_group_size=ROW_GROUP_SIZE)
+        
+        if commit is None:
+            os.replace(staged, path)
+            return
+        
+        backup = f"{path}.{os.getpid()}.bak"
+        had_previous = os.path.exists(path)
+        if had_previous:
+            os.replace(path, backup)
+        os.replace(staged, path)
+        try:
+            commit()
+        except Exception:
+            if had_previous:
+                os.replace(backup, path)
+            else:
+                os.remove(path)
+            raise
+        if had_previous:
+            os.remove(backup)
+    
+    @staticmethod
+    def _footer(path: str) -> List[DailyTotal]:
+        """Daily totals stored in an archive file's footer, cached until the file changes."""
+        stat = os.stat(path)
+        version = (stat.st_mtime_ns, stat.st_size)
+        with _footers_lock:
+            entry = _footers.get(path)
+            if entry is not None and entry[0] == version:
+                _footers.move_to_end(path)
+                return entry[1]
+        
+        metadata = pq.read_metadata(path, memory_map=True).metadata
+        totals = [
+            DailyTotal(category_id, currency, date.fromisoformat(day), cents, count)
+            for category_id, currency, day, cents, count in json.loads(metadata[DAILY_TOTALS_KEY])
+        ]
+        
+        with _footers_lock:
+            _footers[path] = (version, totals)
+            _footers.move_to_end(path)
+            while len(_footers) > settings.archive_footer_cache_files:
+                _footers.popitem(last=False)
+        
+        return totals
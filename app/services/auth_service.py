@@ -1,7 +1,11 @@
 from sqlalchemy.orm import Session
-from app.models import User
-from app.schemas import UserCreate
+from app.models import User, Expense
+from app.schemas import UserCreate, UserUpdate
 from app.utils import hash_password, verify_password, create_access_token, ConflictException, UnauthorizedException
+from app.services.data_version_service import DataVersionService
+from app.services.fx_service import FxService
+from app.services.budget_service import BudgetService
+from app.services.archive_service import ArchiveService
 from datetime import timedelta
 
 
@@ -31,7 +35,8 @@ class AuthService:
         
         new_user = User(
             email=user_data.email,
-            hashed_password=hashed_password
+            hashed_password=hashed_password,
+            base_currency=user_data.base_currency
         )
         
         db.add(new_user)
@@ -94,3 +99,37 @@ class AuthService:
             User instance if found, None otherwise
         """
         return db.query(User).filter(User.id == user_id).first()
+    
+    @staticmethod
+    def update_user(db: Session, user: User, user_data: UserUpdate) -> User:
+        """
+        Update the current user's settings.
+        
+        Args:
+            db: Database session
+            user: User to update
+            user_data: New settings
+            
+        Returns:
+            Updated user instance
+            
+        Raises:
+            BadRequestException: If existing expenses cannot be converted to
+                the new base currency
+        """
+        if user_data.base_currency != user.base_currency:
+            archived = ArchiveService.get_daily_totals(user.id)
+            currencies = {
+                currency for (currency,) in db.query(Expense.currency).filter(Expense.user_id == user.id).distinct()
+            } | {total.currency for total in archived}
+            for currency in currencies:
+                FxService.ensure_supported(db, currency, user_data.base_currency)
+            
+            user.base_currency = user_data.base_currency
+            BudgetService.rebuild_monthly_spend(db, user.id, user_data.base_currency, archived)
+            # Reports are converted into the base currency, so cached ones are stale.
+            DataVersionService.bump(db, user.id)
+            db.commit()
+            db.refresh(user)
+        
+        return user
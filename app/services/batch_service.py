@@ -0,0 +1,136 @@
+from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session
+from app.models import User
+from app.schemas import BatchSubRequest, BatchSubResponse
+from app.utils import BadRequestException
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlencode
+import asyncio
+import json
+
+FORWARDED_HEADERS = (b"authorization", b"accept-language", b"user-agent")
+
+
+class BatchService:
+    """Service layer for executing several API calls in one HTTP request."""
+    
+    @staticmethod
+    async def execute(
+        request: Request,
+        db: Session,
+        user: User,
+        sub_requests: List[BatchSubRequest]
+    ) -> List[BatchSubResponse]:
+        """
+        Run sub-requests in-process against the application's own routes.
+        
+        Authentication is resolved once by the batch itself and handed to
+        every sub-request. Writes run in order on the batch's shared session.
+        Each run of consecutive GETs runs concurrently, with every GET on its
+        own pooled session because a Session cannot be shared across threads.
+        
+        Args:
+            request: The batch request (for the app, auth and client info)
+            db: Session shared by the batch's write sub-requests
+            user: Authenticated user
+            sub_requests: Calls to execute, in order
+            
+        Returns:
+            One response per sub-request, in request order
+            
+        Raises:
+            BadRequestException: If a sub-request targets the batch endpoint
+        """
+        for sub in sub_requests:
+            if sub.path.rstrip("/") == request.url.path.rstrip("/"):
+                raise BadRequestException(detail="Batch requests cannot be nested")
+        
+        responses: List[Optional[BatchSubResponse]] = [None] * len(sub_requests)
+        index = 0
+        while index < len(sub_requests):
+            if sub_requests[index].method != "GET":
+                responses[index] = await BatchService._dispatch(
+                    request, sub_requests[index], {"db": db, "user": user}
+                )
+                index += 1
+                continue
+            
+            group_end = index
+            while group_end < len(sub_requests) and sub_requests[group_end].method == "GET":
+                group_end += 1
+            
+            # Reads share the user object across threads, so make sure no
+            # attribute is left to lazy-load after an earlier write committed.
+            if inspect(user).expired_attributes:
+                await run_in_threadpool(db.refresh, user)
+            
+            results = await asyncio.gather(*(
+                BatchService._dispatch(request, sub, {"user": user})
+                for sub in sub_requests[index:group_end]
+            ))
+            responses[index:group_end] = results
+            index = group_end
+        
+        return responses
+    
+    @staticmethod
+    async def _dispatch(request: Request, sub: BatchSubRequest, state: Dict[str, Any]) -> BatchSubResponse:
+        """Send one sub-request through the ASGI app and capture its response."""
+        body = b"" if sub.body is None else json.dumps(sub.body).encode()
+        headers = [(key, value) for key, value in request.scope["headers"] if key in FORWARDED_HEADERS]
+        if body:
+            headers.append((b"content-type", b"application/json"))
+            headers.append((b"content-length", str(len(body)).encode()))
+        
+        scope = {
+            "type": "http",
+            "asgi": request.scope.get("asgi", {"version": "3.0"}),
+            "http_version": request.scope.get("http_version", "1.1"),
+            "method": sub.method,
+            "scheme": request.url.scheme,
+            "server": request.scope.get("server"),
+            "client": request.scope.get("client"),
+            "root_path": request.scope.get("root_path", ""),
+            "path": sub.path,
+            "raw_path": sub.path.encode(),
+            "query_string": urlencode(sub.query, doseq=True).encode(),
+            "headers": headers,
+            "state": state,
+        }
+        
+        request_sent = False
+        
+        async def receive() -> Dict[str, Any]:
+            nonlocal request_sent
+            if request_sent:
+                return {"type": "http.disconnect"}
+            request_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        
+        status = 500
+        response_headers: Dict[str, str] = {}
+        chunks: List[bytes] = []
+        
+        async def send(message: Dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                for key, value in message.get("headers", []):
+                    response_headers[key.decode("latin-1")] = value.decode("latin-1")
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+        
+        await request.app(scope, receive, send)
+        
+        raw = b"".join(chunks)
+        content: Any = None
+        if raw:
+            if response_headers.get("content-type", "").startswith("application/json"):
+                content = json.loads(raw)
+            else:
+                content = raw.decode("utf-8", errors="replace")
+        
+        response_headers.pop("content-length", None)
+        return BatchSubResponse(status=status, headers=response_headers, body=content)
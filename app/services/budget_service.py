@@ -0,0 +1,521 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import Date, Select, Subquery, func, literal, or_, select
+from sqlalchemy.dialects import postgresql, sqlite
+from app.models import Budget, BudgetAlert, Category, Expense, MonthlySpend, User
+from app.schemas import BudgetCreate, BudgetUpdate, BudgetStatus
+from app.utils import NotFoundException, ForbiddenException, BadRequestException, ConflictException, from_cents
+from app.services.amount_service import AmountService
+from app.services.data_version_service import DataVersionService
+from app.services.fx_service import FxService, CENTS
+from app.services.live_service import LiveService
+from calendar import monthrange
+from datetime import date, datetime
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Dict, Iterable, List, Optional, Tuple
+
+UPSERT_DIALECTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+class BudgetService:
+    """Service layer for budgets and the monthly spend they are checked against."""
+    
+    @staticmethod
+    def create_budget(db: Session, budget_data: BudgetCreate, user_id: int) -> Budget:
+        """
+        Create a new monthly budget for a user.
+        
+        Args:
+            db: Database session
+            budget_data: Budget creation data
+            user_id: ID of the user creating the budget
+            
+        Returns:
+            Created budget instance
+            
+        Raises:
+            BadRequestException: If category doesn't exist or doesn't belong to user
+            ConflictException: If the user already has a budget for that category
+        """
+        if budget_data.category_id is not None:
+            category = db.query(Category).filter(
+                Category.id == budget_data.category_id, Category.user_id == user_id
+            ).first()
+            if not category:
+                raise BadRequestException(detail="Category not found or does not belong to you")
+        
+        if budget_data.category_id is None:
+            same_scope = Budget.category_id.is_(None)
+        else:
+            same_scope = Budget.category_id == budget_data.category_id
+        existing = db.query(Budget.id).filter(Budget.user_id == user_id, same_scope).first()
+        if existing:
+            raise ConflictException(detail="A budget for this category already exists")
+        
+        new_budget = Budget(
+            user_id=user_id,
+            category_id=budget_data.category_id,
+            amount=budget_data.amount,
+            alert_percent=budget_data.alert_percent
+        )
+        
+        db.add(new_budget)
+        DataVersionService.bump(db, user_id)
+        db.commit()
+        db.refresh(new_budget)
+        
+        return new_budget
+    
+    @staticmethod
+    def get_user_budgets(db: Session, user_id: int) -> List[Budget]:
+        """
+        Retrieve all budgets for a specific user.
+        
+        Args:
+            db: Database session
+            user_id: User ID
+            
+        Returns:
+            List of budget instances
+        """
+        return db.query(Budget).filter(Budget.user_id == user_id).all()
+    
+    @staticmethod
+    def get_budget_by_id(db: Session, budget_id: int, user_id: int) -> Budget:
+        """
+        Retrieve a budget by ID, ensuring it belongs to the user.
+        
+        Args:
+            db: Database session
+            budget_id: Budget ID
+            user_id: User ID for authorization check
+            
+        Returns:
+            Budget instance
+            
+        Raises:
+            NotFoundException: If budget doesn't exist
+            ForbiddenException: If budget doesn't belong to user
+        """
+        budget = db.query(Budget).filter(Budget.id == budget_id).first()
+        
+        if not budget:
+            raise NotFoundException(detail="Budget not found")
+        
+        if budget.user_id != user_id:
+            raise ForbiddenException(detail="Not authorized to access this budget")
+        
+        return budget
+    
+    @staticmethod
+    def update_budget(db: Session, budget_id: int, budget_data: BudgetUpdate, user_id: int) -> Budget:
+        """
+        Update an existing budget.
+        
+        Args:
+            db: Database session
+            budget_id: Budget ID
+            budget_data: Updated budget data
+            user_id: User ID for authorization check
+            
+        Returns:
+            Updated budget instance
+            
+        Raises:
+            NotFoundException: If budget doesn't exist
+            ForbiddenException: If budget doesn't belong to user
+        """
+        budget = BudgetService.get_budget_by_id(db, budget_id, user_id)
+        
+        update_data = budget_data.model_dump(exclude_unset=True)
+        for field, value in update_data.items():
+            setattr(budget, field, value)
+        
+        DataVersionService.bump(db, user_id)
+        db.commit()
+        db.refresh(budget)
+        
+        return budget
+    
+    @staticmethod
+    def delete_budget(db: Session, budget_id: int, user_id: int) -> None:
+        """
+        Delete a budget and its alerts.
+        
+        Args:
+            db: Database session
+            budget_id: Budget ID
+            user_id: User ID for authorization check
+            
+        Raises:
+            NotFoundException: If budget doesn't exist
+            ForbiddenException: If budget doesn't belong to user
+        """
+        budget = BudgetService.get_budget_by_id(db, budget_id, user_id)
+        
+        db.query(BudgetAlert).filter(BudgetAlert.budget_id == budget_id).delete(synchronize_session=False)
+        db.delete(budget)
+        DataVersionService.bump(db, user_id)
+        db.commit()
+    
+    @staticmethod
+    def get_status(
+        db: Session,
+        user: User,
+        year: int,
+        month: int,
+        today: Optional[date] = None
+    ) -> List[BudgetStatus]:
+        """
+        Report every budget's progress in a month.
+        
+        Reads the budgets and the month's pre-aggregated spend rows only, so
+        the cost follows the number of budgets and categories, not expenses.
+        The projection extrapolates the current month's daily pace to its
+        last day; past months project their final spend.
+        
+        Args:
+            db: Database session
+            user: Authenticated user
+            year: Year of the month
+            month: Month (1-12)
+            today: Reference date for projections (defaults to today, UTC)
+            
+        Returns:
+            One BudgetStatus per budget
+        """
+        today = today or datetime.utcnow().date()
+        first_day = date(year, month, 1)
+        days_in_month = monthrange(year, month)[1]
+        
+        budgets = db.query(Budget, Category.name).outerjoin(
+            Category, Budget.category_id == Category.id
+        ).filter(Budget.user_id == user.id).order_by(Budget.id).all()
+        
+        spend = dict(db.query(MonthlySpend.category_id, MonthlySpend.total).filter(
+            MonthlySpend.user_id == user.id,
+            MonthlySpend.month == first_day
+        ))
+        overall = sum(spend.values(), Decimal(0))
+        
+        if (today.year, today.month) == (year, month):
+            pace = Decimal(days_in_month) / Decimal(today.day)
+        else:
+            pace = Decimal(1)
+        
+        statuses = []
+        for budget, category_name in budgets:
+            spent = Decimal(overall if budget.category_id is None else spend.get(budget.category_id, 0))
+            spent = spent.quantize(CENTS)
+            statuses.append(BudgetStatus(
+                budget_id=budget.id,
+                category_id=budget.category_id,
+                category_name=category_name,
+                amount=budget.amount,
+                spent=spent,
+                remaining=budget.amount - spent,
+                projected=(spent * pace).quantize(CENTS, rounding=ROUND_HALF_UP),
+                percent_used=round(float(spent / budget.amount * 100), 1),
+                currency=user.base_currency
+            ))
+        
+        return statuses
+    
+    @staticmethod
+    def get_alerts(db: Session, user_id: int, limit: int = 50) -> List[BudgetAlert]:
+        """
+        Retrieve a user's most recent budget alerts.
+        
+        Args:
+            db: Database session
+            user_id: User ID
+            limit: Maximum number of alerts
+            
+        Returns:
+            Alerts, newest first
+        """
+        return db.query(BudgetAlert).filter(BudgetAlert.user_id == user_id).order_by(
+            BudgetAlert.created_at.desc(), BudgetAlert.id.desc()
+        ).limit(limit).all()
+    
+    @staticmethod
+    def track_expense(
+        db: Session,
+        user_id: int,
+        base_currency: str,
+        category_id: int,
+        day: date,
+        currency: str,
+        amount: Decimal,
+        sign: int
+    ) -> None:
+        """
+        Add (sign=1) or remove (sign=-1) an expense from its month's spend.
+        
+        Called by every expense write in the same transaction. Increases also
+        check the budgets covering the expense and record any threshold the
+        write crossed. The change is also recorded for live report streams.
+        
+        Args:
+            db: Database session
+            user_id: Owner of the expense
+            base_currency: User's base currency
+            category_id: Category of the expense
+            day: Date of the expense
+            currency: Currency of the expense
+            amount: Amount of the expense in its currency
+            sign: 1 when the expense is added, -1 when removed
+            
+        Raises:
+            BadRequestException: If an FX rate needed for conversion is missing
+        """
+        if currency != base_currency:
+            factor = FxService.conversion_factors(db, [(currency, day)], base_currency)[(currency, day)]
+            amount = (amount * factor).quantize(CENTS, rounding=ROUND_HALF_UP)
+        
+        month = day.replace(day=1)
+        BudgetService._add_spend(db, user_id, category_id, month, amount * sign, sign)
+        LiveService.record_spend(db, user_id, category_id, month, amount * sign, sign)
+        
+        if sign > 0:
+            BudgetService._check_thresholds(db, user_id, category_id, month, amount)
+    
+    @staticmethod
+    def track_bulk(db: Session, month: date, expenses: Subquery) -> None:
+        """
+        Add expenses written by a set-based insert to their month's spend.
+        
+        Bulk counterpart of track_expense. Base-currency expenses are summed
+        and upserted in a single statement; foreign-currency ones are
+        converted per currency and date. Budgets of the affected users that
+        are now at or past a threshold without an alert for it get one, and
+        their live report streams reload.
+        
+        Args:
+            db: Database session
+            month: First day of the month all the expenses fall in
+            expenses: Subquery with the user_id, category_id, currency, date
+                and amount of each new expense
+                
+        Raises:
+            BadRequestException: If an FX rate needed for conversion is missing
+        """
+        table = MonthlySpend.__table__
+        in_base_currency = select(
+            expenses.c.user_id,
+            expenses.c.category_id,
+            literal(month, Date),
+            func.sum(expenses.c.amount),
+            func.count()
+        ).join(User, User.id == expenses.c.user_id).where(
+            expenses.c.currency == User.base_currency
+        ).group_by(expenses.c.user_id, expenses.c.category_id)
+        
+        insert = UPSERT_DIALECTS.get(db.get_bind().dialect.name)
+        if insert is not None:
+            statement = insert(table).from_select(
+                ["user_id", "category_id", "month", "total", "expense_count"], in_base_currency
+            )
+            db.execute(statement.on_conflict_do_update(
+                index_elements=[table.c.user_id, table.c.category_id, table.c.month],
+                set_={
+                    "total": table.c.total + statement.excluded.total,
+                    "expense_count": table.c.expense_count + statement.excluded.expense_count,
+                }
+            ))
+        else:
+            for user_id, category_id, _, total, count in db.execute(in_base_currency).all():
+                BudgetService._add_spend(db, user_id, category_id, month, Decimal(total), count)
+        
+        foreign = db.execute(select(
+            expenses.c.user_id,
+            expenses.c.category_id,
+            User.base_currency,
+            expenses.c.currency,
+            expenses.c.date,
+            func.sum(expenses.c.amount),
+            func.count()
+        ).join(User, User.id == expenses.c.user_id).where(
+            expenses.c.currency != User.base_currency
+        ).group_by(
+            expenses.c.user_id, expenses.c.category_id, User.base_currency, expenses.c.currency, expenses.c.date
+        )).all()
+        for user_id, category_id, base_currency, currency, day, total, count in foreign:
+            factor = FxService.conversion_factors(db, [(currency, day)], base_currency)[(currency, day)]
+            amount = (Decimal(total) * factor).quantize(CENTS, rounding=ROUND_HALF_UP)
+            BudgetService._add_spend(db, user_id, category_id, month, amount, count)
+        
+        user_ids = select(expenses.c.user_id).distinct()
+        BudgetService._check_reached_thresholds(db, month, user_ids)
+        LiveService.record_resync(db, db.scalars(user_ids))
+    
+    @staticmethod
+    def remove_category(db: Session, user_id: int, category_id: int) -> None:
+        """Drop the spend rows and budgets of a category that is being deleted."""
+        db.query(MonthlySpend).filter(
+            MonthlySpend.user_id == user_id, MonthlySpend.category_id == category_id
+        ).delete(synchronize_session=False)
+        
+        budget_ids = db.query(Budget.id).filter(Budget.user_id == user_id, Budget.category_id == category_id)
+        db.query(BudgetAlert).filter(BudgetAlert.budget_id.in_(budget_ids.scalar_subquery())).delete(
+            synchronize_session=False
+        )
+        db.query(Budget).filter(Budget.user_id == user_id, Budget.category_id == category_id).delete(
+            synchronize_session=False
+        )
+    
+    @staticmethod
+    def rebuild_monthly_spend(
+        db: Session,
+        user_id: int,
+        base_currency: str,
+        archived: Iterable[Tuple[int, str, date, int, int]] = ()
+    ) -> None:
+        """
+        Recompute a user's monthly spend from their expenses.
+        
+        Needed after the base currency changes and after bulk loads that
+        bypass ExpenseService. Archived expenses are not in the expenses
+        table, so callers pass their totals in. Does not commit.
+        
+        Args:
+            db: Database session
+            user_id: User ID
+            base_currency: Currency to total in
+            archived: The user's archived (category_id, currency, date,
+                total_cents, count) totals, see ArchiveService.get_daily_totals
+                
+        Raises:
+            BadRequestException: If an FX rate needed for conversion is missing
+        """
+        groups = [
+            (group.category_id, group.currency, group.date, AmountService.to_decimal(group.total), group.count)
+            for group in db.query(
+                Expense.category_id,
+                Expense.date,
+                Expense.currency,
+                func.sum(AmountService.column()).label("total"),
+                func.count(Expense.id).label("count")
+            ).filter(Expense.user_id == user_id).group_by(
+                Expense.category_id, Expense.date, Expense.currency
+            )
+        ]
+        groups.extend(
+            (category_id, currency, day, from_cents(total_cents), count)
+            for category_id, currency, day, total_cents, count in archived
+        )
+        
+        factors = FxService.conversion_factors(
+            db, {(currency, day) for _, currency, day, _, _ in groups}, base_currency
+        )
+        
+        totals: Dict[Tuple[int, date], List] = {}
+        for category_id, currency, day, total, count in groups:
+            amount = total * factors[(currency, day)]
+            entry = totals.setdefault((category_id, day.replace(day=1)), [Decimal(0), 0])
+            entry[0] += amount.quantize(CENTS, rounding=ROUND_HALF_UP)
+            entry[1] += count
+        
+        db.query(MonthlySpend).filter(MonthlySpend.user_id == user_id).delete(synchronize_session=False)
+        LiveService.record_resync(db, [user_id])
+        if totals:
+            db.execute(MonthlySpend.__table__.insert(), [
+                {"user_id": user_id, "category_id": category_id, "month": month, "total": total, "expense_count": count}
+                for (category_id, month), (total, count) in totals.items()
+            ])
+    
+    @staticmethod
+    def _add_spend(db: Session, user_id: int, category_id: int, month: date, amount: Decimal, count: int) -> None:
+        """Upsert a delta into a monthly spend row."""
+        table = MonthlySpend.__table__
+        insert = UPSERT_DIALECTS.get(db.get_bind().dialect.name)
+        
+        if insert is not None:
+            statement = insert(table).values(
+                user_id=user_id, category_id=category_id, month=month, total=amount, expense_count=count
+            )
+            db.execute(statement.on_conflict_do_update(
+                index_elements=[table.c.user_id, table.c.category_id, table.c.month],
+                set_={
+                    "total": table.c.total + statement.excluded.total,
+                    "expense_count": table.c.expense_count + statement.excluded.expense_count,
+                }
+            ))
+            return
+        
+        updated = db.execute(table.update().where(
+            table.c.user_id == user_id, table.c.category_id == category_id, table.c.month == month
+        ).values(total=table.c.total + amount, expense_count=table.c.expense_count + count))
+        if not updated.rowcount:
+            db.execute(table.insert().values(
+                user_id=user_id, category_id=category_id, month=month, total=amount, expense_count=count
+            ))
+    
+    @staticmethod
+    def _check_thresholds(db: Session, user_id: int, category_id: int, month: date, amount: Decimal) -> None:
+        """Record alerts for thresholds crossed by adding amount to a month's spend."""
+        budgets = db.query(Budget).filter(
+            Budget.user_id == user_id,
+            or_(Budget.category_id == category_id, Budget.category_id.is_(None))
+        ).all()
+        if not budgets:
+            return
+        
+        for budget in budgets:
+            spent_query = db.query(func.coalesce(func.sum(MonthlySpend.total), 0)).filter(
+                MonthlySpend.user_id == user_id, MonthlySpend.month == month
+            )
+            if budget.category_id is not None:
+                spent_query = spent_query.filter(MonthlySpend.category_id == budget.category_id)
+            spent = Decimal(str(spent_query.scalar()))
+            
+            for threshold in sorted({budget.alert_percent, 100}):
+                limit = budget.amount * threshold / 100
+                if spent - amount < limit <= spent:
+                    already_raised = db.query(BudgetAlert.id).filter(
+                        BudgetAlert.budget_id == budget.id,
+                        BudgetAlert.month == month,
+                        BudgetAlert.threshold_percent == threshold
+                    ).first()
+                    if not already_raised:
+                        db.add(BudgetAlert(
+                            user_id=user_id,
+                            budget_id=budget.id,
+                            month=month,
+                            threshold_percent=threshold,
+                            spent=spent
+                        ))
+    
+    @staticmethod
+    def _check_reached_thresholds(db: Session, month: date, user_ids: Select) -> None:
+        """Record missing alerts for thresholds the users' budgets have reached in a month."""
+        budgets = db.query(Budget).filter(Budget.user_id.in_(user_ids)).all()
+        if not budgets:
+            return
+        
+        spend: Dict[Tuple[int, int], Decimal] = {}
+        overall: Dict[int, Decimal] = {}
+        for user_id, category_id, total in db.query(
+            MonthlySpend.user_id, MonthlySpend.category_id, MonthlySpend.total
+        ).filter(MonthlySpend.month == month, MonthlySpend.user_id.in_({budget.user_id for budget in budgets})):
+            spend[(user_id, category_id)] = Decimal(total)
+            overall[user_id] = overall.get(user_id, Decimal(0)) + Decimal(total)
+        
+        raised = set(db.query(BudgetAlert.budget_id, BudgetAlert.threshold_percent).filter(
+            BudgetAlert.month == month,
+            BudgetAlert.budget_id.in_([budget.id for budget in budgets])
+        ).all())
+        
+        for budget in budgets:
+            if budget.category_id is None:
+                spent = overall.get(budget.user_id, Decimal(0))
+            else:
+                spent = spend.get((budget.user_id, budget.category_id), Decimal(0))
+            for threshold in sorted({budget.alert_percent, 100}):
+                if (budget.id, threshold) not in raised and spent >= budget.amount * threshold / 100:
+                    db.add(BudgetAlert(
+                        user_id=budget.user_id,
+                        budget_id=budget.id,
+                        month=month,
+                        threshold_percent=threshold,
+                        spent=spent
+                    ))
@@ -0,0 +1,274 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+from app.models import Category, CategoryTerm, Expense, User
+from app.schemas import CategorySuggestionRow
+from app.services.budget_service import UPSERT_DIALECTS
+from app.config import get_settings
+from collections import Counter, OrderedDict
+from itertools import chain
+from typing import Dict, Iterable, List, Tuple
+import re
+import threading
+import unicodedata
+import numpy as np
+
+settings = get_settings()
+
+# Term of the row counting a category's expenses; terms() never yields it.
+DOCUMENTS = ""
+TERM_LENGTH = 64
+SMOOTHING = 1.0
+# Rows per multi-row upsert, kept under SQLite's bound parameter limit.
+UPSERT_CHUNK = 500
+
+# Words of two or more letters, truncated to TERM_LENGTH.
+_WORD = re.compile(r"([^\W\d_]{2,%d})[^\W\d_]*" % TERM_LENGTH)
+
+
+def words(description: str) -> List[str]:
+    """Case-folded words of a description, ignoring numbers and single letters."""
+    return _WORD.findall(unicodedata.normalize("NFKC", description).casefold())
+
+
+def terms(description: str) -> Counter:
+    """Count the words of a description."""
+    return Counter(words(description))
+
+
+class CategoryModel:
+    """
+    A user's multinomial naive Bayes model over description terms.
+    
+    log_likelihoods holds log P(term | category) with one row per known term
+    and one column per category, so scoring a batch of descriptions is a
+    gather of rows followed by a segmented sum.
+    """
+    
+    def __init__(
+        self,
+        category_ids: np.ndarray,
+        category_names: Dict[int, str],
+        documents: np.ndarray,
+        term_index: Dict[str, int],
+        term_counts: np.ndarray
+    ):
+        self.category_ids = category_ids
+        self.category_names = category_names
+        self.term_index = term_index
+        self.log_prior = np.log(documents / documents.sum()) if len(documents) else documents
+        totals = term_counts.sum(axis=0)
+        self.log_likelihoods = np.log(term_counts + SMOOTHING) - np.log(totals + SMOOTHING * len(term_index))
+    
+    def predict(self, descriptions: List[str]) -> List[CategorySuggestionRow]:
+        """Most probable category of each description; terms the model has not seen are ignored."""
+        index = self.term_index
+        rows = [[index[term] for term in words(description) if term in index] for description in descriptions]
+        suggestions = [{"category_id": None, "category_name": None, "confidence": None} for _ in rows]
+        
+        lengths = np.fromiter(map(len, rows), dtype=np.int64, count=len(rows))
+        known = np.flatnonzero(lengths)
+        if not len(known):
+            return suggestions
+        
+        flat = np.fromiter(chain.from_iterable(rows), dtype=np.int64, count=int(lengths.sum()))
+        offsets = np.concatenate(([0], np.cumsum(lengths[known])[:-1]))
+        scores = np.add.reduceat(self.log_likelihoods[flat], offsets, axis=0) + self.log_prior
+        
+        best = scores.argmax(axis=1)
+        confidence = 1 / np.exp(scores - scores[np.arange(len(known)), best][:, None]).sum(axis=1)
+        
+        for row, choice, probability in zip(known, best, confidence):
+            category_id = int(self.category_ids[choice])
+            suggestions[row] = {
+                "category_id": category_id,
+                "category_name": self.category_names.get(category_id),
+                "confidence": round(float(probability), 4)
+            }
+        return suggestions
+
+
+_cache: "OrderedDict[int, Tuple[int, CategoryModel]]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+class CategorizerService:
+    """
+    Category suggestions from a per-user naive Bayes model of descriptions.
+    
+    The model's term counts live in category_terms and are adjusted inside
+    each expense write's transaction, so it learns from every create, update
+    and delete without retraining. Occurrences of recurring expenses are left
+    out until their rule is deleted. Loaded models are cached per user and
+    validated against the user's data version.
+    """
+    
+    @staticmethod
+    def suggest(db: Session, user: User, descriptions: List[str]) -> List[CategorySuggestionRow]:
+        """
+        Suggest a category for each description.
+        
+        Args:
+            db: Database session
+            user: Authenticated user
+            descriptions: Expense descriptions
+            
+        Returns:
+            One suggestion per description, in order
+        """
+        return CategorizerService.get_model(db, user).predict(descriptions)
+    
+    @staticmethod
+    def get_model(db: Session, user: User) -> CategoryModel:
+        """
+        Return a user's cached model, loading it if it is missing or stale.
+        
+        Args:
+            db: Database session
+            user: Authenticated user
+            
+        Returns:
+            The user's category model
+        """
+        with _cache_lock:
+            entry = _cache.get(user.id)
+            if entry is not None and entry[0] == user.data_version:
+                _cache.move_to_end(user.id)
+                return entry[1]
+        
+        model = CategorizerService._load_model(db, user.id)
+        
+        with _cache_lock:
+            _cache[user.id] = (user.data_version, model)
+            _cache.move_to_end(user.id)
+            while len(_cache) > settings.categorizer_cache_users:
+                _cache.popitem(last=False)
+        
+        return model
+    
+    @staticmethod
+    def _load_model(db: Session, user_id: int) -> CategoryModel:
+        """Build a user's model from their term counts with a single query."""
+        rows = db.query(CategoryTerm.category_id, CategoryTerm.term, CategoryTerm.occurrences).filter(
+            CategoryTerm.user_id == user_id
+        ).all()
+        
+        category_ids = np.array(sorted({row[0] for row in rows if row[1] == DOCUMENTS}), dtype=np.int64)
+        columns = {int(category_id): position for position, category_id in enumerate(category_ids)}
+        documents = np.zeros(len(category_ids))
+        term_index: Dict[str, int] = {}
+        cells: List[Tuple[int, int, int]] = []
+        
+        for category_id, term, count in rows:
+            if term == DOCUMENTS:
+                documents[columns[category_id]] = count
+            elif category_id in columns:
+                cells.append((term_index.setdefault(term, len(term_index)), columns[category_id], count))
+        
+        term_counts = np.zeros((len(term_index), len(category_ids)))
+        if cells:
+            term_rows, term_columns, counts = zip(*cells)
+            term_counts[term_rows, term_columns] = counts
+        
+        names = dict(db.query(Category.id, Category.name).filter(Category.user_id == user_id))
+        return CategoryModel(category_ids, names, documents, term_index, term_counts)
+    
+    @staticmethod
+    def learn(db: Session, user_id: int, category_id: int, description: str, weight: int) -> None:
+        """
+        Add (weight 1) or remove (weight -1) an expense's description in the model.
+        
+        Does not commit.
+        
+        Args:
+            db: Database session
+            user_id: Owner of the expense
+            category_id: Category of the expense
+            description: Description of the expense
+            weight: Number of expenses to add, negative to remove
+        """
+        CategorizerService.learn_many(db, user_id, [(category_id, description, weight)])
+    
+    @staticmethod
+    def learn_many(db: Session, user_id: int, documents: Iterable[Tuple[int, str, int]]) -> None:
+        """
+        Apply several (category_id, description, weight) changes with one upsert.
+        
+        Rows whose occurrences drop to zero are deleted so the model stays compact.
+        Does not commit.
+        
+        Args:
+            db: Database session
+            user_id: Owner of the expenses
+            documents: (category_id, description, weight) tuples
+        """
+        deltas: Counter = Counter()
+        for category_id, description, weight in documents:
+            deltas[(category_id, DOCUMENTS)] += weight
+            for term, count in terms(description).items():
+                deltas[(category_id, term)] += count * weight
+        
+        rows = [
+            {"user_id": user_id, "category_id": category_id, "term": term, "occurrences": delta}
+            for (category_id, term), delta in deltas.items() if delta
+        ]
+        if not rows:
+            return
+        
+        table = CategoryTerm.__table__
+        insert = UPSERT_DIALECTS.get(db.get_bind().dialect.name)
+        if insert is not None:
+            for start in range(0, len(rows), UPSERT_CHUNK):
+                statement = insert(table).values(rows[start:start + UPSERT_CHUNK])
+                db.execute(statement.on_conflict_do_update(
+                    index_elements=[table.c.user_id, table.c.category_id, table.c.term],
+                    set_={"occurrences": table.c.occurrences + statement.excluded.occurrences}
+                ))
+        else:
+            for row in rows:
+                updated = db.execute(table.update().where(
+                    table.c.user_id == user_id,
+                    table.c.category_id == row["category_id"],
+                    table.c.term == row["term"]
+                ).values(occurrences=table.c.occurrences + row["occurrences"]))
+                if not updated.rowcount:
+                    db.execute(table.insert().values(**row))
+        
+        if any(row["occurrences"] < 0 for row in rows):
+            db.execute(table.delete().where(
+                table.c.user_id == user_id,
+                table.c.category_id.in_({row["category_id"] for row in rows}),
+                table.c.occurrences <= 0
+            ))
+    
+    @staticmethod
+    def remove_category(db: Session, user_id: int, category_id: int) -> None:
+        """
+        Drop a category from the model ahead of deleting it. Does not commit.
+        
+        Args:
+            db: Database session
+            user_id: Owner of the category
+            category_id: Category being deleted
+        """
+        db.query(CategoryTerm).filter(
+            CategoryTerm.user_id == user_id, CategoryTerm.category_id == category_id
+        ).delete(synchronize_session=False)
+    
+    @staticmethod
+    def rebuild(db: Session, user_id: int) -> None:
+        """
+        Recompute a user's term counts from their expenses. Does not commit.
+        
+        Only needed after loading expenses without going through
+        ExpenseService, e.g. with scripts.generate_data.
+        
+        Args:
+            db: Database session
+            user_id: User to rebuild
+        """
+        db.query(CategoryTerm).filter(CategoryTerm.user_id == user_id).delete(synchronize_session=False)
+        CategorizerService.learn_many(db, user_id, db.query(
+            Expense.category_id, Expense.description, func.count()
+        ).filter(
+            Expense.user_id == user_id, Expense.recurring_id.is_(None)
+        ).group_by(Expense.category_id, Expense.description))
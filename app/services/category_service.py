@@ -1,8 +1,32 @@
-from sqlalchemy.orm import Session
-from app.models import Category
-from app.schemas import CategoryCreate, CategoryUpdate
-from app.utils import NotFoundException, ForbiddenException
-from typing import List
+from sqlalchemy.orm import Session, aliased, join
+from sqlalchemy import Date, and_, case, delete, func, insert, select, true, type_coerce, update
+from app.models import Category, CategoryClosure, Expense, RecurringExpense, User
+from app.schemas import CategoryCreate, CategoryUpdate, CategoryResponse, CategoryRow, CategoryStatsRow
+from app.utils import NotFoundException, ForbiddenException, BadRequestException, from_cents
+from app.services.data_version_service import DataVersionService
+from app.services.sync_service import SyncService, CATEGORY_ENTITY, EXPENSE_ENTITY
+from app.services.budget_service import BudgetService
+from app.services.categorizer_service import CategorizerService
+from app.services.tag_service import TagService
+from app.services.amount_service import AmountService
+from app.services.fx_service import FxService
+from app.services.archive_service import ArchiveService
+from app.services.live_service import LiveService
+from app.config import get_settings
+from collections import OrderedDict
+from itertools import chain
+from typing import Dict, List, Optional, Sequence, Tuple
+from datetime import datetime
+from decimal import Decimal
+import threading
+
+settings = get_settings()
+
+CATEGORY_ROW_FIELDS = tuple(CategoryResponse.model_fields)
+CATEGORY_STATS_FIELDS = ("expense_count", "total_amount", "currency", "last_expense_date")
+
+_stats_cache: "OrderedDict[int, Tuple[Tuple[int, str, str], List[CategoryStatsRow]]]" = OrderedDict()
+_stats_cache_lock = threading.Lock()
 
 
 class CategoryService:
@@ -20,14 +44,28 @@ class CategoryService:
             
         Returns:
             Created category instance
+            
+        Raises:
+            BadRequestException: If the parent doesn't exist or doesn't belong to user
         """
+        if category_data.parent_id is not None:
+            CategoryService._check_parent(db, category_data.parent_id, user_id)
+        
         new_category = Category(
             name=category_data.name,
             description=category_data.description,
+            parent_id=category_data.parent_id,
             user_id=user_id
         )
         
         db.add(new_category)
+        db.flush()
+        db.execute(insert(CategoryClosure).values(
+            ancestor_id=new_category.id, descendant_id=new_category.id, depth=0
+        ))
+        CategoryService._attach_subtree(db, new_category.id, new_category.parent_id)
+        LiveService.record_category(db, user_id, new_category)
+        DataVersionService.bump(db, user_id)
         db.commit()
         db.refresh(new_category)
         
@@ -47,6 +85,151 @@ class CategoryService:
         """
         return db.query(Category).filter(Category.user_id == user_id).all()
     
+    @staticmethod
+    def get_user_category_rows(
+        db: Session,
+        user_id: int,
+        fields: Sequence[str] = CATEGORY_ROW_FIELDS
+    ) -> List[CategoryRow]:
+        """
+        Retrieve a user's categories as plain dicts of response fields.
+        
+        Only the requested columns are selected; no ORM instances are built.
+        
+        Args:
+            db: Database session
+            user_id: User ID
+            fields: Response fields to load, in output order
+            
+        Returns:
+            List of category rows keyed by response field name
+        """
+        query = db.query(*(getattr(Category, field) for field in fields)).filter(
+            Category.user_id == user_id
+        )
+        return [dict(zip(fields, row)) for row in query]
+    
+    @staticmethod
+    def get_user_category_stats_rows(
+        db: Session,
+        user: User,
+        fields: Sequence[str] = CATEGORY_ROW_FIELDS
+    ) -> List[CategoryStatsRow]:
+        """
+        Retrieve a user's categories with their expense count, total and
+        last expense date, as plain dicts.
+        
+        The statistics of all categories come from one query and are cached
+        per user. Cache entries carry the user's data version, which every
+        expense or category write bumps, and the FX rate table's version, so
+        a write or a rate reload makes the next request recompute them.
+        
+        Args:
+            db: Database session
+            user: Authenticated user
+            fields: Category fields to return, in output order; the
+                statistics are always included
+                
+        Returns:
+            List of category rows with statistics in the user's base currency
+            
+        Raises:
+            BadRequestException: If an FX rate needed for conversion is missing
+        """
+        version = (user.data_version, user.base_currency, FxService.rate_table(db).version)
+        with _stats_cache_lock:
+            entry = _stats_cache.get(user.id)
+            if entry is not None and entry[0] == version:
+                _stats_cache.move_to_end(user.id)
+                rows = entry[1]
+            else:
+                rows = None
+        
+        if rows is None:
+            rows = CategoryService._load_stats_rows(db, user.id, user.base_currency)
+            with _stats_cache_lock:
+                _stats_cache[user.id] = (version, rows)
+                _stats_cache.move_to_end(user.id)
+                while len(_stats_cache) > settings.category_stats_cache_users:
+                    _stats_cache.popitem(last=False)
+        
+        if len(fields) == len(CATEGORY_ROW_FIELDS):
+            return rows
+        keys = (*fields, *CATEGORY_STATS_FIELDS)
+        return [{key: row[key] for key in keys} for row in rows]
+    
+    @staticmethod
+    def _load_stats_rows(db: Session, user_id: int, base_currency: str) -> List[CategoryStatsRow]:
+        """
+        Aggregate a user's expenses per category with a single LEFT JOIN / GROUP BY.
+        
+        Base-currency expenses collapse into one group per category; only
+        foreign-currency ones are also grouped by date, which their
+        conversion needs. Archived expenses are added from the daily totals
+        in their files' footers.
+        """
+        day = type_coerce(case((Expense.currency == base_currency, None), else_=Expense.date), Date)
+        columns = [getattr(Category, field) for field in CATEGORY_ROW_FIELDS]
+        groups = db.query(
+            *columns,
+            Expense.currency,
+            day.label("day"),
+            func.sum(AmountService.column()).label("total"),
+            func.count(Expense.id).label("count"),
+            func.max(Expense.date).label("last_date")
+        ).outerjoin(
+            # The user filter in the ON clause lets the join use the
+            # (user_id, category_id, date) index instead of scanning expenses.
+            Expense, and_(Expense.user_id == user_id, Expense.category_id == Category.id)
+        ).filter(
+            Category.user_id == user_id
+        ).group_by(
+            *columns, Expense.currency, day
+        ).order_by(Category.id).all()
+        
+        known = {group.id for group in groups}
+        archived = [total for total in ArchiveService.get_daily_totals(user_id) if total.category_id in known]
+        
+        totals = FxService.convert_totals(
+            db,
+            chain(
+                (
+                    (group.id, group.currency, group.day, AmountService.to_decimal(group.total))
+                    for group in groups if group.currency is not None
+                ),
+                (
+                    (total.category_id, total.currency, total.date, from_cents(total.total_cents))
+                    for total in archived
+                )
+            ),
+            base_currency
+        )
+        
+        rows: Dict[int, CategoryStatsRow] = {}
+        for group in groups:
+            row = rows.get(group.id)
+            if row is None:
+                row = rows[group.id] = dict(zip(CATEGORY_ROW_FIELDS, group))
+                row.update(
+                    expense_count=0,
+                    total_amount=totals.get(group.id, Decimal("0.00")),
+                    currency=base_currency,
+                    last_expense_date=None
+                )
+            row["expense_count"] += group.count
+            if group.last_date is not None and (
+                row["last_expense_date"] is None or group.last_date > row["last_expense_date"]
+            ):
+                row["last_expense_date"] = group.last_date
+        
+        for total in archived:
+            row = rows[total.category_id]
+            row["expense_count"] += total.count
+            if row["last_expense_date"] is None or total.date > row["last_expense_date"]:
+                row["last_expense_date"] = total.date
+        
+        return list(rows.values())
+    
     @staticmethod
     def get_category_by_id(db: Session, category_id: int, user_id: int) -> Category:
         """
@@ -84,6 +267,8 @@ class CategoryService:
         """
         Update an existing category.
         
+        Changing parent_id moves the category with its whole subtree.
+        
         Args:
             db: Database session
             category_id: Category ID
@@ -96,13 +281,32 @@ class CategoryService:
         Raises:
             NotFoundException: If category doesn't exist
             ForbiddenException: If category doesn't belong to user
+            BadRequestException: If the new parent doesn't belong to user, or is
+                the category itself or one of its descendants
         """
         category = CategoryService.get_category_by_id(db, category_id, user_id)
         
         update_data = category_data.model_dump(exclude_unset=True)
+        parent_id = update_data.pop("parent_id", category.parent_id)
+        
+        if parent_id != category.parent_id:
+            if parent_id is not None:
+                CategoryService._check_parent(db, parent_id, user_id)
+                inside = db.query(CategoryClosure.depth).filter(
+                    CategoryClosure.ancestor_id == category.id, CategoryClosure.descendant_id == parent_id
+                ).first()
+                if inside:
+                    raise BadRequestException(detail="A category cannot be moved under itself or its subcategories")
+            
+            CategoryService._detach_subtree(db, category.id)
+            CategoryService._attach_subtree(db, category.id, parent_id)
+            category.parent_id = parent_id
+        
         for field, value in update_data.items():
             setattr(category, field, value)
         
+        LiveService.record_category(db, user_id, category)
+        DataVersionService.bump(db, user_id)
         db.commit()
         db.refresh(category)
         
@@ -111,7 +315,10 @@ class CategoryService:
     @staticmethod
     def delete_category(db: Session, category_id: int, user_id: int) -> None:
         """
-        Delete a category.
+        Delete a category. Its subcategories move up to its parent.
+        
+        The category's archived expenses are dropped from the archive files
+        once the deletion is committed.
         
         Args:
             db: Database session
@@ -124,5 +331,79 @@ class CategoryService:
         """
         category = CategoryService.get_category_by_id(db, category_id, user_id)
         
+        SyncService.record_category_expense_deletions(db, user_id, category_id)
+        SyncService.record_deletions(
+            db, user_id, EXPENSE_ENTITY, ArchiveService.category_expense_ids(user_id, category_id)
+        )
+        SyncService.record_deletions(db, user_id, CATEGORY_ENTITY, [category_id])
+        BudgetService.remove_category(db, user_id, category_id)
+        CategorizerService.remove_category(db, user_id, category_id)
+        TagService.remove_expenses(db, select(Expense.id).where(Expense.category_id == category_id))
+        db.query(RecurringExpense).filter(RecurringExpense.category_id == category_id).delete(
+            synchronize_session=False
+        )
+        CategoryService._remove_from_tree(db, category)
         db.delete(category)
+        LiveService.record_category_deleted(db, user_id, category)
+        DataVersionService.bump(db, user_id)
         db.commit()
+        ArchiveService.remove_category(user_id, category_id)
+    
+    @staticmethod
+    def _check_parent(db: Session, parent_id: int, user_id: int) -> None:
+        """Ensure a prospective parent category exists and belongs to the user."""
+        parent = db.query(Category.id).filter(Category.id == parent_id, Category.user_id == user_id).first()
+        if not parent:
+            raise BadRequestException(detail="Parent category not found or does not belong to you")
+    
+    @staticmethod
+    def _attach_subtree(db: Session, category_id: int, parent_id: Optional[int]) -> None:
+        """
+        Link a subtree below a parent with one INSERT ... SELECT: every
+        ancestor of the parent (itself included) becomes an ancestor of
+        every node of the subtree.
+        """
+        if parent_id is None:
+            return
+        
+        above = aliased(CategoryClosure)
+        below = aliased(CategoryClosure)
+        db.execute(insert(CategoryClosure).from_select(
+            ["ancestor_id", "descendant_id", "depth"],
+            select(above.ancestor_id, below.descendant_id, above.depth + below.depth + 1).select_from(
+                join(above, below, true())
+            ).where(above.descendant_id == parent_id, below.ancestor_id == category_id)
+        ))
+    
+    @staticmethod
+    def _detach_subtree(db: Session, category_id: int) -> None:
+        """Unlink a subtree from all its ancestors, keeping the paths inside it."""
+        subtree = select(CategoryClosure.descendant_id).where(CategoryClosure.ancestor_id == category_id)
+        db.execute(delete(CategoryClosure).where(
+            CategoryClosure.descendant_id.in_(subtree),
+            CategoryClosure.ancestor_id.not_in(subtree)
+        ).execution_options(synchronize_session=False))
+    
+    @staticmethod
+    def _remove_from_tree(db: Session, category: Category) -> None:
+        """
+        Take a category out of the tree ahead of deleting it. Its children are
+        re-parented to its parent, so paths through it shorten by one.
+        """
+        descendants = select(CategoryClosure.descendant_id).where(
+            CategoryClosure.ancestor_id == category.id, CategoryClosure.depth > 0
+        )
+        ancestors = select(CategoryClosure.ancestor_id).where(
+            CategoryClosure.descendant_id == category.id, CategoryClosure.depth > 0
+        )
+        db.execute(update(CategoryClosure).where(
+            CategoryClosure.descendant_id.in_(descendants), CategoryClosure.ancestor_id.in_(ancestors)
+        ).values(depth=CategoryClosure.depth - 1).execution_options(synchronize_session=False))
+        db.execute(delete(CategoryClosure).where(
+            (CategoryClosure.ancestor_id == category.id) | (CategoryClosure.descendant_id == category.id)
+        ).execution_options(synchronize_session=False))
+        
+        db.query(Category).filter(Category.parent_id == category.id).update(
+            {Category.parent_id: category.parent_id, Category.updated_at: datetime.utcnow()},
+            synchronize_session=False
+        )
@@ -0,0 +1,58 @@
+from sqlalchemy.orm import Session
+from app.models import User
+import hashlib
+
+
+class DataVersionService:
+    """Service layer for per-user data versions used to validate cached responses."""
+    
+    @staticmethod
+    def bump(db: Session, user_id: int) -> None:
+        """
+        Increment a user's data version inside the current transaction.
+        
+        Must be called by every write to the user's expenses or categories,
+        before the commit, so the new version becomes visible atomically
+        with the change.
+        
+        Args:
+            db: Database session
+            user_id: User whose data changed
+        """
+        db.query(User).filter(User.id == user_id).update(
+            {User.data_version: User.data_version + 1},
+            synchronize_session=False
+        )
+    
+    @staticmethod
+    def bump_many(db: Session, user_ids) -> None:
+        """
+        Increment the data version of several users in one statement.
+        
+        Args:
+            db: Database session
+            user_ids: Iterable of user IDs or a SELECT returning them
+        """
+        db.query(User).filter(User.id.in_(user_ids)).update(
+            {User.data_version: User.data_version + 1},
+            synchronize_session=False
+        )
+    
+    @staticmethod
+    def make_etag(user_id: int, data_version: int, resource: str, fx_version: str = "") -> str:
+        """
+        Build a weak ETag for a user-scoped representation.
+        
+        Args:
+            user_id: Owner of the data
+            data_version: User's current data version
+            resource: Canonical identifier of the representation (path and query)
+            fx_version: Version of the FX rates amounts are converted with
+            
+        Returns:
+            Weak ETag header value
+        """
+        digest = hashlib.blake2b(
+            f"{user_id}:{data_version}:{fx_version}:{resource}".encode(), digest_size=12
+        ).hexdigest()
+        return f'W/"{digest}"'
@@ -0,0 +1,148 @@
+from sqlalchemy.orm import Query
+from app.models import Expense
+from app.schemas import ExpenseFilter
+from app.utils import BadRequestException, to_cents
+from app.services.tag_service import TagService
+
+# Columns each sort key orders by. Every one follows user_id in an index,
+# and id breaks ties so that the order is stable and still index-ordered.
+SORT_COLUMNS = {
+    "date": Expense.date,
+    "amount": Expense.amount_cents,
+    "updated_at": Expense.updated_at,
+}
+
+
+class ExpenseFilterService:
+    """
+    Compiles an ExpenseFilter into SQL over a user's expenses.
+    
+    Predicates are plain column comparisons that line up with an index
+    following user_id: (user_id, date), (user_id, category_id, date),
+    (user_id, amount_cents) and (user_id, updated_at), plus the expense_tags
+    primary key for tags. Amounts are compared in integer cents, which every
+    row carries. The description prefix and the created_at window have no
+    index; they are only accepted next to an indexed predicate, so they are
+    evaluated on rows that predicate already narrowed instead of on every
+    expense of the user.
+    """
+    
+    @staticmethod
+    def validate(expense_filter: ExpenseFilter) -> None:
+        """
+        Reject contradictory ranges and filters that would scan all of a user's expenses.
+        
+        Args:
+            expense_filter: Filter to check
+            
+        Raises:
+            BadRequestException: If a range is empty, or only unindexed
+                predicates are given
+        """
+        for low, high, name in (
+            (expense_filter.from_date, expense_filter.to_date, "from_date must not be after to_date"),
+            (expense_filter.min_amount, expense_filter.max_amount, "min_amount must not exceed max_amount"),
+            (expense_filter.created_from, expense_filter.created_to, "created_from must not be after created_to"),
+            (expense_filter.updated_from, expense_filter.updated_to, "updated_from must not be after updated_to"),
+        ):
+            if low is not None and high is not None and low > high:
+                raise BadRequestException(detail=name)
+        
+        unindexed = (
+            expense_filter.description_prefix is not None
+            or expense_filter.created_from is not None
+            or expense_filter.created_to is not None
+        )
+        if unindexed and not ExpenseFilterService.is_indexed(expense_filter):
+            raise BadRequestException(
+                detail="description_prefix and created_from/created_to must be combined with a date, "
+                "category, amount, updated_at or tag filter"
+            )
+    
+    @staticmethod
+    def is_indexed(expense_filter: ExpenseFilter) -> bool:
+        """Whether the filter has a predicate an index can seek to."""
+        return any((
+            expense_filter.from_date is not None,
+            expense_filter.to_date is not None,
+            expense_filter.category_ids,
+            expense_filter.min_amount is not None,
+            expense_filter.max_amount is not None,
+            expense_filter.updated_from is not None,
+            expense_filter.updated_to is not None,
+            expense_filter.tags,
+        ))
+    
+    @staticmethod
+    def apply(query: Query, user_id: int, expense_filter: ExpenseFilter) -> Query:
+        """
+        Restrict an expense query to a user's expenses matching a filter.
+        
+        Args:
+            query: Query over Expense
+            user_id: User ID
+            expense_filter: Filter to apply
+            
+        Returns:
+            The filtered query, without ordering
+            
+        Raises:
+            BadRequestException: If the filter is rejected by validate
+        """
+        ExpenseFilterService.validate(expense_filter)
+        
+        query = query.filter(Expense.user_id == user_id)
+        
+        if expense_filter.from_date is not None:
+            query = query.filter(Expense.date >= expense_filter.from_date)
+        
+        if expense_filter.to_date is not None:
+            query = query.filter(Expense.date <= expense_filter.to_date)
+        
+        if len(expense_filter.category_ids) == 1:
+            query = query.filter(Expense.category_id == expense_filter.category_ids[0])
+        elif expense_filter.category_ids:
+            query = query.filter(Expense.category_id.in_(expense_filter.category_ids))
+        
+        if expense_filter.min_amount is not None:
+            query = query.filter(Expense.amount_cents >= to_cents(expense_filter.min_amount))
+        
+        if expense_filter.max_amount is not None:
+            query = query.filter(Expense.amount_cents <= to_cents(expense_filter.max_amount))
+        
+        if expense_filter.updated_from is not None:
+            query = query.filter(Expense.updated_at >= expense_filter.updated_from)
+        
+        if expense_filter.updated_to is not None:
+            query = query.filter(Expense.updated_at <= expense_filter.updated_to)
+        
+        if expense_filter.created_from is not None:
+            query = query.filter(Expense.created_at >= expense_filter.created_from)
+        
+        if expense_filter.created_to is not None:
+            query = query.filter(Expense.created_at <= expense_filter.created_to)
+        
+        if expense_filter.description_prefix is not None:
+            query = query.filter(Expense.description.istartswith(expense_filter.description_prefix, autoescape=True))
+        
+        if expense_filter.tags:
+            query = TagService.filter_expenses(query, user_id, expense_filter.tags, expense_filter.tag_mode)
+        
+        return query
+    
+    @staticmethod
+    def order(query: Query, expense_filter: ExpenseFilter) -> Query:
+        """
+        Order an expense query by the filter's sort key, with id as tie-breaker.
+        
+        Args:
+            query: Query over Expense
+            expense_filter: Filter holding the sort key
+            
+        Returns:
+            The ordered query
+        """
+        key = expense_filter.sort.lstrip("-")
+        if expense_filter.sort.startswith("-"):
+            return query.order_by(SORT_COLUMNS[key].desc(), Expense.id.desc())
+        return query.order_by(SORT_COLUMNS[key], Expense.id)
@@ -1,17 +1,36 @@
 from sqlalchemy.orm import Session
 from sqlalchemy import and_
-from app.models import Expense, Category
-from app.schemas import ExpenseCreate, ExpenseUpdate
-from app.utils import NotFoundException, ForbiddenException, BadRequestException
-from typing import List, Optional
-from datetime import date
+from sqlalchemy.exc import IntegrityError
+from app.models import Expense, Category, User
+from app.schemas import (
+    ExpenseCreate, ExpenseUpdate, ExpenseResponse, ExpenseWithCategory, ExpenseRow, ExpenseFilter, DuplicatePolicy
+)
+from app.utils import NotFoundException, ForbiddenException, BadRequestException, ConflictException
+from app.services.data_version_service import DataVersionService
+from app.services.amount_service import AmountService
+from app.services.fx_service import FxService
+from app.services.budget_service import BudgetService
+from app.services.categorizer_service import CategorizerService
+from app.services.tag_service import TagService
+from app.services.expense_filter_service import ExpenseFilterService, SORT_COLUMNS
+from app.services.archive_service import ArchiveService, MERGE_KEYS
+from app.services.sync_service import SyncService, EXPENSE_ENTITY
+from typing import List, Optional, Sequence
+
+EXPENSE_ROW_FIELDS = tuple(ExpenseResponse.model_fields)
 
 
 class ExpenseService:
     """Service layer for expense management."""
     
     @staticmethod
-    def create_expense(db: Session, expense_data: ExpenseCreate, user_id: int) -> Expense:
+    def create_expense(
+        db: Session,
+        expense_data: ExpenseCreate,
+        user_id: int,
+        idempotency_key: Optional[str] = None,
+        on_duplicate: DuplicatePolicy = "flag"
+    ) -> Expense:
         """
         Create a new expense for a user.
         
@@ -19,13 +38,75 @@ class ExpenseService:
             db: Database session
             expense_data: Expense creation data
             user_id: ID of the user creating the expense
-            
+            idempotency_key: Optional client key; repeating it returns the first expense
+            on_duplicate: "flag" sets duplicate_of on a probable duplicate,
+                "reject" refuses it
+                
         Returns:
-            Created expense instance
+            Created expense instance, or the one created earlier with the same key
             
         Raises:
             BadRequestException: If category doesn't exist or doesn't belong to user
+            ConflictException: If the expense is a rejected duplicate, or the key
+                was used for a different expense
+        """
+        try:
+            new_expense = ExpenseService.add_expense(db, expense_data, user_id, idempotency_key, on_duplicate)
+            db.commit()
+        except IntegrityError:
+            # A concurrent request with the same key committed first.
+            db.rollback()
+            if idempotency_key is None:
+                raise
+            new_expense = ExpenseService._find_by_idempotency_key(db, expense_data, user_id, idempotency_key)
+            if new_expense is None:
+                raise
+        
+        db.refresh(new_expense)
+        
+        return new_expense
+    
+    @staticmethod
+    def add_expense(
+        db: Session,
+        expense_data: ExpenseCreate,
+        user_id: int,
+        idempotency_key: Optional[str] = None,
+        on_duplicate: DuplicatePolicy = "flag"
+    ) -> Expense:
         """
+        Validate a new expense and stage it in the current transaction.
+        
+        Does not commit, so several expenses can share one transaction
+        (see GroupCommitter). Duplicate detection is one probe of the
+        (user_id, fingerprint) index. Expenses of the same user staged
+        earlier in the transaction are flushed first so the probes see them.
+        
+        Args:
+            db: Database session
+            expense_data: Expense creation data
+            user_id: ID of the user creating the expense
+            idempotency_key: Optional client key; repeating it returns the first expense
+            on_duplicate: "flag" sets duplicate_of on a probable duplicate,
+                "reject" refuses it
+                
+        Returns:
+            Pending expense instance, or the one created earlier with the same key
+            
+        Raises:
+            BadRequestException: If category doesn't exist or doesn't belong to user,
+                or the currency cannot be converted to the user's base currency
+            ConflictException: If the expense is a rejected duplicate, or the key
+                was used for a different expense
+        """
+        if any(isinstance(staged, Expense) and staged.user_id == user_id for staged in db.new):
+            db.flush()
+        
+        if idempotency_key is not None:
+            existing = ExpenseService._find_by_idempotency_key(db, expense_data, user_id, idempotency_key)
+            if existing is not None:
+                return existing
+        
         category = db.query(Category).filter(
             and_(Category.id == expense_data.category_id, Category.user_id == user_id)
         ).first()
@@ -33,53 +114,150 @@ class ExpenseService:
         if not category:
             raise BadRequestException(detail="Category not found or does not belong to you")
         
+        base_currency = db.query(User.base_currency).filter(User.id == user_id).scalar()
+        currency = expense_data.currency or base_currency
+        FxService.ensure_supported(db, currency, base_currency)
+        
         new_expense = Expense(
             amount=expense_data.amount,
+            currency=currency,
             date=expense_data.date,
             description=expense_data.description,
             category_id=expense_data.category_id,
-            user_id=user_id
+            user_id=user_id,
+            idempotency_key=idempotency_key
         )
         
+        duplicate_of = db.query(Expense.id).filter(
+            Expense.user_id == user_id, Expense.fingerprint == new_expense.fingerprint
+        ).order_by(Expense.id).limit(1).scalar()
+        
+        if duplicate_of is not None and on_duplicate == "reject":
+            raise ConflictException(detail=f"Probable duplicate of expense {duplicate_of}")
+        new_expense.duplicate_of = duplicate_of
+        
+        if expense_data.tags:
+            new_expense.tags = TagService.resolve_tags(db, user_id, expense_data.tags)
+        
         db.add(new_expense)
-        db.commit()
-        db.refresh(new_expense)
+        BudgetService.track_expense(
+            db, user_id, base_currency, new_expense.category_id, new_expense.date,
+            currency, new_expense.amount, 1
+        )
+        CategorizerService.learn(db, user_id, new_expense.category_id, new_expense.description, 1)
+        DataVersionService.bump(db, user_id)
         
         return new_expense
     
+    @staticmethod
+    def _find_by_idempotency_key(
+        db: Session,
+        expense_data: ExpenseCreate,
+        user_id: int,
+        idempotency_key: str
+    ) -> Optional[Expense]:
+        """Return the expense created earlier with an idempotency key, if any."""
+        existing = db.query(Expense).filter(
+            Expense.user_id == user_id, Expense.idempotency_key == idempotency_key
+        ).first()
+        
+        if existing is not None:
+            requested = expense_data.model_dump(exclude_none=True, exclude={"tags"})
+            if any(getattr(existing, field) != value for field, value in requested.items()) or (
+                sorted(set(expense_data.tags)) != [tag.name for tag in existing.tags]
+            ):
+                raise ConflictException(detail="Idempotency-Key was already used for a different expense")
+        
+        return existing
+    
     @staticmethod
     def get_user_expenses(
         db: Session,
         user_id: int,
-        from_date: Optional[date] = None,
-        to_date: Optional[date] = None,
-        category_id: Optional[int] = None
+        expense_filter: Optional[ExpenseFilter] = None
     ) -> List[Expense]:
         """
         Retrieve expenses for a user with optional filters.
         
+        Archived expenses are not included; lists read them through
+        get_user_expense_rows.
+        
         Args:
             db: Database session
             user_id: User ID
-            from_date: Optional filter for expenses from this date
-            to_date: Optional filter for expenses up to this date
-            category_id: Optional filter for specific category
+            expense_filter: Optional filters and sort order (newest first by default)
             
         Returns:
             List of expense instances
+            
+        Raises:
+            BadRequestException: If the filter is contradictory or would scan
+                all of the user's expenses
+        """
+        expense_filter = expense_filter or ExpenseFilter()
+        query = ExpenseFilterService.apply(db.query(Expense), user_id, expense_filter)
+        return ExpenseFilterService.order(query, expense_filter).all()
+    
+    @staticmethod
+    def get_user_expense_rows(
+        db: Session,
+        user_id: int,
+        expense_filter: Optional[ExpenseFilter] = None,
+        fields: Sequence[str] = EXPENSE_ROW_FIELDS,
+        include_category: bool = False
+    ) -> List[ExpenseRow]:
         """
-        query = db.query(Expense).filter(Expense.user_id == user_id)
+        Retrieve expenses for a user as plain dicts of response fields.
         
-        if from_date:
-            query = query.filter(Expense.date >= from_date)
+        Selects only the requested columns as tuples, so no ORM instances
+        are built. Filters and ordering match get_user_expenses. Archived
+        expenses in the filter's date range are read from their files and
+        merged in by the sort key.
         
-        if to_date:
-            query = query.filter(Expense.date <= to_date)
+        Args:
+            db: Database session
+            user_id: User ID
+            expense_filter: Optional filters and sort order (newest first by default)
+            fields: Response fields to load, in output order
+            include_category: Add category_name, joined in the same query
+            
+        Returns:
+            List of expense rows keyed by response field name
+            
+        Raises:
+            BadRequestException: If the filter is contradictory or would scan
+                all of the user's expenses
+        """
+        expense_filter = expense_filter or ExpenseFilter()
+        columns = [
+            AmountService.column() if field == "amount" else getattr(Expense, field)
+            for field in fields
+        ]
+        keys = tuple(fields)
+        if include_category:
+            columns.append(Category.name)
+            keys += ("category_name",)
+        
+        years = ArchiveService.years(user_id, expense_filter.from_date, expense_filter.to_date)
+        if years:
+            columns += [SORT_COLUMNS[expense_filter.sort.lstrip("-")], Expense.id]
+            keys += MERGE_KEYS
         
-        if category_id:
-            query = query.filter(Expense.category_id == category_id)
+        query = db.query(*columns)
+        if include_category:
+            query = query.join(Category, Expense.category_id == Category.id)
         
-        return query.order_by(Expense.date.desc()).all()
+        query = ExpenseFilterService.apply(query, user_id, expense_filter)
+        rows = [dict(zip(keys, row)) for row in ExpenseFilterService.order(query, expense_filter)]
+        rows = AmountService.rows_to_decimal(rows)
+        if not years:
+            return rows
+        
+        names = None
+        if include_category:
+            names = dict(db.query(Category.id, Category.name).filter(Category.user_id == user_id))
+        archived = ArchiveService.get_expense_rows(user_id, years, expense_filter, fields, names)
+        return ArchiveService.merge_expense_rows(rows, archived, expense_filter)
     
     @staticmethod
     def get_expense_by_id(db: Session, expense_id: int, user_id: int) -> Expense:
@@ -108,6 +286,39 @@ class ExpenseService:
         
         return expense
     
+    @staticmethod
+    def get_expense_with_category(db: Session, expense_id: int, user_id: int) -> ExpenseWithCategory:
+        """
+        Retrieve an expense and its category name with a single joined query.
+        
+        Args:
+            db: Database session
+            expense_id: Expense ID
+            user_id: User ID for authorization check
+            
+        Returns:
+            ExpenseWithCategory for the expense
+            
+        Raises:
+            NotFoundException: If expense doesn't exist
+            ForbiddenException: If expense doesn't belong to user
+        """
+        result = db.query(Expense, Category.name).join(
+            Category, Expense.category_id == Category.id
+        ).filter(Expense.id == expense_id).first()
+        
+        if not result:
+            raise NotFoundException(detail="Expense not found")
+        
+        expense, category_name = result
+        if expense.user_id != user_id:
+            raise ForbiddenException(detail="Not authorized to access this expense")
+        
+        return ExpenseWithCategory(
+            **ExpenseResponse.model_validate(expense).model_dump(),
+            category_name=category_name
+        )
+    
     @staticmethod
     def update_expense(
         db: Session,
@@ -130,7 +341,8 @@ class ExpenseService:
         Raises:
             NotFoundException: If expense doesn't exist
             ForbiddenException: If expense doesn't belong to user
-            BadRequestException: If new category doesn't belong to user
+            BadRequestException: If new category doesn't belong to user, or the
+                new currency cannot be converted to the user's base currency
         """
         expense = ExpenseService.get_expense_by_id(db, expense_id, user_id)
         
@@ -144,14 +356,79 @@ class ExpenseService:
             if not category:
                 raise BadRequestException(detail="Category not found or does not belong to you")
         
+        base_currency = db.query(User.base_currency).filter(User.id == user_id).scalar()
+        if update_data.get("currency") is not None:
+            FxService.ensure_supported(db, update_data["currency"], base_currency)
+        
+        tracked = ("category_id", "date", "currency", "amount")
+        before = tuple(getattr(expense, field) for field in tracked)
+        learned = (expense.category_id, expense.description)
+        
         for field, value in update_data.items():
             setattr(expense, field, value)
         
+        after = tuple(getattr(expense, field) for field in tracked)
+        if after != before:
+            BudgetService.track_expense(db, user_id, base_currency, *before, -1)
+            BudgetService.track_expense(db, user_id, base_currency, *after, 1)
+        
+        if expense.recurring_id is None and (expense.category_id, expense.description) != learned:
+            CategorizerService.learn_many(db, user_id, [
+                (*learned, -1), (expense.category_id, expense.description, 1)
+            ])
+        
+        DataVersionService.bump(db, user_id)
         db.commit()
         db.refresh(expense)
         
         return expense
     
+    @staticmethod
+    def get_expense_tags(db: Session, expense_id: int, user_id: int) -> List[str]:
+        """
+        Retrieve the tag names of an expense.
+        
+        Args:
+            db: Database session
+            expense_id: Expense ID
+            user_id: User ID for authorization check
+            
+        Returns:
+            Tag names in alphabetical order
+            
+        Raises:
+            NotFoundException: If expense doesn't exist
+            ForbiddenException: If expense doesn't belong to user
+        """
+        expense = ExpenseService.get_expense_by_id(db, expense_id, user_id)
+        return [tag.name for tag in expense.tags]
+    
+    @staticmethod
+    def set_expense_tags(db: Session, expense_id: int, names: Sequence[str], user_id: int) -> List[str]:
+        """
+        Replace the tags of an expense, creating tags that don't exist yet.
+        
+        Args:
+            db: Database session
+            expense_id: Expense ID
+            names: Normalized tag names; empty removes all tags
+            user_id: User ID for authorization check
+            
+        Returns:
+            Tag names in alphabetical order
+            
+        Raises:
+            NotFoundException: If expense doesn't exist
+            ForbiddenException: If expense doesn't belong to user
+        """
+        expense = ExpenseService.get_expense_by_id(db, expense_id, user_id)
+        
+        expense.tags = TagService.resolve_tags(db, user_id, names)
+        DataVersionService.bump(db, user_id)
+        db.commit()
+        
+        return [tag.name for tag in expense.tags]
+    
     @staticmethod
     def delete_expense(db: Session, expense_id: int, user_id: int) -> None:
         """
@@ -168,5 +445,15 @@ class ExpenseService:
         """
         expense = ExpenseService.get_expense_by_id(db, expense_id, user_id)
         
+        base_currency = db.query(User.base_currency).filter(User.id == user_id).scalar()
+        BudgetService.track_expense(
+            db, user_id, base_currency, expense.category_id, expense.date,
+            expense.currency, expense.amount, -1
+        )
+        if expense.recurring_id is None:
+            CategorizerService.learn(db, user_id, expense.category_id, expense.description, -1)
+        TagService.remove_expenses(db, [expense.id])
         db.delete(expense)
+        SyncService.record_deletions(db, user_id, EXPENSE_ENTITY, [expense_id])
+        DataVersionService.bump(db, user_id)
         db.commit()
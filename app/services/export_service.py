@@ -0,0 +1,232 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import Select, select
+from app.models import Expense
+from app.schemas import ExpenseFilter, ExportFormat
+from app.services.expense_filter_service import ExpenseFilterService
+from app.services.archive_service import ArchiveService
+from app.config import get_settings
+from datetime import date
+from typing import Any, Iterable, Iterator, List, Mapping, Optional
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+settings = get_settings()
+
+AMOUNT_TYPE = pa.decimal128(12, 2)
+
+# Columns of an export. Amounts are exact decimals, as in the JSON API.
+EXPORT_SCHEMA = pa.schema([
+    ("id", pa.int64()),
+    ("user_id", pa.int64()),
+    ("date", pa.date32()),
+    ("amount", AMOUNT_TYPE),
+    ("currency", pa.string()),
+    ("description", pa.string()),
+    ("category_id", pa.int64()),
+    ("created_at", pa.timestamp("us")),
+    ("updated_at", pa.timestamp("us")),
+])
+
+# Columns read from archive files; amounts come as integer cents there and
+# from the database alike.
+SOURCE_COLUMNS = ("id", "date", "amount_cents", "currency", "description", "category_id", "created_at", "updated_at")
+
+EXPORT_MEDIA_TYPES = {
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+EXPORT_EXTENSIONS = {
+    "arrow": "arrows",
+    "parquet": "parquet",
+}
+
+
+def decimal_amounts(cents: np.ndarray) -> pa.Array:
+    """
+    Exact decimal amounts from integer cents, without building Decimal objects.
+    
+    A decimal128 value is stored as its unscaled integer in 16 little-endian
+    bytes, so each amount is its cents in the low word and their sign in the
+    high word.
+    """
+    cents = np.asarray(cents, dtype=np.int64)
+    words = np.empty((len(cents), 2), dtype="<i8")
+    words[:, 0] = cents
+    words[:, 1] = cents >> 63
+    return pa.Array.from_buffers(AMOUNT_TYPE, len(cents), [None, pa.py_buffer(words)])
+
+
+class _ChunkSink:
+    """Write-only file object collecting what a writer produced since the last drain."""
+    
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.position = 0
+        self.closed = False
+    
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+    
+    def tell(self) -> int:
+        return self.position
+    
+    def flush(self) -> None:
+        pass
+    
+    def close(self) -> None:
+        self.closed = True
+    
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+class ExportService:
+    """
+    Columnar exports of expenses as Arrow IPC streams or Parquet files.
+    
+    Database rows are fetched through a streaming cursor in chunks of
+    export_batch_size and turned straight into record batches, without ORM
+    instances or Decimal objects. Archived expenses are streamed from their
+    files in batches of the same size. Each batch is encoded and sent before
+    the next one is read, so memory stays bounded by the batch size however
+    many rows are exported.
+    """
+    
+    @staticmethod
+    def iter_user_batches(
+        db: Session,
+        user_id: int,
+        expense_filter: ExpenseFilter,
+        batch_size: Optional[int] = None
+    ) -> Iterator[pa.RecordBatch]:
+        """
+        Record batches of a user's expenses matching a filter.
+        
+        Archived expenses come first, then the database rows in the filter's
+        order. The filter must have passed ExpenseFilterService.validate.
+        
+        Args:
+            db: Database session
+            user_id: Owner of the expenses
+            expense_filter: Filters of GET /expenses
+            batch_size: Rows per batch (defaults to export_batch_size)
+            
+        Yields:
+            Record batches with EXPORT_SCHEMA
+        """
+        batch_size = batch_size or settings.export_batch_size
+        for batch in ArchiveService.iter_batches(user_id, expense_filter, SOURCE_COLUMNS, batch_size):
+            yield ExportService._archived_batch(batch, user_id)
+        
+        query = ExpenseFilterService.apply(db.query(*ExportService._columns()), user_id, expense_filter)
+        yield from ExportService._database_batches(
+            db, ExpenseFilterService.order(query, expense_filter).statement, batch_size
+        )
+    
+    @staticmethod
+    def iter_all_batches(
+        db: Session,
+        from_date: Optional[date] = None,
+        to_date: Optional[date] = None,
+        batch_size: Optional[int] = None
+    ) -> Iterator[pa.RecordBatch]:
+        """
+        Record batches of every user's expenses in a date range.
+        
+        Archived expenses come first, user by user, then the database rows
+        ordered by user, date and id.
+        
+        Args:
+            db: Database session
+            from_date: Only expenses from this date
+            to_date: Only expenses up to this date
+            batch_size: Rows per batch (defaults to export_batch_size)
+            
+        Yields:
+            Record batches with EXPORT_SCHEMA
+        """
+        batch_size = batch_size or settings.export_batch_size
+        date_filter = ExpenseFilter(from_date=from_date, to_date=to_date)
+        for user_id in ArchiveService.user_ids():
+            for batch in ArchiveService.iter_batches(user_id, date_filter, SOURCE_COLUMNS, batch_size):
+                yield ExportService._archived_batch(batch, user_id)
+        
+        statement = select(*ExportService._columns())
+        if from_date is not None:
+            statement = statement.where(Expense.date >= from_date)
+        if to_date is not None:
+            statement = statement.where(Expense.date <= to_date)
+        yield from ExportService._database_batches(
+            db, statement.order_by(Expense.user_id, Expense.date, Expense.id), batch_size
+        )
+    
+    @staticmethod
+    def stream(batches: Iterable[pa.RecordBatch], export_format: ExportFormat) -> Iterator[bytes]:
+        """
+        Encode record batches and yield the bytes written after each one.
+        
+        Arrow output is an IPC stream; Parquet output gets one zstd-compressed
+        row group per batch and its footer at the end.
+        
+        Args:
+            batches: Record batches with EXPORT_SCHEMA
+            export_format: "arrow" or "parquet"
+            
+        Yields:
+            Consecutive chunks of the encoded file
+        """
+        sink = _ChunkSink()
+        output = pa.PythonFile(sink, mode="w")
+        if export_format == "parquet":
+            writer = pq.ParquetWriter(output, EXPORT_SCHEMA, compression="zstd")
+        else:
+            writer = pa.ipc.new_stream(output, EXPORT_SCHEMA)
+        
+        try:
+            for batch in batches:
+                writer.write_batch(batch)
+                chunk = sink.drain()
+                if chunk:
+                    yield chunk
+        finally:
+            writer.close()
+        yield sink.drain()
+    
+    @staticmethod
+    def _columns() -> list:
+        """Expense columns selected for an export: user_id, then SOURCE_COLUMNS."""
+        return [Expense.user_id, *(getattr(Expense, column) for column in SOURCE_COLUMNS)]
+    
+    @staticmethod
+    def _database_batches(db: Session, statement: Select, batch_size: int) -> Iterator[pa.RecordBatch]:
+        """Turn each chunk fetched by a streaming cursor into a record batch."""
+        names = ("user_id", *SOURCE_COLUMNS)
+        result = db.execute(statement.execution_options(yield_per=batch_size))
+        for rows in result.partitions():
+            yield ExportService._batch(dict(zip(names, zip(*rows))))
+    
+    @staticmethod
+    def _archived_batch(batch: pa.RecordBatch, user_id: int) -> pa.RecordBatch:
+        """Convert a record batch read from a user's archive to EXPORT_SCHEMA."""
+        columns = {name: batch.column(name) for name in SOURCE_COLUMNS}
+        columns["user_id"] = pa.array(np.full(batch.num_rows, user_id, dtype=np.int64))
+        columns["amount_cents"] = columns["amount_cents"].to_numpy()
+        return ExportService._batch(columns)
+    
+    @staticmethod
+    def _batch(columns: Mapping[str, Any]) -> pa.RecordBatch:
+        """Build an export batch from Arrow arrays or Python sequences keyed by source column."""
+        arrays = []
+        for field in EXPORT_SCHEMA:
+            if field.name == "amount":
+                arrays.append(decimal_amounts(columns["amount_cents"]))
+                continue
+            values = columns[field.name]
+            arrays.append(values if isinstance(values, pa.Array) else pa.array(values, field.type))
+        return pa.record_batch(arrays, schema=EXPORT_SCHEMA)
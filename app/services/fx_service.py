@@ -0,0 +1,200 @@
+from sqlalchemy.orm import Session
+from app.models import FxRate
+from app.utils import BadRequestException
+from app.config import get_settings
+from bisect import bisect_right
+from datetime import date
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Dict, FrozenSet, Hashable, Iterable, List, Optional, Tuple
+import hashlib
+import threading
+import time
+
+settings = get_settings()
+
+CENTS = Decimal("0.01")
+
+
+def _bucket(day: date) -> int:
+    """Month bucket index of a date."""
+    return day.year * 12 + day.month - 1
+
+
+class RateTable:
+    """
+    In-memory copy of fx_rates indexed by currency and month bucket.
+    
+    A lookup bisects a single month of dates instead of a currency's whole
+    history. Days without a rate (weekends, holidays, dates after the last
+    load) use the latest earlier rate.
+    
+    ``version`` is a digest of all rates. It changes whenever a loaded rate
+    does, so ETags and caches of converted amounts include it.
+    """
+    
+    def __init__(self, rows: Iterable[Tuple[str, date, Decimal]]):
+        buckets: Dict[str, Dict[int, Tuple[List[date], List[Decimal]]]] = {}
+        digest = hashlib.blake2b(digest_size=8)
+        for currency, rate_date, rate in sorted(rows):
+            days, rates = buckets.setdefault(currency, {}).setdefault(_bucket(rate_date), ([], []))
+            days.append(rate_date)
+            rates.append(Decimal(rate))
+            digest.update(f"{currency}:{rate_date}:{Decimal(rate).normalize()};".encode())
+        
+        self.buckets = buckets
+        self.bucket_keys = {currency: sorted(months) for currency, months in buckets.items()}
+        self.currencies: FrozenSet[str] = frozenset(buckets)
+        self.version = digest.hexdigest()
+        self.loaded_at = time.monotonic()
+    
+    def rate(self, currency: str, day: date) -> Optional[Decimal]:
+        """Rate in effect for a currency on a day, or None if there is none yet."""
+        months = self.buckets.get(currency)
+        if months is None:
+            return None
+        
+        bucket = _bucket(day)
+        entry = months.get(bucket)
+        if entry is not None:
+            position = bisect_right(entry[0], day)
+            if position:
+                return entry[1][position - 1]
+        
+        # Fall back to the last rate of the closest earlier month.
+        keys = self.bucket_keys[currency]
+        position = bisect_right(keys, bucket - 1)
+        if not position:
+            return None
+        return months[keys[position - 1]][1][-1]
+
+
+_rate_table: Optional[RateTable] = None
+_rate_table_lock = threading.Lock()
+
+
+class FxService:
+    """Service layer for currency conversion against the local FX rate table."""
+    
+    @staticmethod
+    def rate_table(db: Session) -> RateTable:
+        """
+        Return the cached rate table, reloading it once it is older than
+        ``fx_cache_ttl_seconds``.
+        
+        Args:
+            db: Database session used when the table has to be (re)loaded
+            
+        Returns:
+            The in-memory rate table
+        """
+        global _rate_table
+        table = _rate_table
+        if table is not None and time.monotonic() - table.loaded_at < settings.fx_cache_ttl_seconds:
+            return table
+        
+        with _rate_table_lock:
+            if _rate_table is None or _rate_table is table:
+                _rate_table = RateTable(db.query(FxRate.currency, FxRate.rate_date, FxRate.rate))
+            return _rate_table
+    
+    @staticmethod
+    def invalidate() -> None:
+        """Drop the cached rate table so the next lookup reloads it."""
+        global _rate_table
+        with _rate_table_lock:
+            _rate_table = None
+    
+    @staticmethod
+    def ensure_supported(db: Session, currency: str, base_currency: str) -> None:
+        """
+        Check that amounts in a currency can be converted to a base currency.
+        
+        Args:
+            db: Database session
+            currency: Currency of the amount
+            base_currency: Currency it will be reported in
+            
+        Raises:
+            BadRequestException: If either currency has no FX rates
+        """
+        if currency == base_currency:
+            return
+        
+        known = FxService.rate_table(db).currencies
+        for code in (currency, base_currency):
+            if code not in known:
+                raise BadRequestException(detail=f"No FX rates available for {code}")
+    
+    @staticmethod
+    def convert_totals(
+        db: Session,
+        totals: Iterable[Tuple[Hashable, str, date, Decimal]],
+        base_currency: str
+    ) -> Dict[Hashable, Decimal]:
+        """
+        Convert pre-aggregated amounts into a base currency and sum them per key.
+        
+        Callers group amounts in SQL by (key, currency, date) first, so the
+        number of conversions follows the number of distinct currency-days
+        rather than the number of expenses. Each rate is looked up once per
+        call.
+        
+        Args:
+            db: Database session
+            totals: (key, currency, date, amount) tuples
+            base_currency: Currency to convert into
+            
+        Returns:
+            Converted total per key, rounded to cents
+            
+        Raises:
+            BadRequestException: If a rate is missing for a currency and date
+        """
+        factors: Dict[Tuple[str, date], Decimal] = {}
+        sums: Dict[Hashable, Decimal] = {}
+        
+        for key, currency, day, amount in totals:
+            if currency != base_currency:
+                factor = factors.get((currency, day))
+                if factor is None:
+                    factor = factors[(currency, day)] = FxService.conversion_factors(
+                        db, [(currency, day)], base_currency
+                    )[(currency, day)]
+                amount = amount * factor
+            sums[key] = sums.get(key, Decimal(0)) + amount
+        
+        return {key: total.quantize(CENTS, rounding=ROUND_HALF_UP) for key, total in sums.items()}
+    
+    @staticmethod
+    def conversion_factors(
+        db: Session,
+        pairs: Iterable[Tuple[str, date]],
+        base_currency: str
+    ) -> Dict[Tuple[str, date], Decimal]:
+        """
+        Look up the factor converting each (currency, date) into a base currency.
+        
+        Args:
+            db: Database session
+            pairs: Distinct (currency, date) pairs to convert
+            base_currency: Currency to convert into
+            
+        Returns:
+            Multiplier per pair
+            
+        Raises:
+            BadRequestException: If a rate is missing for a currency and date
+        """
+        table = FxService.rate_table(db)
+        factors: Dict[Tuple[str, date], Decimal] = {}
+        for currency, day in pairs:
+            if currency == base_currency:
+                factors[(currency, day)] = Decimal(1)
+                continue
+            source = table.rate(currency, day)
+            target = table.rate(base_currency, day)
+            if source is None or target is None:
+                missing = currency if source is None else base_currency
+                raise BadRequestException(detail=f"No FX rate for {missing} on or before {day}")
+            factors[(currency, day)] = target / source
+        return factors
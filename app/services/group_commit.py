@@ -0,0 +1,180 @@
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.exc import SQLAlchemyError
+from app.models import Expense
+from app.schemas import ExpenseCreate, DuplicatePolicy
+from app.services.expense_service import ExpenseService
+from app.database import SessionLocal
+from app.config import get_settings
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import List, Optional
+import logging
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+@dataclass
+class _PendingExpense:
+    expense_data: ExpenseCreate
+    user_id: int
+    idempotency_key: Optional[str] = None
+    on_duplicate: DuplicatePolicy = "flag"
+    future: Future = field(default_factory=Future)
+
+
+class GroupCommitter:
+    """
+    Coalesces concurrent expense inserts into shared transactions.
+    
+    Callers block until the transaction holding their row has committed.
+    A background thread collects requests for at most ``max_delay`` seconds
+    or ``max_batch`` items, writes them with a single commit and releases
+    each caller with its own row or error. At high insert rates this pays
+    for one fsync per batch instead of one per expense.
+    """
+    
+    def __init__(self, session_factory: sessionmaker, max_delay: float, max_batch: int):
+        self.session_factory = session_factory
+        self.max_delay = max_delay
+        self.max_batch = max_batch
+        self._queue: queue.Queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="expense-group-commit", daemon=True)
+        self._thread.start()
+    
+    def submit(
+        self,
+        expense_data: ExpenseCreate,
+        user_id: int,
+        idempotency_key: Optional[str] = None,
+        on_duplicate: DuplicatePolicy = "flag"
+    ) -> Expense:
+        """
+        Queue an expense and wait until it is committed.
+        
+        Args:
+            expense_data: Expense creation data
+            user_id: ID of the user creating the expense
+            idempotency_key: Optional client key; repeating it returns the first expense
+            on_duplicate: How a probable duplicate is handled (see ExpenseService)
+            
+        Returns:
+            Committed expense instance (detached, attributes loaded)
+            
+        Raises:
+            BadRequestException: If category doesn't exist or doesn't belong to user
+            ConflictException: If the expense is a rejected duplicate, or the key
+                was used for a different expense
+        """
+        pending = _PendingExpense(expense_data, user_id, idempotency_key, on_duplicate)
+        self._queue.put(pending)
+        return pending.future.result()
+    
+    def shutdown(self) -> None:
+        """Flush queued expenses and stop the background thread."""
+        self._queue.put(_STOP)
+        self._thread.join()
+    
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            
+            batch = [item]
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            
+            try:
+                self._commit_batch(batch)
+            except Exception:
+                logger.exception("Group commit of %d expenses failed", len(batch))
+                self._commit_individually(batch)
+    
+    def _commit_batch(self, batch: List[_PendingExpense]) -> None:
+        remaining = batch
+        while remaining:
+            failed = None
+            with self.session_factory(expire_on_commit=False) as db:
+                accepted = []
+                for pending in remaining:
+                    try:
+                        accepted.append((pending, ExpenseService.add_expense(
+                            db, pending.expense_data, pending.user_id, pending.idempotency_key, pending.on_duplicate
+                        )))
+                    except SQLAlchemyError:
+                        # A failed flush may come from a row staged for an earlier
+                        # item (e.g. an Idempotency-Key race) and leaves the
+                        # transaction unusable, so every item is retried on its own.
+                        raise
+                    except Exception as exc:
+                        # The rejected expense may be partly staged already, so the
+                        # transaction is discarded and the others are staged again.
+                        pending.future.set_exception(exc)
+                        failed = pending
+                        break
+                
+                if failed is None:
+                    db.commit()
+            
+            if failed is None:
+                for pending, expense in accepted:
+                    pending.future.set_result(expense)
+                return
+            remaining = [pending for pending in remaining if pending is not failed]
+    
+    def _commit_individually(self, batch: List[_PendingExpense]) -> None:
+        for pending in batch:
+            if pending.future.done():
+                continue
+            try:
+                with self.session_factory(expire_on_commit=False) as db:
+                    expense = ExpenseService.create_expense(
+                        db, pending.expense_data, pending.user_id, pending.idempotency_key, pending.on_duplicate
+                    )
+                pending.future.set_result(expense)
+            except Exception as exc:
+                pending.future.set_exception(exc)
+
+
+_committer: Optional[GroupCommitter] = None
+_committer_lock = threading.Lock()
+
+
+def get_group_committer() -> GroupCommitter:
+    """Return the process-wide GroupCommitter, starting it on first use."""
+    global _committer
+    with _committer_lock:
+        if _committer is None:
+            settings = get_settings()
+            _committer = GroupCommitter(
+                SessionLocal,
+                settings.group_commit_max_delay_ms / 1000,
+                settings.group_commit_max_batch
+            )
+        return _committer
+
+
+def shutdown_group_committer() -> None:
+    """Flush and stop the GroupCommitter if it was started."""
+    global _committer
+    with _committer_lock:
+        if _committer is not None:
+            _committer.shutdown()
+            _committer = None
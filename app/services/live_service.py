@@ -0,0 +1,528 @@
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+from app.models import Category, User
+from app.schemas import CategoryDelta, CategorySummary, LiveMonthlyDelta, LiveMonthlySnapshot
+from app.config import get_settings
+from datetime import date
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import asyncio
+import json
+import logging
+import select
+import threading
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+CHANNEL = "expense_live"
+
+# PostgreSQL refuses NOTIFY payloads of 8000 bytes or more.
+MAX_PAYLOAD_BYTES = 7900
+
+# Messages a stream may fall behind by before it is sent a fresh snapshot instead.
+SUBSCRIBER_QUEUE_SIZE = 256
+
+_CHANGES_KEY = "live_changes"
+_MESSAGES_KEY = "live_messages"
+
+# Queued in place of messages a subscriber missed.
+RESYNC = {"resync": True}
+
+Message = dict
+
+
+class _Changes:
+    """What a transaction changed for one user, collected until it commits."""
+    
+    def __init__(self):
+        self.spend: Dict[Tuple[int, date], List] = {}
+        self.categories: Dict[int, Tuple[str, Optional[int]]] = {}
+        self.deleted_categories: Dict[int, Optional[int]] = {}
+        self.resync = False
+    
+    def __bool__(self) -> bool:
+        return bool(
+            self.resync or self.categories or self.deleted_categories
+            or any(amount or count for amount, count in self.spend.values())
+        )
+    
+    def message(self, user_id: int, version: int) -> Message:
+        return {
+            "user_id": user_id,
+            "version": version,
+            "resync": self.resync,
+            "spend": [
+                [category_id, month.isoformat(), str(amount), count]
+                for (category_id, month), (amount, count) in self.spend.items()
+                if amount or count
+            ],
+            "categories": [[category_id, *category] for category_id, category in self.categories.items()],
+            "deleted_categories": [list(deleted) for deleted in self.deleted_categories.items()],
+        }
+
+
+class _Subscription:
+    """A stream's queue of messages for one user, bound to the stream's event loop."""
+    
+    def __init__(self, user_id: int, loop: asyncio.AbstractEventLoop):
+        self.user_id = user_id
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(SUBSCRIBER_QUEUE_SIZE)
+    
+    def put(self, message: Message) -> None:
+        """Queue a message; runs on the subscriber's loop."""
+        if self.queue.full():
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            message = RESYNC
+        self.queue.put_nowait(message)
+    
+    async def get(self, timeout: float) -> Optional[Message]:
+        """Next message, or None if none arrived within timeout seconds."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class LiveBroker:
+    """In-process fan-out of user messages to the streams subscribed to them."""
+    
+    def __init__(self):
+        self._subscriptions: Dict[int, Set[_Subscription]] = {}
+        self._lock = threading.Lock()
+    
+    def subscribe(self, user_id: int) -> _Subscription:
+        subscription = _Subscription(user_id, asyncio.get_running_loop())
+        with self._lock:
+            self._subscriptions.setdefault(user_id, set()).add(subscription)
+        return subscription
+    
+    def unsubscribe(self, subscription: _Subscription) -> None:
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.user_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.user_id]
+    
+    def deliver(self, messages: Iterable[Message]) -> None:
+        """Hand messages to the subscribers of their users; safe from any thread."""
+        with self._lock:
+            targets = [
+                (subscription, message)
+                for message in messages
+                for subscription in self._subscriptions.get(message["user_id"], ())
+            ]
+        for subscription, message in targets:
+            self._call(subscription, message)
+    
+    def resync_all(self) -> None:
+        """Make every subscriber reload its state, after messages may have been lost."""
+        with self._lock:
+            subscriptions = [subscription for group in self._subscriptions.values() for subscription in group]
+        for subscription in subscriptions:
+            self._call(subscription, RESYNC)
+    
+    @staticmethod
+    def _call(subscription: _Subscription, message: Message) -> None:
+        try:
+            subscription.loop.call_soon_threadsafe(subscription.put, message)
+        except RuntimeError:
+            # The stream's loop has closed; it unsubscribes as it unwinds.
+            pass
+
+
+class LiveBackend:
+    """
+    Carries the messages of committed transactions to the broker of every worker.
+    
+    This base backend hands them to the broker of the committing process
+    once the commit has succeeded, which is enough for a single worker.
+    Transports between workers override before_commit (to send messages
+    with the transaction) or after_commit, and deliver what they receive
+    from listen; install one with LiveService.set_backend.
+    """
+    
+    def __init__(self, broker: LiveBroker):
+        self.broker = broker
+    
+    def listen(self) -> None:
+        """Start receiving the messages other workers send."""
+    
+    def stop(self) -> None:
+        """Stop receiving messages."""
+    
+    def before_commit(self, db: Session, messages: List[Message]) -> None:
+        """Called inside the transaction, right before it commits."""
+    
+    def after_commit(self, messages: List[Message]) -> None:
+        """Called once the transaction has committed."""
+        self.broker.deliver(messages)
+
+
+class PostgresBackend(LiveBackend):
+    """
+    Relays messages between workers with PostgreSQL LISTEN/NOTIFY.
+    
+    Messages are sent with pg_notify inside the writing transaction, so
+    PostgreSQL delivers them if and only if it commits, in commit order.
+    Each listening worker has a connection of its own, read by a background
+    thread. Notifications sent while that connection is being established
+    are lost, so subscribers are resynchronized after every (re)connect.
+    """
+    
+    def __init__(self, broker: LiveBroker, database_url: str, channel: str = CHANNEL):
+        super().__init__(broker)
+        self.dsn = make_url(database_url).set(drivername="postgresql").render_as_string(hide_password=False)
+        self.channel = channel
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def listen(self) -> None:
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._listen, name="live-updates-listener", daemon=True)
+        self._thread.start()
+    
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+    
+    def before_commit(self, db: Session, messages: List[Message]) -> None:
+        for payload in self._payloads(messages):
+            db.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": self.channel, "payload": payload})
+    
+    def after_commit(self, messages: List[Message]) -> None:
+        # The listeners deliver them, in this process as in every other.
+        pass
+    
+    @staticmethod
+    def _payloads(messages: List[Message]) -> Iterable[str]:
+        """Pack messages into as few JSON arrays as fit in a notification."""
+        batch: List[str] = []
+        size = 2
+        for message in messages:
+            encoded = json.dumps(message, separators=(",", ":"))
+            if len(encoded) + 2 > MAX_PAYLOAD_BYTES:
+                encoded = json.dumps({**RESYNC, "user_id": message["user_id"], "version": message["version"]})
+            if batch and size + len(encoded) + 1 > MAX_PAYLOAD_BYTES:
+                yield f"[{','.join(batch)}]"
+                batch, size = [], 2
+            batch.append(encoded)
+            size += len(encoded) + 1
+        if batch:
+            yield f"[{','.join(batch)}]"
+    
+    def _listen(self) -> None:
+        import psycopg2
+        from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+        
+        while not self._stopped.is_set():
+            connection = None
+            try:
+                connection = psycopg2.connect(self.dsn)
+                connection.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+                with connection.cursor() as cursor:
+                    cursor.execute(f'LISTEN "{self.channel}"')
+                self.broker.resync_all()
+                
+                while not self._stopped.is_set():
+                    if select.select([connection], [], [], 1.0) == ([], [], []):
+                        continue
+                    connection.poll()
+                    while connection.notifies:
+                        self.broker.deliver(json.loads(connection.notifies.pop(0).payload))
+            except Exception:
+                logger.exception("Live updates listener failed; reconnecting")
+                self._stopped.wait(1.0)
+            finally:
+                if connection is not None:
+                    connection.close()
+
+
+class LiveMonth:
+    """
+    A stream's running totals for one month, kept up to date from messages.
+    
+    Applying a message touches only the categories it names, so a change
+    costs no query however many expenses the month holds.
+    """
+    
+    def __init__(
+        self,
+        version: int,
+        report: LiveMonthlySnapshot,
+        names: Dict[int, Tuple[str, Optional[int]]]
+    ):
+        self.version = version
+        self.year = report.year
+        self.month = report.month
+        self.first_day = date(report.year, report.month, 1).isoformat()
+        self.currency = report.currency
+        self.total = report.total_expenses
+        self.count = report.expense_count
+        self.rows: Dict[int, CategorySummary] = {row.category_id: row for row in report.categories}
+        self.names = names
+        # Set when a message cannot be applied and the month must be loaded again.
+        self.stale = False
+    
+    def snapshot(self) -> LiveMonthlySnapshot:
+        """The month's full state."""
+        return LiveMonthlySnapshot(
+            year=self.year,
+            month=self.month,
+            total_expenses=self.total,
+            currency=self.currency,
+            expense_count=self.count,
+            categories=list(self.rows.values())
+        )
+    
+    def apply(self, message: Message) -> Optional[LiveMonthlyDelta]:
+        """
+        Apply a message to the totals.
+        
+        Resync messages, and spend in a category created before this state
+        was loaded, cannot be applied; they set stale instead.
+        
+        Args:
+            message: Changes committed by one transaction
+            
+        Returns:
+            The categories whose totals or names changed, or None if the
+            message leaves the month as it was (or the state already
+            included it)
+        """
+        if message.get("resync"):
+            self.stale = True
+            return None
+        if message["version"] <= self.version:
+            return None
+        if any(
+            month == self.first_day and category_id not in self.rows and category_id not in self.names
+            for category_id, month, _, _ in message["spend"]
+        ):
+            self.stale = True
+            return None
+        self.version = message["version"]
+        
+        changed: Dict[int, List] = {}
+        for category_id, month, amount, count in message["spend"]:
+            if month != self.first_day:
+                continue
+            amount = Decimal(amount)
+            row = self.rows.get(category_id)
+            if row is None:
+                name, parent_id = self.names[category_id]
+                row = self.rows[category_id] = CategorySummary(
+                    category_id=category_id, category_name=name, parent_id=parent_id,
+                    total_amount=Decimal("0.00"), currency=self.currency, expense_count=0
+                )
+            row.total_amount += amount
+            row.expense_count += count
+            self.total += amount
+            self.count += count
+            delta = changed.setdefault(category_id, [Decimal("0.00"), 0])
+            delta[0] += amount
+            delta[1] += count
+        
+        for category_id, name, parent_id in message["categories"]:
+            self.names[category_id] = (name, parent_id)
+            row = self.rows.get(category_id)
+            if row is not None:
+                row.category_name, row.parent_id = name, parent_id
+                changed.setdefault(category_id, [Decimal("0.00"), 0])
+        
+        removed = []
+        for category_id, parent_id in message["deleted_categories"]:
+            self.names.pop(category_id, None)
+            for child_id, (name, child_parent_id) in list(self.names.items()):
+                if child_parent_id == category_id:
+                    self.names[child_id] = (name, parent_id)
+                    if child_id in self.rows:
+                        self.rows[child_id].parent_id = parent_id
+                        changed.setdefault(child_id, [Decimal("0.00"), 0])
+            row = self.rows.pop(category_id, None)
+            if row is not None:
+                self.total -= row.total_amount
+                self.count -= row.expense_count
+                removed.append(category_id)
+        
+        for category_id in list(changed):
+            row = self.rows.get(category_id)
+            if row is not None and row.expense_count == 0:
+                # Reports only list categories with expenses.
+                del self.rows[category_id]
+                removed.append(category_id)
+        
+        if not changed and not removed:
+            return None
+        
+        return LiveMonthlyDelta(
+            year=self.year,
+            month=self.month,
+            total_expenses=self.total,
+            currency=self.currency,
+            expense_count=self.count,
+            categories=[
+                CategoryDelta(**self.rows[category_id].model_dump(), amount_delta=amount, count_delta=count)
+                for category_id, (amount, count) in changed.items() if category_id in self.rows
+            ],
+            removed_category_ids=removed
+        )
+
+
+class LiveService:
+    """
+    Pushes the monthly totals of GET /reports/monthly and /monthly/by-category
+    to live streams as writes commit.
+    
+    Expense and category writes record what they change in the session
+    (the spend deltas budgets track, and category names and deletions).
+    When the transaction commits, each user's changes become one message
+    stamped with the user's new data version. The backend carries messages
+    to every worker, where a broker hands them to the streams of their
+    user. A stream loads its month once from the reports (see
+    ReportService.get_live_month) and then applies
+    the deltas itself, so watching a dashboard costs no queries while
+    nothing changes.
+    """
+    
+    broker = LiveBroker()
+    _backend: Optional[LiveBackend] = None
+    _listening = False
+    _lock = threading.Lock()
+    
+    @staticmethod
+    def record_spend(db: Session, user_id: int, category_id: int, month: date, amount: Decimal, count: int) -> None:
+        """
+        Record a change of a category's monthly spend in the current transaction.
+        
+        Args:
+            db: Database session
+            user_id: Owner of the category
+            category_id: Category whose spend changed
+            month: First day of the month
+            amount: Change of the total, in the user's base currency
+            count: Change of the number of expenses
+        """
+        entry = LiveService._changes(db, user_id).spend.setdefault((category_id, month), [Decimal(0), 0])
+        entry[0] += amount
+        entry[1] += count
+    
+    @staticmethod
+    def record_category(db: Session, user_id: int, category: Category) -> None:
+        """Record a created or updated category's name and parent in the current transaction."""
+        LiveService._changes(db, user_id).categories[category.id] = (category.name, category.parent_id)
+    
+    @staticmethod
+    def record_category_deleted(db: Session, user_id: int, category: Category) -> None:
+        """Record a category's deletion, with the parent its children move to, in the current transaction."""
+        changes = LiveService._changes(db, user_id)
+        changes.categories.pop(category.id, None)
+        changes.deleted_categories[category.id] = category.parent_id
+    
+    @staticmethod
+    def record_resync(db: Session, user_ids: Iterable[int]) -> None:
+        """Make the users' streams reload their totals once the current transaction commits."""
+        for user_id in user_ids:
+            LiveService._changes(db, user_id).resync = True
+    
+    @staticmethod
+    def backend() -> LiveBackend:
+        """The installed backend, created from live_updates_backend on first use."""
+        with LiveService._lock:
+            if LiveService._backend is None:
+                if settings.live_updates_backend == "postgres":
+                    LiveService._backend = PostgresBackend(LiveService.broker, settings.database_url)
+                else:
+                    LiveService._backend = LiveBackend(LiveService.broker)
+            return LiveService._backend
+    
+    @staticmethod
+    def set_backend(backend: LiveBackend) -> None:
+        """Replace the backend, e.g. with a transport other than PostgreSQL."""
+        with LiveService._lock:
+            if LiveService._backend is not None and LiveService._listening:
+                LiveService._backend.stop()
+                backend.listen()
+            LiveService._backend = backend
+    
+    @staticmethod
+    def start() -> None:
+        """Start receiving other workers' messages, unless already receiving them."""
+        backend = LiveService.backend()
+        with LiveService._lock:
+            if not LiveService._listening:
+                backend.listen()
+                LiveService._listening = True
+    
+    @staticmethod
+    def stop() -> None:
+        """Stop receiving other workers' messages."""
+        with LiveService._lock:
+            if LiveService._listening:
+                LiveService._backend.stop()
+                LiveService._listening = False
+    
+    @staticmethod
+    def subscribe(user_id: int) -> _Subscription:
+        """
+        Subscribe the calling event loop to a user's messages.
+        
+        Subscribe before loading the month (ReportService.get_live_month),
+        so no commit falls between the two; messages the loaded month
+        already includes are skipped by their version.
+        """
+        LiveService.start()
+        return LiveService.broker.subscribe(user_id)
+    
+    @staticmethod
+    def unsubscribe(subscription: _Subscription) -> None:
+        """Stop receiving a subscription's messages."""
+        LiveService.broker.unsubscribe(subscription)
+    
+    @staticmethod
+    def _changes(db: Session, user_id: int) -> _Changes:
+        changes = db.info.setdefault(_CHANGES_KEY, {})
+        entry = changes.get(user_id)
+        if entry is None:
+            entry = changes[user_id] = _Changes()
+        return entry
+
+
+@event.listens_for(Session, "before_commit")
+def _before_commit(db: Session) -> None:
+    changes: Dict[int, _Changes] = {
+        user_id: entry for user_id, entry in db.info.pop(_CHANGES_KEY, {}).items() if entry
+    }
+    if not changes:
+        return
+    
+    # The writes bumped these versions and hold their row locks until the commit.
+    versions = dict(db.query(User.id, User.data_version).filter(User.id.in_(changes)))
+    messages = [entry.message(user_id, versions[user_id]) for user_id, entry in changes.items() if user_id in versions]
+    if not messages:
+        return
+    
+    LiveService.backend().before_commit(db, messages)
+    db.info[_MESSAGES_KEY] = messages
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(db: Session) -> None:
+    messages = db.info.pop(_MESSAGES_KEY, None)
+    if messages:
+        LiveService.backend().after_commit(messages)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _after_transaction_end(db: Session, transaction) -> None:
+    # Whatever a rolled back or closed transaction recorded never happened.
+    if transaction.parent is None:
+        db.info.pop(_CHANGES_KEY, None)
+        db.info.pop(_MESSAGES_KEY, None)
@@ -0,0 +1,559 @@
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy import create_engine, func
+from app.models import Category, Expense, User
+from app.schemas import PlatformReport, PlatformCategoryTotal, CohortTotal, TopSpender, PlatformJob, DEFAULT_CURRENCY
+from app.utils import BaseAPIException, ConflictException, from_cents
+from app.services.amount_service import AmountService
+from app.services.fx_service import FxService, CENTS
+from app.services.archive_service import ArchiveService
+from app.database import SessionLocal
+from app.config import get_settings
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date
+from decimal import Decimal, ROUND_HALF_UP
+from heapq import nlargest
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+# Workers are spawned rather than forked, so they inherit neither the
+# parent's pooled connections nor locks held by its other threads.
+_MP_CONTEXT = multiprocessing.get_context("spawn")
+
+# Session factory and pause of the current worker process, set by _init_worker.
+_worker_sessions: Optional[sessionmaker] = None
+_worker_pause = 0.0
+
+# Jobs started by this process, by id; finished ones are also kept on disk.
+_jobs: Dict[str, PlatformJob] = {}
+_jobs_lock = threading.Lock()
+
+
+class Shard(NamedTuple):
+    """An inclusive range of user ids aggregated by one task."""
+    first_user_id: int
+    last_user_id: int
+
+
+class PlatformQuery(NamedTuple):
+    """Parameters every shard of a run is aggregated with."""
+    from_date: Optional[date]
+    to_date: Optional[date]
+    currency: str
+    top: int
+
+
+def _init_worker(database_url: str, pause: float) -> None:
+    """Give a worker process its own single-connection engine."""
+    global _worker_sessions, _worker_pause
+    engine = create_engine(database_url, pool_pre_ping=True, pool_size=1, max_overflow=0)
+    _worker_sessions = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    _worker_pause = pause
+
+
+def _run_shard(shard: Shard, query: PlatformQuery) -> Dict[str, Any]:
+    """Aggregate one shard in a worker process, then pause before taking the next."""
+    with _worker_sessions() as db:
+        partial = PlatformAnalyticsService.aggregate_shard(db, shard, query)
+    if _worker_pause:
+        time.sleep(_worker_pause)
+    return partial
+
+
+class PlatformAnalyticsService:
+    """
+    Spend across all users: per category name, per signup cohort and the top spenders.
+    
+    Rather than one GROUP BY over the whole expenses table, the users are
+    split into ranges of platform_shard_users ids. Each range is aggregated
+    by a worker process with its own connection, through the (user_id, ...)
+    indexes, into a small partial result: totals per category name and per
+    signup month plus the range's top spenders. Partials are merged once
+    every shard is done, so no query holds locks or a snapshot for longer
+    than one shard takes.
+    
+    platform_workers bounds how many shards run at once and each worker
+    sleeps platform_pause_seconds after a shard, which together cap the
+    load a run puts on the database. Completed shards can be appended to a
+    checkpoint file, so an interrupted run resumes where it stopped. Runs
+    requested through the API are jobs on a background thread, checkpointed
+    under platform_jobs_dir.
+    """
+    
+    @staticmethod
+    def run(
+        db: Session,
+        from_date: Optional[date] = None,
+        to_date: Optional[date] = None,
+        currency: str = DEFAULT_CURRENCY,
+        top: int = 10,
+        workers: Optional[int] = None,
+        shard_users: Optional[int] = None,
+        pause: Optional[float] = None,
+        checkpoint: Optional[str] = None,
+        progress: Optional[Callable[[int, int], None]] = None
+    ) -> PlatformReport:
+        """
+        Aggregate every shard on a process pool and merge the results.
+        
+        Args:
+            db: Database session, used to find the range of user ids
+            from_date: Only expenses from this date
+            to_date: Only expenses up to this date
+            currency: Currency all amounts are converted into
+            top: Number of top spenders to report
+            workers: Worker processes (defaults to platform_workers)
+            shard_users: User ids per shard (defaults to platform_shard_users)
+            pause: Seconds a worker sleeps after each shard (defaults to platform_pause_seconds)
+            checkpoint: JSON-lines file recording completed shards; an
+                existing file for the same parameters is resumed
+            progress: Called with (completed, total) shards at the start and after each shard
+            
+        Returns:
+            Platform report
+            
+        Raises:
+            BadRequestException: If a rate is missing for a currency and date
+            ValueError: If the checkpoint file belongs to a run with other parameters
+        """
+        workers = workers or settings.platform_workers
+        shard_users = shard_users or settings.platform_shard_users
+        pause = settings.platform_pause_seconds if pause is None else pause
+        query = PlatformQuery(from_date, to_date, currency, top)
+        
+        shards = PlatformAnalyticsService.shards(db, shard_users)
+        db.rollback()
+        
+        header = PlatformAnalyticsService._header(query, shard_users)
+        done = PlatformAnalyticsService._load_checkpoint(checkpoint, header) if checkpoint else {}
+        pending = [shard for shard in shards if shard not in done]
+        if progress:
+            progress(len(done), len(shards))
+        
+        if pending:
+            database_url = settings.analytics_database_url or settings.database_url
+            with ProcessPoolExecutor(
+                max_workers=min(workers, len(pending)),
+                mp_context=_MP_CONTEXT,
+                initializer=_init_worker,
+                initargs=(database_url, pause)
+            ) as pool:
+                futures = {pool.submit(_run_shard, shard, query): shard for shard in pending}
+                try:
+                    for future in as_completed(futures):
+                        shard = futures[future]
+                        done[shard] = future.result()
+                        if checkpoint:
+                            PlatformAnalyticsService._save_shard(checkpoint, header, shard, done[shard])
+                        if progress:
+                            progress(len(done), len(shards))
+                except BaseException:
+                    for future in futures:
+                        future.cancel()
+                    raise
+        
+        return PlatformAnalyticsService.merge(query, [done[shard] for shard in shards])
+    
+    @staticmethod
+    def start_job(
+        from_date: Optional[date] = None,
+        to_date: Optional[date] = None,
+        currency: str = DEFAULT_CURRENCY,
+        top: int = 10
+    ) -> PlatformJob:
+        """
+        Start a run on a background thread, or return the job for the same parameters.
+        
+        The job id is derived from the parameters and every completed shard
+        is checkpointed under platform_jobs_dir, so starting an interrupted
+        or failed job again resumes it, and a finished job returns its
+        stored report until it is discarded.
+        
+        Args:
+            from_date: Only expenses from this date
+            to_date: Only expenses up to this date
+            currency: Currency all amounts are converted into
+            top: Number of top spenders to report
+            
+        Returns:
+            The running or finished job
+        """
+        query = PlatformQuery(from_date, to_date, currency, top)
+        shard_users = settings.platform_shard_users
+        header = PlatformAnalyticsService._header(query, shard_users)
+        job_id = hashlib.blake2b(json.dumps(header, sort_keys=True).encode(), digest_size=8).hexdigest()
+        
+        with _jobs_lock:
+            job = _jobs.get(job_id) or PlatformAnalyticsService._stored_job(job_id)
+            if job is not None and job.status in ("running", "done"):
+                return job
+            job = PlatformJob(
+                id=job_id, status="running", completed_shards=job.completed_shards if job else 0
+            )
+            _jobs[job_id] = job
+        
+        threading.Thread(
+            target=PlatformAnalyticsService._run_job,
+            args=(job_id, query, shard_users),
+            name=f"platform-job-{job_id}",
+            daemon=True
+        ).start()
+        return job
+    
+    @staticmethod
+    def get_job(job_id: str) -> Optional[PlatformJob]:
+        """
+        Status of a job, with its report once it is done.
+        
+        Jobs that are not running in this process are read from
+        platform_jobs_dir: a stored report means done, a checkpoint alone
+        means the run was interrupted and can be started again.
+        
+        Args:
+            job_id: Job ID returned by start_job
+            
+        Returns:
+            The job, or None if it is unknown
+        """
+        with _jobs_lock:
+            job = _jobs.get(job_id)
+        return job or PlatformAnalyticsService._stored_job(job_id)
+    
+    @staticmethod
+    def discard_job(job_id: str) -> bool:
+        """
+        Delete a job's checkpoint and report, so the next start computes afresh.
+        
+        Args:
+            job_id: Job ID returned by start_job
+            
+        Returns:
+            True if the job existed
+            
+        Raises:
+            ConflictException: If the job is still running
+        """
+        with _jobs_lock:
+            job = _jobs.get(job_id)
+            if job is not None and job.status == "running":
+                raise ConflictException(detail="Platform job is still running")
+            _jobs.pop(job_id, None)
+            found = job is not None
+            for suffix in (".json", ".jsonl"):
+                path = PlatformAnalyticsService._job_path(job_id, suffix)
+                if os.path.exists(path):
+                    os.remove(path)
+                    found = True
+        return found
+    
+    @staticmethod
+    def _run_job(job_id: str, query: PlatformQuery, shard_users: int) -> None:
+        """Run a job started by start_job, recording its progress and outcome."""
+        def progress(completed: int, total: int) -> None:
+            with _jobs_lock:
+                _jobs[job_id] = _jobs[job_id].model_copy(
+                    update={"completed_shards": completed, "total_shards": total}
+                )
+        
+        os.makedirs(settings.platform_jobs_dir, exist_ok=True)
+        try:
+            with SessionLocal() as db:
+                report = PlatformAnalyticsService.run(
+                    db, *query, shard_users=shard_users,
+                    checkpoint=PlatformAnalyticsService._job_path(job_id, ".jsonl"), progress=progress
+                )
+        except Exception as error:
+            logger.exception("Platform job %s failed", job_id)
+            with _jobs_lock:
+                _jobs[job_id] = _jobs[job_id].model_copy(update={
+                    "status": "failed",
+                    "error": error.detail if isinstance(error, BaseAPIException) else str(error),
+                })
+            return
+        
+        with _jobs_lock:
+            job = _jobs[job_id].model_copy(update={"status": "done", "report": report})
+            path = PlatformAnalyticsService._job_path(job_id, ".json")
+            with open(path + ".tmp", "w") as file:
+                file.write(job.model_dump_json())
+            os.replace(path + ".tmp", path)
+            _jobs[job_id] = job
+    
+    @staticmethod
+    def _stored_job(job_id: str) -> Optional[PlatformJob]:
+        """A job not running in this process, as its files in platform_jobs_dir describe it."""
+        path = PlatformAnalyticsService._job_path(job_id, ".json")
+        if os.path.exists(path):
+            with open(path) as file:
+                return PlatformJob.model_validate_json(file.read())
+        
+        checkpoint = PlatformAnalyticsService._job_path(job_id, ".jsonl")
+        if not os.path.exists(checkpoint):
+            return None
+        with open(checkpoint) as file:
+            shards = max(sum(1 for line in file if line.endswith("\n")) - 1, 0)
+        return PlatformJob(id=job_id, status="interrupted", completed_shards=shards)
+    
+    @staticmethod
+    def _job_path(job_id: str, suffix: str) -> str:
+        """File of a job under platform_jobs_dir."""
+        return os.path.join(settings.platform_jobs_dir, f"platform-{job_id}{suffix}")
+    
+    @staticmethod
+    def shards(db: Session, shard_users: int) -> List[Shard]:
+        """
+        Split the range of existing user ids into shards.
+        
+        Args:
+            db: Database session
+            shard_users: User ids per shard
+            
+        Returns:
+            Consecutive shards covering every user id
+        """
+        first, last = db.query(func.min(User.id), func.max(User.id)).one()
+        if first is None:
+            return []
+        return [
+            Shard(start, min(start + shard_users - 1, last))
+            for start in range(first, last + 1, shard_users)
+        ]
+    
+    @staticmethod
+    def aggregate_shard(db: Session, shard: Shard, query: PlatformQuery) -> Dict[str, Any]:
+        """
+        Partial aggregates of the users in one shard.
+        
+        Spend is grouped per user and lower-cased category name in SQL;
+        amounts in other currencies are grouped by currency and day as well
+        and converted without rounding, so merged totals round only once.
+        Archived expenses are added from their file footers.
+        
+        Args:
+            db: Database session
+            shard: Range of user ids
+            query: Run parameters
+            
+        Returns:
+            JSON-serializable partial result, amounts as decimal strings
+            
+        Raises:
+            BadRequestException: If a rate is missing for a currency and date
+        """
+        spend = PlatformAnalyticsService._spend(db, shard, query)
+        
+        users = db.query(User.id, User.email, User.created_at).filter(
+            User.id.between(shard.first_user_id, shard.last_user_id)
+        ).all()
+        
+        per_user: Dict[int, List] = {}
+        categories: Dict[str, List] = {}
+        for (user_id, name), (total, count) in spend.items():
+            user_entry = per_user.setdefault(user_id, [Decimal(0), 0])
+            user_entry[0] += total
+            user_entry[1] += count
+            category_entry = categories.setdefault(name, [Decimal(0), 0, 0])
+            category_entry[0] += total
+            category_entry[1] += count
+            category_entry[2] += 1
+        
+        cohorts: Dict[str, List] = {}
+        emails = {}
+        for user_id, email, created_at in users:
+            emails[user_id] = email
+            total, count = per_user.get(user_id, (Decimal(0), 0))
+            entry = cohorts.setdefault(f"{created_at.year:04d}-{created_at.month:02d}", [0, 0, 0, Decimal(0)])
+            entry[0] += 1
+            entry[1] += count > 0
+            entry[2] += count
+            entry[3] += total
+        
+        top = nlargest(query.top, per_user.items(), key=lambda item: (item[1][0], -item[0]))
+        return {
+            "users": len(users),
+            "categories": {
+                name: [str(total), count, user_count] for name, (total, count, user_count) in categories.items()
+            },
+            "cohorts": {
+                cohort: [user_count, active, count, str(total)]
+                for cohort, (user_count, active, count, total) in cohorts.items()
+            },
+            "top": [
+                [user_id, emails.get(user_id, ""), count, str(total)] for user_id, (total, count) in top
+            ],
+        }
+    
+    @staticmethod
+    def merge(query: PlatformQuery, partials: List[Dict[str, Any]]) -> PlatformReport:
+        """
+        Combine the partial results of all shards into a report.
+        
+        Args:
+            query: Run parameters
+            partials: Results of aggregate_shard
+            
+        Returns:
+            Platform report, amounts rounded to cents
+        """
+        users = 0
+        categories: Dict[str, List] = {}
+        cohorts: Dict[str, List] = {}
+        top = []
+        
+        for partial in partials:
+            users += partial["users"]
+            for name, (total, count, user_count) in partial["categories"].items():
+                entry = categories.setdefault(name, [Decimal(0), 0, 0])
+                entry[0] += Decimal(total)
+                entry[1] += count
+                entry[2] += user_count
+            for cohort, (user_count, active, count, total) in partial["cohorts"].items():
+                entry = cohorts.setdefault(cohort, [0, 0, 0, Decimal(0)])
+                entry[0] += user_count
+                entry[1] += active
+                entry[2] += count
+                entry[3] += Decimal(total)
+            top.extend(partial["top"])
+        
+        def rounded(amount: Decimal) -> Decimal:
+            return amount.quantize(CENTS, rounding=ROUND_HALF_UP)
+        
+        cohort_rows = [
+            CohortTotal(
+                year=int(cohort[:4]), month=int(cohort[5:]), users=user_count,
+                active_users=active, expense_count=count, total=rounded(total)
+            )
+            for cohort, (user_count, active, count, total) in sorted(cohorts.items())
+        ]
+        top = nlargest(query.top, top, key=lambda row: (Decimal(row[3]), -row[0]))
+        
+        return PlatformReport(
+            from_date=query.from_date,
+            to_date=query.to_date,
+            currency=query.currency,
+            users=users,
+            active_users=sum(row.active_users for row in cohort_rows),
+            expense_count=sum(row.expense_count for row in cohort_rows),
+            total=rounded(sum((entry[3] for entry in cohorts.values()), Decimal(0))),
+            categories=[
+                PlatformCategoryTotal(category_name=name, users=user_count, expense_count=count, total=rounded(total))
+                for name, (total, count, user_count) in sorted(
+                    categories.items(), key=lambda item: (-item[1][0], item[0])
+                )
+            ],
+            cohorts=cohort_rows,
+            top_spenders=[
+                TopSpender(user_id=user_id, email=email, expense_count=count, total=rounded(Decimal(total)))
+                for user_id, email, count, total in top
+            ],
+        )
+    
+    @staticmethod
+    def _spend(db: Session, shard: Shard, query: PlatformQuery) -> Dict[Tuple[int, str], List]:
+        """Unrounded spend and expense count per user and lower-cased category name."""
+        name = func.lower(Category.name)
+        amount = AmountService.total()
+        base = db.query(Expense).join(Category, Category.id == Expense.category_id).filter(
+            Expense.user_id.between(shard.first_user_id, shard.last_user_id)
+        )
+        if query.from_date is not None:
+            base = base.filter(Expense.date >= query.from_date)
+        if query.to_date is not None:
+            base = base.filter(Expense.date <= query.to_date)
+        
+        spend: Dict[Tuple[int, str], List] = {}
+        
+        def add(user_id: int, category_name: str, total: Decimal, count: int) -> None:
+            entry = spend.setdefault((user_id, category_name), [Decimal(0), 0])
+            entry[0] += total
+            entry[1] += count
+        
+        same_currency = base.filter(Expense.currency == query.currency).with_entities(
+            Expense.user_id, name, amount, func.count(Expense.id)
+        ).group_by(Expense.user_id, name)
+        for user_id, category_name, total, count in same_currency:
+            add(user_id, category_name, AmountService.to_decimal(total), count)
+        
+        # (user_id, name, currency, date, amount, count) still to be converted
+        foreign = [
+            (user_id, category_name, currency, day, AmountService.to_decimal(total), count)
+            for user_id, category_name, currency, day, total, count in base.filter(
+                Expense.currency != query.currency
+            ).with_entities(
+                Expense.user_id, name, Expense.currency, Expense.date, amount, func.count(Expense.id)
+            ).group_by(Expense.user_id, name, Expense.currency, Expense.date)
+        ]
+        
+        archived_users = [
+            user_id for user_id in ArchiveService.user_ids()
+            if shard.first_user_id <= user_id <= shard.last_user_id
+        ]
+        if archived_users:
+            names = dict(db.query(Category.id, name).filter(
+                Category.user_id.between(shard.first_user_id, shard.last_user_id)
+            ))
+            for user_id in archived_users:
+                for total in ArchiveService.get_daily_totals(user_id, query.from_date, query.to_date):
+                    foreign.append((
+                        user_id, names[total.category_id], total.currency, total.date,
+                        from_cents(total.total_cents), total.count
+                    ))
+        
+        factors = FxService.conversion_factors(
+            db, {(currency, day) for _, _, currency, day, _, _ in foreign}, query.currency
+        )
+        for user_id, category_name, currency, day, total, count in foreign:
+            add(user_id, category_name, total * factors[(currency, day)], count)
+        return spend
+    
+    @staticmethod
+    def _header(query: PlatformQuery, shard_users: int) -> Dict[str, Any]:
+        """Parameters a checkpoint file is recorded for; resuming requires the same ones."""
+        return {
+            "from_date": query.from_date and query.from_date.isoformat(),
+            "to_date": query.to_date and query.to_date.isoformat(),
+            "currency": query.currency,
+            "top": query.top,
+            "shard_users": shard_users,
+        }
+    
+    @staticmethod
+    def _load_checkpoint(path: str, header: Dict[str, Any]) -> Dict[Shard, Dict[str, Any]]:
+        """Completed shards recorded in a checkpoint file, if it exists."""
+        done: Dict[Shard, Dict[str, Any]] = {}
+        if not os.path.exists(path):
+            return done
+        
+        with open(path, "r+") as file:
+            content = file.read()
+            # Drop a line cut short by an interruption; that shard runs again.
+            complete = content[:content.rfind("\n") + 1]
+            if complete != content:
+                file.truncate(len(complete.encode()))
+        
+        lines = complete.splitlines()
+        if lines and json.loads(lines[0]) != header:
+            raise ValueError(f"Checkpoint {path} was written by a run with other parameters")
+        for line in lines[1:]:
+            record = json.loads(line)
+            done[Shard(*record["shard"])] = record["result"]
+        return done
+    
+    @staticmethod
+    def _save_shard(path: str, header: Dict[str, Any], shard: Shard, partial: Dict[str, Any]) -> None:
+        """Append a completed shard to a checkpoint file, writing its header first if new."""
+        with open(path, "a") as file:
+            if file.tell() == 0:
+                file.write(json.dumps(header) + "\n")
+            file.write(json.dumps({"shard": list(shard), "result": partial}) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
@@ -0,0 +1,400 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import Date, DateTime, Integer, and_, case, exists, func, literal, or_, select, true, union_all
+from app.models import Category, Expense, RecurringExpense, User
+from app.schemas import RecurringExpenseCreate, RecurringExpenseUpdate
+from app.utils import NotFoundException, ForbiddenException, BadRequestException
+from app.services.data_version_service import DataVersionService
+from app.services.fx_service import FxService
+from app.services.budget_service import BudgetService, UPSERT_DIALECTS
+from app.services.categorizer_service import CategorizerService
+from app.config import get_settings
+from calendar import monthrange
+from datetime import date, datetime, timedelta
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+
+settings = get_settings()
+
+EPOCH = date(1970, 1, 1)
+DAY_FREQUENCIES = ("daily", "weekly")
+MONTH_FREQUENCIES = ("monthly", "yearly")
+EXPENSE_COLUMNS = [
+    "amount", "amount_cents", "currency", "date", "description",
+    "user_id", "category_id", "recurring_id", "created_at", "updated_at"
+]
+
+
+class MaterializeResult(NamedTuple):
+    """Outcome of a scheduler run."""
+    rules: int
+    expenses: int
+
+
+def _month_windows(first: date, last: date) -> Iterator[Tuple[date, date]]:
+    """Split an inclusive date range at month boundaries."""
+    while first <= last:
+        month_end = first.replace(day=monthrange(first.year, first.month)[1])
+        yield first, min(month_end, last)
+        first = month_end + timedelta(days=1)
+
+
+def _calendar(first: date, last: date):
+    """Derived table with one row per day of an inclusive range (at most a month)."""
+    days = [
+        select(
+            literal(day, Date).label("day"),
+            literal((day - EPOCH).days, Integer).label("epoch_day"),
+            literal(day.day, Integer).label("day_of_month")
+        )
+        for day in (first + timedelta(days=offset) for offset in range((last - first).days + 1))
+    ]
+    return (union_all(*days) if len(days) > 1 else days[0]).subquery("calendar")
+
+
+class RecurringService:
+    """
+    Service layer for recurring expenses and the scheduler that materializes them.
+    
+    Materialization is set-based: for each batch of rules and each month of
+    the pending range, one INSERT ... SELECT joins the rules against that
+    month's days and writes every due occurrence. Expenses are unique per
+    (recurring_id, date), so overlapping or repeated runs never duplicate an
+    occurrence, and each batch commits together with the rules' advanced
+    materialized_through, so an interrupted run resumes where it stopped.
+    """
+    
+    @staticmethod
+    def create_recurring(db: Session, recurring_data: RecurringExpenseCreate, user_id: int) -> RecurringExpense:
+        """
+        Create a recurring expense and materialize its occurrences up to today.
+        
+        Args:
+            db: Database session
+            recurring_data: Recurring expense creation data
+            user_id: ID of the user creating the rule
+            
+        Returns:
+            Created recurring expense instance
+            
+        Raises:
+            BadRequestException: If category doesn't exist or doesn't belong to user,
+                the anchor date is too far in the past, or the currency cannot be
+                converted to the user's base currency
+        """
+        category = db.query(Category).filter(
+            and_(Category.id == recurring_data.category_id, Category.user_id == user_id)
+        ).first()
+        
+        if not category:
+            raise BadRequestException(detail="Category not found or does not belong to you")
+        
+        today = datetime.utcnow().date()
+        if (today - recurring_data.anchor_date).days > settings.recurring_max_backfill_days:
+            raise BadRequestException(
+                detail=f"anchor_date may be at most {settings.recurring_max_backfill_days} days in the past"
+            )
+        
+        base_currency = db.query(User.base_currency).filter(User.id == user_id).scalar()
+        currency = recurring_data.currency or base_currency
+        FxService.ensure_supported(db, currency, base_currency)
+        
+        new_recurring = RecurringExpense(
+            user_id=user_id,
+            category_id=recurring_data.category_id,
+            amount=recurring_data.amount,
+            currency=currency,
+            description=recurring_data.description,
+            frequency=recurring_data.frequency,
+            interval=recurring_data.interval,
+            anchor_date=recurring_data.anchor_date,
+            end_date=recurring_data.end_date
+        )
+        
+        db.add(new_recurring)
+        db.flush()
+        frequencies = MONTH_FREQUENCIES if new_recurring.frequency in MONTH_FREQUENCIES else DAY_FREQUENCIES
+        RecurringService._materialize_batch(db, frequencies, new_recurring.id, new_recurring.id, today)
+        db.commit()
+        db.refresh(new_recurring)
+        
+        return new_recurring
+    
+    @staticmethod
+    def get_user_recurring(db: Session, user_id: int) -> List[RecurringExpense]:
+        """
+        Retrieve all recurring expenses for a specific user.
+        
+        Args:
+            db: Database session
+            user_id: User ID
+            
+        Returns:
+            List of recurring expense instances
+        """
+        return db.query(RecurringExpense).filter(
+            RecurringExpense.user_id == user_id
+        ).order_by(RecurringExpense.id).all()
+    
+    @staticmethod
+    def get_recurring_by_id(db: Session, recurring_id: int, user_id: int) -> RecurringExpense:
+        """
+        Retrieve a recurring expense by ID, ensuring it belongs to the user.
+        
+        Args:
+            db: Database session
+            recurring_id: Recurring expense ID
+            user_id: User ID for authorization check
+            
+        Returns:
+            Recurring expense instance
+            
+        Raises:
+            NotFoundException: If the recurring expense doesn't exist
+            ForbiddenException: If it doesn't belong to user
+        """
+        recurring = db.query(RecurringExpense).filter(RecurringExpense.id == recurring_id).first()
+        
+        if not recurring:
+            raise NotFoundException(detail="Recurring expense not found")
+        
+        if recurring.user_id != user_id:
+            raise ForbiddenException(detail="Not authorized to access this recurring expense")
+        
+        return recurring
+    
+    @staticmethod
+    def update_recurring(
+        db: Session,
+        recurring_id: int,
+        recurring_data: RecurringExpenseUpdate,
+        user_id: int
+    ) -> RecurringExpense:
+        """
+        Update a recurring expense. Already materialized expenses are left as they are.
+        
+        Args:
+            db: Database session
+            recurring_id: Recurring expense ID
+            recurring_data: Updated data
+            user_id: User ID for authorization check
+            
+        Returns:
+            Updated recurring expense instance
+            
+        Raises:
+            NotFoundException: If the recurring expense doesn't exist
+            ForbiddenException: If it doesn't belong to user
+            BadRequestException: If the new category is invalid or end_date is before anchor_date
+        """
+        recurring = RecurringService.get_recurring_by_id(db, recurring_id, user_id)
+        
+        update_data = recurring_data.model_dump(exclude_unset=True)
+        
+        if "category_id" in update_data:
+            category = db.query(Category).filter(
+                and_(Category.id == update_data["category_id"], Category.user_id == user_id)
+            ).first()
+            if not category:
+                raise BadRequestException(detail="Category not found or does not belong to you")
+        
+        end_date = update_data.get("end_date")
+        if end_date is not None and end_date < recurring.anchor_date:
+            raise BadRequestException(detail="end_date must not be before anchor_date")
+        
+        for field, value in update_data.items():
+            setattr(recurring, field, value)
+        
+        db.commit()
+        db.refresh(recurring)
+        
+        return recurring
+    
+    @staticmethod
+    def delete_recurring(db: Session, recurring_id: int, user_id: int) -> None:
+        """
+        Delete a recurring expense. Its materialized expenses are kept and
+        become ordinary expenses, so the categorization model learns them.
+        
+        Args:
+            db: Database session
+            recurring_id: Recurring expense ID
+            user_id: User ID for authorization check
+            
+        Raises:
+            NotFoundException: If the recurring expense doesn't exist
+            ForbiddenException: If it doesn't belong to user
+        """
+        recurring = RecurringService.get_recurring_by_id(db, recurring_id, user_id)
+        
+        detached = db.query(Expense.category_id, Expense.description, func.count()).filter(
+            Expense.recurring_id == recurring_id
+        ).group_by(Expense.category_id, Expense.description).all()
+        if detached:
+            CategorizerService.learn_many(db, user_id, detached)
+            DataVersionService.bump(db, user_id)
+        
+        db.query(Expense).filter(Expense.recurring_id == recurring_id).update(
+            {Expense.recurring_id: None, Expense.updated_at: Expense.updated_at},
+            synchronize_session=False
+        )
+        db.delete(recurring)
+        db.commit()
+    
+    @staticmethod
+    def materialize(
+        db: Session,
+        as_of: Optional[date] = None,
+        batch_size: Optional[int] = None
+    ) -> MaterializeResult:
+        """
+        Create the expenses of every occurrence due on or before a date, for all users.
+        
+        Monthly and yearly rules are processed first, then daily and weekly
+        ones, each in id order and batch_size at a time. Each batch is
+        committed on its own. Safe to run concurrently with itself or to
+        re-run after a failure.
+        
+        Args:
+            db: Database session
+            as_of: Last date to materialize (defaults to today, UTC)
+            batch_size: Rules per transaction (defaults to recurring_batch_size)
+            
+        Returns:
+            Number of rules processed and expenses created
+            
+        Raises:
+            BadRequestException: If an FX rate needed for budget tracking is missing
+        """
+        as_of = as_of or datetime.utcnow().date()
+        batch_size = batch_size or settings.recurring_batch_size
+        
+        rules = expenses = 0
+        for frequencies in (MONTH_FREQUENCIES, DAY_FREQUENCIES):
+            cursor = 0
+            while True:
+                batch = select(RecurringExpense.id).where(
+                    RecurringExpense.id > cursor,
+                    RecurringExpense.frequency.in_(frequencies),
+                    RecurringExpense.materialized_through < as_of
+                ).order_by(RecurringExpense.id).limit(batch_size).subquery()
+                last_id, count = db.execute(select(func.max(batch.c.id), func.count())).one()
+                if not count:
+                    break
+                
+                expenses += RecurringService._materialize_batch(db, frequencies, cursor + 1, last_id, as_of)
+                db.commit()
+                rules += count
+                cursor = last_id
+        
+        return MaterializeResult(rules=rules, expenses=expenses)
+    
+    @staticmethod
+    def _materialize_batch(
+        db: Session,
+        frequencies: Tuple[str, ...],
+        first_id: int,
+        last_id: int,
+        as_of: date
+    ) -> int:
+        """
+        Materialize occurrences up to as_of for the rules of some frequencies in an id range.
+        
+        Does not commit. Returns the number of expenses created.
+        """
+        in_batch = (
+            RecurringExpense.id.between(first_id, last_id),
+            RecurringExpense.frequency.in_(frequencies),
+            RecurringExpense.materialized_through < as_of,
+        )
+        # Lock the batch so a concurrent run waits, then sees it already advanced.
+        db.execute(select(RecurringExpense.id).where(*in_batch).with_for_update()).close()
+        start = db.query(func.min(RecurringExpense.materialized_through)).filter(*in_batch).scalar()
+        if start is None:
+            return 0
+        
+        written_at = datetime.utcnow()
+        insert = UPSERT_DIALECTS.get(db.get_bind().dialect.name)
+        
+        created = 0
+        for first, last in _month_windows(start + timedelta(days=1), as_of):
+            if frequencies == MONTH_FREQUENCIES:
+                occurrence_date, source, due = RecurringService._monthly_occurrences(first, last)
+            else:
+                occurrence_date, source, due = RecurringService._daily_occurrences(first, last)
+            
+            occurrences = select(
+                RecurringExpense.amount,
+                RecurringExpense.amount_cents,
+                RecurringExpense.currency,
+                occurrence_date.label("date"),
+                RecurringExpense.description,
+                RecurringExpense.user_id,
+                RecurringExpense.category_id,
+                RecurringExpense.id.label("recurring_id"),
+                literal(written_at, DateTime).label("created_at"),
+                literal(written_at, DateTime).label("updated_at")
+            ).select_from(source).where(
+                *in_batch,
+                due,
+                occurrence_date > RecurringExpense.materialized_through,
+                or_(RecurringExpense.end_date.is_(None), occurrence_date <= RecurringExpense.end_date)
+            )
+            
+            if insert is not None:
+                statement = insert(Expense.__table__).from_select(EXPENSE_COLUMNS, occurrences)
+                statement = statement.on_conflict_do_nothing(index_elements=["recurring_id", "date"])
+            else:
+                statement = Expense.__table__.insert().from_select(EXPENSE_COLUMNS, occurrences.where(~exists().where(
+                    Expense.recurring_id == RecurringExpense.id, Expense.date == occurrence_date
+                )))
+            
+            inserted = db.execute(statement).rowcount
+            if inserted:
+                created += inserted
+                # Occurrences past materialized_through have no expense yet, so the
+                # rows just selected are exactly the rows just written.
+                written = occurrences.subquery()
+                BudgetService.track_bulk(db, first.replace(day=1), written)
+                DataVersionService.bump_many(db, select(written.c.user_id).distinct())
+        
+        db.query(RecurringExpense).filter(*in_batch).update(
+            {RecurringExpense.materialized_through: as_of, RecurringExpense.updated_at: RecurringExpense.updated_at},
+            synchronize_session=False
+        )
+        
+        return created
+    
+    @staticmethod
+    def _monthly_occurrences(first: date, last: date):
+        """
+        Occurrence date, FROM clause and due condition of monthly and yearly
+        rules within part of a month.
+        
+        Such a rule falls at most once per month, on its anchor day, so the
+        date is computed per rule without joining a calendar.
+        """
+        days_in_month = monthrange(first.year, first.month)[1]
+        month_number = first.year * 12 + first.month - 1
+        month_step = RecurringExpense.interval * case((RecurringExpense.frequency == "yearly", 12), else_=1)
+        
+        # Anchors on the 29th-31st fall on the last day of shorter months.
+        day = case((RecurringExpense.anchor_day > days_in_month, days_in_month), else_=RecurringExpense.anchor_day)
+        occurrence_date = case(
+            {number: literal(first.replace(day=number), Date) for number in range(1, days_in_month + 1)},
+            value=day
+        )
+        due = and_(
+            (month_number - RecurringExpense.anchor_month) % month_step == 0,
+            occurrence_date.between(first, last)
+        )
+        return occurrence_date, RecurringExpense, due
+    
+    @staticmethod
+    def _daily_occurrences(first: date, last: date):
+        """
+        Occurrence date, FROM clause and due condition of daily and weekly
+        rules within part of a month, joining the rules against its days.
+        """
+        calendar = _calendar(first, last)
+        day_step = RecurringExpense.interval * case((RecurringExpense.frequency == "weekly", 7), else_=1)
+        due = (calendar.c.epoch_day - RecurringExpense.anchor_epoch_day) % day_step == 0
+        return calendar.c.day, RecurringExpense.__table__.join(calendar, true()), due
@@ -1,42 +1,113 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func, extract
-from app.models import Expense, Category
-from app.schemas import MonthlyReport, CategorySummary
-from typing import List
-from decimal import Decimal
+from sqlalchemy import Date, cast, func, extract, select
+from app.models import Expense, Category, CategoryClosure, User
+from app.schemas import MonthlyReport, CategorySummary, DailySpendRow, TagMode, LiveMonthlySnapshot
+from app.services.amount_service import AmountService
+from app.services.fx_service import FxService, CENTS
+from app.services.tag_service import TagService
+from app.services.archive_service import ArchiveService, DailyTotal
+from app.services.live_service import LiveMonth
+from app.utils import from_cents
+from calendar import monthrange
+from heapq import merge
+from itertools import chain
+from operator import itemgetter
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from datetime import date, timedelta
+from decimal import Decimal, ROUND_HALF_UP
+
+ZERO = Decimal("0.00")
+ONE_DAY = timedelta(days=1)
+LIVE_MONTH_ATTEMPTS = 3
 
 
 class ReportService:
-    """Service layer for expense reporting and analytics."""
+    """
+    Service layer for expense reporting and analytics.
+    
+    Reports cover archived expenses too: their totals per category,
+    currency and day come from the archive files' footers (see
+    ArchiveService) and are converted alongside the database groups.
+    """
     
     @staticmethod
-    def get_monthly_report(db: Session, user_id: int, year: int, month: int) -> MonthlyReport:
+    def get_monthly_report(
+        db: Session,
+        user_id: int,
+        year: int,
+        month: int,
+        base_currency: Optional[str] = None,
+        category_id: Optional[int] = None,
+        tags: Sequence[str] = (),
+        tag_mode: TagMode = "any"
+    ) -> MonthlyReport:
         """
         Generate a monthly expense report for a user.
         
+        Amounts are summed per currency and day in SQL and the groups are
+        converted to the base currency in one batch.
+        
         Args:
             db: Database session
             user_id: User ID
             year: Year for the report
             month: Month for the report (1-12)
+            base_currency: Report currency; defaults to the user's base currency
+            category_id: Only count this category and its subcategories
+            tags: Only count expenses carrying these tags
+            tag_mode: Whether expenses need "any" or "all" of the tags
             
         Returns:
             MonthlyReport with aggregated expense data
+            
+        Raises:
+            BadRequestException: If an FX rate needed for conversion is missing
         """
-        result = db.query(
-            func.coalesce(func.sum(Expense.amount), 0).label("total"),
+        base_currency = base_currency or ReportService._base_currency(db, user_id)
+        
+        query = db.query(
+            Expense.currency,
+            Expense.date,
+            func.sum(AmountService.column()).label("total"),
             func.count(Expense.id).label("count")
         ).filter(
             Expense.user_id == user_id,
             extract('year', Expense.date) == year,
             extract('month', Expense.date) == month
-        ).first()
+        )
+        
+        if category_id is not None:
+            query = query.join(
+                CategoryClosure, CategoryClosure.descendant_id == Expense.category_id
+            ).filter(CategoryClosure.ancestor_id == category_id)
+        
+        if tags:
+            query = TagService.filter_expenses(query, user_id, tags, tag_mode)
+        
+        groups = query.group_by(Expense.currency, Expense.date).all()
+        
+        archived = ReportService._archived_totals(user_id, year, month, tags, tag_mode)
+        if archived and category_id is not None:
+            subtree = set(db.scalars(
+                select(CategoryClosure.descendant_id).where(CategoryClosure.ancestor_id == category_id)
+            ))
+            archived = [total for total in archived if total.category_id in subtree]
+        
+        totals = FxService.convert_totals(
+            db,
+            chain(
+                ((None, group.currency, group.date, AmountService.to_decimal(group.total)) for group in groups),
+                ((None, total.currency, total.date, from_cents(total.total_cents)) for total in archived)
+            ),
+            base_currency
+        )
         
         return MonthlyReport(
             year=year,
             month=month,
-            total_expenses=Decimal(str(result.total)),
-            expense_count=result.count
+            total_expenses=totals.get(None, ZERO),
+            currency=base_currency,
+            expense_count=sum(group.count for group in groups) + sum(total.count for total in archived)
         )
     
     @staticmethod
@@ -44,41 +115,312 @@ class ReportService:
         db: Session,
         user_id: int,
         year: int,
-        month: int
+        month: int,
+        base_currency: Optional[str] = None,
+        rollup: bool = False,
+        tags: Sequence[str] = (),
+        tag_mode: TagMode = "any"
     ) -> List[CategorySummary]:
         """
         Get expense breakdown by category for a specific month.
         
+        With rollup, each category's totals include its subcategories: the
+        expenses are joined to category_closure once, which pairs each of
+        them with every ancestor of its category.
+        
         Args:
             db: Database session
             user_id: User ID
             year: Year for the report
             month: Month for the report (1-12)
+            base_currency: Report currency; defaults to the user's base currency
+            rollup: Include subcategories' expenses in each category's totals
+            tags: Only count expenses carrying these tags
+            tag_mode: Whether expenses need "any" or "all" of the tags
             
         Returns:
             List of CategorySummary with expenses grouped by category
+            
+        Raises:
+            BadRequestException: If an FX rate needed for conversion is missing
         """
-        results = db.query(
+        base_currency = base_currency or ReportService._base_currency(db, user_id)
+        
+        query = db.query(
             Category.id,
             Category.name,
-            func.sum(Expense.amount).label("total"),
+            Category.parent_id,
+            Expense.currency,
+            Expense.date,
+            func.sum(AmountService.column()).label("total"),
             func.count(Expense.id).label("count")
-        ).join(
-            Expense, Expense.category_id == Category.id
-        ).filter(
-            Expense.user_id == user_id,
-            extract('year', Expense.date) == year,
-            extract('month', Expense.date) == month
-        ).group_by(
-            Category.id, Category.name
-        ).all()
+        )
+        
+        if rollup:
+            query = query.select_from(Expense).join(
+                CategoryClosure, CategoryClosure.descendant_id == Expense.category_id
+            ).join(Category, Category.id == CategoryClosure.ancestor_id)
+        else:
+            query = query.join(Expense, Expense.category_id == Category.id)
+        
+        if tags:
+            query = TagService.filter_expenses(query, user_id, tags, tag_mode)
+        
+        groups = [
+            (group.id, group.name, group.parent_id, group.currency, group.date,
+             AmountService.to_decimal(group.total), group.count)
+            for group in query.filter(
+                Expense.user_id == user_id,
+                extract('year', Expense.date) == year,
+                extract('month', Expense.date) == month
+            ).group_by(
+                Category.id, Category.name, Category.parent_id, Expense.currency, Expense.date
+            )
+        ]
+        
+        archived = ReportService._archived_totals(user_id, year, month, tags, tag_mode)
+        if archived:
+            # Each archived total counts towards its category, or with rollup
+            # towards every ancestor of it, like the joins above.
+            descendant = CategoryClosure.descendant_id if rollup else Category.id
+            query = db.query(descendant, Category.id, Category.name, Category.parent_id).select_from(Category)
+            if rollup:
+                query = query.join(CategoryClosure, CategoryClosure.ancestor_id == Category.id)
+            targets = {}
+            for category_id, *target in query.filter(
+                Category.user_id == user_id, descendant.in_({total.category_id for total in archived})
+            ):
+                targets.setdefault(category_id, []).append(target)
+            groups.extend(
+                (*target, total.currency, total.date, from_cents(total.total_cents), total.count)
+                for total in archived for target in targets.get(total.category_id, ())
+            )
+        
+        totals = FxService.convert_totals(
+            db,
+            ((category_id, currency, day, total) for category_id, _, _, currency, day, total, _ in groups),
+            base_currency
+        )
+        
+        names = {}
+        parents = {}
+        counts = {}
+        for category_id, name, parent_id, _, _, _, count in groups:
+            names[category_id] = name
+            parents[category_id] = parent_id
+            counts[category_id] = counts.get(category_id, 0) + count
         
         return [
             CategorySummary(
-                category_id=result.id,
-                category_name=result.name,
-                total_amount=Decimal(str(result.total)),
-                expense_count=result.count
+                category_id=category_id,
+                category_name=name,
+                parent_id=parents[category_id],
+                total_amount=totals[category_id],
+                currency=base_currency,
+                expense_count=counts[category_id]
             )
-            for result in results
+            for category_id, name in names.items()
         ]
+    
+    @staticmethod
+    def get_live_month(db: Session, user_id: int, year: int, month: int) -> LiveMonth:
+        """
+        Load a month's reports for a live stream, with the data version they reflect.
+        
+        The version is read before and after the reports. Every write bumps
+        it, so equal readings mean no write committed in between; otherwise
+        the month is loaded again, a few times at most.
+        
+        Args:
+            db: Database session
+            user_id: User ID
+            year: Year of the month
+            month: Month (1-12)
+            
+        Returns:
+            LiveMonth holding the monthly report and its categories
+            
+        Raises:
+            BadRequestException: If an FX rate needed for conversion is missing
+        """
+        for _ in range(LIVE_MONTH_ATTEMPTS):
+            version, base_currency = db.query(User.data_version, User.base_currency).filter(
+                User.id == user_id
+            ).one()
+            report = ReportService.get_monthly_report(db, user_id, year, month, base_currency)
+            categories = ReportService.get_expenses_by_category(db, user_id, year, month, base_currency)
+            names = {
+                category_id: (name, parent_id)
+                for category_id, name, parent_id in db.query(Category.id, Category.name, Category.parent_id).filter(
+                    Category.user_id == user_id
+                )
+            }
+            settled = db.query(User.data_version).filter(User.id == user_id).scalar() == version
+            # End the transaction so a retry sees the writes that moved the version.
+            db.rollback()
+            if settled:
+                break
+        
+        return LiveMonth(version, LiveMonthlySnapshot(**report.model_dump(), categories=categories), names)
+    
+    @staticmethod
+    def get_daily_spend_factors(
+        db: Session,
+        user_id: int,
+        from_date: date,
+        to_date: date,
+        base_currency: str
+    ) -> Dict[Tuple[str, date], Decimal]:
+        """
+        Look up the FX factor of every foreign (currency, day) in a daily spend range.
+        
+        Lets a streamed series fail on a missing rate before the response
+        starts instead of part-way through its body.
+        
+        Args:
+            db: Database session
+            user_id: User ID
+            from_date: First day of the series
+            to_date: Last day of the series
+            base_currency: Currency to report in
+            
+        Returns:
+            Multiplier per foreign (currency, day) with expenses in the range
+            
+        Raises:
+            BadRequestException: If an FX rate needed for conversion is missing
+        """
+        pairs = set(db.execute(
+            select(Expense.currency, Expense.date).where(
+                Expense.user_id == user_id,
+                Expense.date >= from_date,
+                Expense.date <= to_date,
+                Expense.currency != base_currency
+            ).distinct()
+        ).tuples())
+        pairs.update(
+            (total.currency, total.date)
+            for total in ArchiveService.get_daily_totals(user_id, from_date, to_date)
+            if total.currency != base_currency
+        )
+        return FxService.conversion_factors(db, pairs, base_currency)
+    
+    @staticmethod
+    def iter_daily_spend(
+        db: Session,
+        user_id: int,
+        from_date: date,
+        to_date: date,
+        base_currency: str,
+        factors: Optional[Dict[Tuple[str, date], Decimal]] = None
+    ) -> Iterator[DailySpendRow]:
+        """
+        Yield spend per day of a range with a running cumulative total.
+        
+        Runs a single query whose rows are streamed from the database, so
+        memory stays constant however long the range is. On PostgreSQL the
+        days come from generate_series LEFT JOINed to per-day sums; other
+        databases return only days with expenses and the gaps are filled
+        here. Sums are grouped by currency as well so each currency-day is
+        converted once; the running total is accumulated over the converted,
+        cent-rounded days.
+        
+        Args:
+            db: Database session
+            user_id: User ID
+            from_date: First day of the series
+            to_date: Last day of the series
+            base_currency: Currency to report in
+            factors: FX factors already looked up with get_daily_spend_factors;
+                pairs missing from them are looked up as they are reached
+                
+        Yields:
+            One row per day from from_date to to_date, in order
+            
+        Raises:
+            BadRequestException: If an FX rate needed for conversion is missing
+        """
+        sums = select(
+            Expense.date.label("day"),
+            Expense.currency.label("currency"),
+            func.sum(AmountService.column()).label("total")
+        ).where(
+            Expense.user_id == user_id,
+            Expense.date >= from_date,
+            Expense.date <= to_date
+        ).group_by(Expense.date, Expense.currency)
+        
+        if db.get_bind().dialect.name == "postgresql":
+            series = func.generate_series(from_date, to_date, ONE_DAY).table_valued("day").alias("series")
+            sums = sums.subquery()
+            day = cast(series.c.day, Date)
+            statement = select(day.label("day"), sums.c.currency, sums.c.total).select_from(
+                series.outerjoin(sums, sums.c.day == day)
+            ).order_by(day)
+        else:
+            statement = sums.order_by(Expense.date)
+        
+        rows = (
+            (row_day, currency, None if amount is None else AmountService.to_decimal(amount))
+            for row_day, currency, amount in db.execute(statement.execution_options(yield_per=1000))
+        )
+        archived = ArchiveService.get_daily_totals(user_id, from_date, to_date)
+        if archived:
+            rows = merge(rows, (
+                (total.date, total.currency, from_cents(total.total_cents)) for total in archived
+            ), key=itemgetter(0))
+        
+        factors = dict(factors or {})
+        cumulative = ZERO
+        expected = from_date
+        current = None
+        total = Decimal(0)
+        
+        for row_day, currency, amount in rows:
+            if row_day != current:
+                if current is not None:
+                    total = total.quantize(CENTS, rounding=ROUND_HALF_UP)
+                    cumulative += total
+                    yield {"date": current, "total": total, "cumulative": cumulative}
+                    expected = current + ONE_DAY
+                while expected < row_day:
+                    yield {"date": expected, "total": ZERO, "cumulative": cumulative}
+                    expected += ONE_DAY
+                current = row_day
+                total = Decimal(0)
+            
+            if amount is None:
+                continue
+            if currency != base_currency:
+                key = (currency, row_day)
+                if key not in factors:
+                    factors.update(FxService.conversion_factors(db, [key], base_currency))
+                amount *= factors[key]
+            total += amount
+        
+        if current is not None:
+            total = total.quantize(CENTS, rounding=ROUND_HALF_UP)
+            cumulative += total
+            yield {"date": current, "total": total, "cumulative": cumulative}
+            expected = current + ONE_DAY
+        while expected <= to_date:
+            yield {"date": expected, "total": ZERO, "cumulative": cumulative}
+            expected += ONE_DAY
+    
+    @staticmethod
+    def _archived_totals(
+        user_id: int,
+        year: int,
+        month: int,
+        tags: Sequence[str],
+        tag_mode: TagMode
+    ) -> List[DailyTotal]:
+        """Archived daily totals of a month, read from file footers unless tags are given."""
+        return ArchiveService.get_daily_totals(
+            user_id, date(year, month, 1), date(year, month, monthrange(year, month)[1]), tags, tag_mode
+        )
+    
+    @staticmethod
+    def _base_currency(db: Session, user_id: int) -> str:
+        """Look up a user's base currency."""
+        return db.query(User.base_currency).filter(User.id == user_id).scalar()
@@ -0,0 +1,155 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import insert, literal, select
+from app.models import Expense, Category, DeletedRecord
+from app.schemas import ExpenseResponse, CategoryResponse, ExpenseFilter, SyncPayload
+from app.utils import BadRequestException
+from app.services.amount_service import AmountService
+from app.services.archive_service import ArchiveService
+from app.config import get_settings
+from typing import Iterable, Optional
+from datetime import datetime, timedelta
+import base64
+import binascii
+
+settings = get_settings()
+
+EXPENSE_ROW_FIELDS = tuple(ExpenseResponse.model_fields)
+CATEGORY_ROW_FIELDS = tuple(CategoryResponse.model_fields)
+
+EXPENSE_ENTITY = "expense"
+CATEGORY_ENTITY = "category"
+
+
+class SyncService:
+    """Service layer for delta synchronisation with offline clients."""
+    
+    @staticmethod
+    def encode_token(checkpoint: datetime) -> str:
+        """Encode a sync checkpoint as an opaque token."""
+        return base64.urlsafe_b64encode(checkpoint.isoformat().encode()).decode()
+    
+    @staticmethod
+    def decode_token(token: str) -> datetime:
+        """
+        Decode a token produced by encode_token.
+        
+        Raises:
+            BadRequestException: If the token is malformed
+        """
+        try:
+            return datetime.fromisoformat(base64.urlsafe_b64decode(token.encode()).decode())
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise BadRequestException(detail="Invalid sync token")
+    
+    @staticmethod
+    def get_changes(db: Session, user_id: int, since: Optional[str] = None) -> SyncPayload:
+        """
+        Collect everything that changed for a user since a sync token.
+        
+        Expenses and categories are selected by updated_at and deletions by
+        tombstone, all through (user_id, timestamp) indexes, so the cost
+        follows the amount of change rather than the size of the history.
+        Without a token a full snapshot is returned, archived expenses
+        included; archiving neither changes nor deletes an expense, so
+        deltas never carry them.
+        
+        Returned tokens are rewound by ``sync_overlap_seconds``; clients
+        must apply pages as idempotent upserts and deletes.
+        
+        Args:
+            db: Database session
+            user_id: User ID
+            since: Token returned by the previous sync, if any
+            
+        Returns:
+            Changed rows, deleted ids and the token for the next sync
+            
+        Raises:
+            BadRequestException: If the token is malformed
+        """
+        checkpoint = SyncService.decode_token(since) if since else None
+        started_at = datetime.utcnow()
+        
+        expense_query = db.query(*(
+            AmountService.column() if field == "amount" else getattr(Expense, field)
+            for field in EXPENSE_ROW_FIELDS
+        )).filter(
+            Expense.user_id == user_id
+        )
+        category_query = db.query(*(getattr(Category, field) for field in CATEGORY_ROW_FIELDS)).filter(
+            Category.user_id == user_id
+        )
+        deleted_expense_ids = []
+        deleted_category_ids = []
+        
+        if checkpoint is not None:
+            expense_query = expense_query.filter(Expense.updated_at >= checkpoint)
+            category_query = category_query.filter(Category.updated_at >= checkpoint)
+            
+            tombstones = db.query(DeletedRecord.entity_type, DeletedRecord.entity_id).filter(
+                DeletedRecord.user_id == user_id,
+                DeletedRecord.deleted_at >= checkpoint
+            )
+            for entity_type, entity_id in tombstones:
+                if entity_type == EXPENSE_ENTITY:
+                    deleted_expense_ids.append(entity_id)
+                else:
+                    deleted_category_ids.append(entity_id)
+        
+        expenses = AmountService.rows_to_decimal([dict(zip(EXPENSE_ROW_FIELDS, row)) for row in expense_query])
+        if checkpoint is None:
+            years = ArchiveService.years(user_id)
+            if years:
+                expenses += [
+                    {field: row[field] for field in EXPENSE_ROW_FIELDS}
+                    for row in ArchiveService.get_expense_rows(user_id, years, ExpenseFilter(), EXPENSE_ROW_FIELDS)
+                ]
+        
+        next_checkpoint = started_at - timedelta(seconds=settings.sync_overlap_seconds)
+        
+        return {
+            "expenses": expenses,
+            "categories": [dict(zip(CATEGORY_ROW_FIELDS, row)) for row in category_query],
+            "deleted_expense_ids": deleted_expense_ids,
+            "deleted_category_ids": deleted_category_ids,
+            "next_token": SyncService.encode_token(next_checkpoint),
+        }
+    
+    @staticmethod
+    def record_deletions(db: Session, user_id: int, entity_type: str, entity_ids: Iterable[int]) -> None:
+        """
+        Add tombstones for deleted records to the current transaction.
+        
+        Args:
+            db: Database session
+            user_id: Owner of the records
+            entity_type: EXPENSE_ENTITY or CATEGORY_ENTITY
+            entity_ids: IDs of the deleted records
+        """
+        now = datetime.utcnow()
+        db.add_all(
+            DeletedRecord(user_id=user_id, entity_type=entity_type, entity_id=entity_id, deleted_at=now)
+            for entity_id in entity_ids
+        )
+    
+    @staticmethod
+    def record_category_expense_deletions(db: Session, user_id: int, category_id: int) -> None:
+        """
+        Add tombstones for every expense of a category in one INSERT ... SELECT.
+        
+        Must run before the category (and its expenses) are deleted.
+        
+        Args:
+            db: Database session
+            user_id: Owner of the category
+            category_id: Category being deleted
+        """
+        now = datetime.utcnow()
+        db.execute(
+            insert(DeletedRecord).from_select(
+                ["user_id", "entity_type", "entity_id", "deleted_at"],
+                select(
+                    Expense.user_id, literal(EXPENSE_ENTITY), Expense.id, literal(now)
+                ).where(Expense.user_id == user_id, Expense.category_id == category_id)
+            )
+        )
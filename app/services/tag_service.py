@@ -0,0 +1,163 @@
+from sqlalchemy.orm import Query, Session
+from sqlalchemy import Select, delete, intersect, insert, select, union
+from app.models import Expense, Tag, ExpenseTag
+from app.schemas import TagMode
+from app.utils import NotFoundException, ForbiddenException
+from app.services.data_version_service import DataVersionService
+from app.services.budget_service import UPSERT_DIALECTS
+from typing import List, Sequence, Union
+
+
+class TagService:
+    """
+    Service layer for tags and the expense_tags inverted index.
+    
+    Multi-tag filters compile into the expense query itself: the postings of
+    each tag are read from the (tag_id, expense_id) primary key and combined
+    with UNION (any) or INTERSECT (all) inside the database, so no expense
+    ids travel to the application.
+    """
+    
+    @staticmethod
+    def get_user_tags(db: Session, user_id: int) -> List[Tag]:
+        """
+        Retrieve all tags of a user, ordered by name.
+        
+        Args:
+            db: Database session
+            user_id: User ID
+            
+        Returns:
+            List of tag instances
+        """
+        return db.query(Tag).filter(Tag.user_id == user_id).order_by(Tag.name).all()
+    
+    @staticmethod
+    def get_tag_by_id(db: Session, tag_id: int, user_id: int) -> Tag:
+        """
+        Retrieve a tag by ID, ensuring it belongs to the user.
+        
+        Args:
+            db: Database session
+            tag_id: Tag ID
+            user_id: User ID for authorization check
+            
+        Returns:
+            Tag instance
+            
+        Raises:
+            NotFoundException: If tag doesn't exist
+            ForbiddenException: If tag doesn't belong to user
+        """
+        tag = db.query(Tag).filter(Tag.id == tag_id).first()
+        
+        if not tag:
+            raise NotFoundException(detail="Tag not found")
+        
+        if tag.user_id != user_id:
+            raise ForbiddenException(detail="Not authorized to access this tag")
+        
+        return tag
+    
+    @staticmethod
+    def delete_tag(db: Session, tag_id: int, user_id: int) -> None:
+        """
+        Delete a tag and remove it from all expenses.
+        
+        Args:
+            db: Database session
+            tag_id: Tag ID
+            user_id: User ID for authorization check
+            
+        Raises:
+            NotFoundException: If tag doesn't exist
+            ForbiddenException: If tag doesn't belong to user
+        """
+        tag = TagService.get_tag_by_id(db, tag_id, user_id)
+        
+        db.execute(delete(ExpenseTag).where(ExpenseTag.tag_id == tag.id))
+        db.delete(tag)
+        DataVersionService.bump(db, user_id)
+        db.commit()
+    
+    @staticmethod
+    def resolve_tags(db: Session, user_id: int, names: Sequence[str]) -> List[Tag]:
+        """
+        Return a user's tags with the given names, creating missing ones.
+        
+        Missing tags are inserted with one statement that ignores names a
+        concurrent request created first. Does not commit.
+        
+        Args:
+            db: Database session
+            user_id: Owner of the tags
+            names: Normalized tag names
+            
+        Returns:
+            Tag instances ordered by name
+        """
+        names = sorted(set(names))
+        if not names:
+            return []
+        
+        rows = [{"user_id": user_id, "name": name} for name in names]
+        upsert = UPSERT_DIALECTS.get(db.get_bind().dialect.name)
+        if upsert is not None:
+            db.execute(upsert(Tag).values(rows).on_conflict_do_nothing(
+                index_elements=[Tag.user_id, Tag.name]
+            ))
+        else:
+            existing = set(db.scalars(select(Tag.name).where(Tag.user_id == user_id, Tag.name.in_(names))))
+            missing = [row for row in rows if row["name"] not in existing]
+            if missing:
+                db.execute(insert(Tag), missing)
+        
+        return db.query(Tag).filter(Tag.user_id == user_id, Tag.name.in_(names)).order_by(Tag.name).all()
+    
+    @staticmethod
+    def remove_expenses(db: Session, expense_ids: Union[Select, Sequence[int]]) -> None:
+        """
+        Unlink expenses that are about to be deleted from their tags. Does not commit.
+        
+        Args:
+            db: Database session
+            expense_ids: Ids of the expenses being deleted, or a select of them
+        """
+        db.execute(delete(ExpenseTag).where(ExpenseTag.expense_id.in_(expense_ids)))
+    
+    @staticmethod
+    def filter_expenses(query: Query, user_id: int, names: Sequence[str], mode: TagMode = "any") -> Query:
+        """
+        Restrict an expense query to expenses tagged with any or all of a user's tags.
+        
+        Each tag name is resolved through the (user_id, name) unique index
+        and its expenses are a range scan of the expense_tags primary key.
+        The postings are combined with UNION (any) or INTERSECT (all) and
+        joined to expenses by primary key, so the database starts from the
+        tagged expenses instead of probing every expense of the user. A name
+        the user has no tag for matches no expense.
+        
+        Args:
+            query: Query over Expense
+            user_id: Owner of the tags
+            names: Normalized tag names
+            mode: "any" for the union of the tags' expenses, "all" for
+                their intersection
+                
+        Returns:
+            The query joined to the matching expense ids
+        """
+        postings = [
+            select(ExpenseTag.expense_id).join(Tag, Tag.id == ExpenseTag.tag_id).where(
+                Tag.user_id == user_id, Tag.name == name
+            )
+            for name in names
+        ]
+        if len(postings) == 1:
+            tagged = postings[0].subquery()
+        elif mode == "all":
+            tagged = intersect(*postings).subquery()
+        else:
+            tagged = union(*postings).subquery()
+        
+        return query.join(tagged, tagged.c.expense_id == Expense.id)
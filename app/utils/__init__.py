@@ -5,8 +5,23 @@ from app.utils.exceptions import (
     UnauthorizedException,
     ForbiddenException,
     BadRequestException,
-    ConflictException
+    ConflictException,
+    NotModifiedException
 )
+from app.utils.serialization import (
+    expense_rows_adapter,
+    category_rows_adapter,
+    category_stats_rows_adapter,
+    sync_payload_adapter,
+    daily_spend_rows_adapter,
+    category_suggestions_adapter,
+    parse_fields,
+    parse_tags,
+    render_json,
+    stream_json_array
+)
+from app.utils.money import to_cents, from_cents
+from app.utils.fingerprint import normalize_description, expense_fingerprint
 
 __all__ = [
     "hash_password",
@@ -18,5 +33,20 @@ __all__ = [
     "UnauthorizedException",
     "ForbiddenException",
     "BadRequestException",
-    "ConflictException"
+    "ConflictException",
+    "NotModifiedException",
+    "expense_rows_adapter",
+    "category_rows_adapter",
+    "category_stats_rows_adapter",
+    "sync_payload_adapter",
+    "daily_spend_rows_adapter",
+    "category_suggestions_adapter",
+    "parse_fields",
+    "parse_tags",
+    "render_json",
+    "stream_json_array",
+    "to_cents",
+    "from_cents",
+    "normalize_description",
+    "expense_fingerprint"
 ]
@@ -4,8 +4,13 @@ from fastapi import HTTPException, status
 class BaseAPIException(HTTPException):
     """Base class for API exceptions."""
     
-    def __init__(self, detail: str, status_code: int = status.HTTP_400_BAD_REQUEST):
-        super().__init__(status_code=status_code, detail=detail)
+    def __init__(
+        self,
+        detail: str,
+        status_code: int = status.HTTP_400_BAD_REQUEST,
+        headers: dict[str, str] | None = None
+    ):
+        super().__init__(status_code=status_code, detail=detail, headers=headers)
 
 
 class NotFoundException(BaseAPIException):
@@ -44,3 +49,14 @@ class ConflictException(BaseAPIException):
     
     def __init__(self, detail: str = "Resource already exists"):
         super().__init__(detail=detail, status_code=status.HTTP_409_CONFLICT)
+
+
+class NotModifiedException(BaseAPIException):
+    """Raised to answer a conditional GET whose ETag still matches."""
+    
+    def __init__(self, etag: str):
+        super().__init__(
+            detail="Not modified",
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={"ETag": etag}
+        )
@@ -0,0 +1,27 @@
+from datetime import date
+from typing import Optional
+import hashlib
+import unicodedata
+
+
+def normalize_description(description: str) -> str:
+    """Case-fold a description and collapse its whitespace."""
+    return " ".join(unicodedata.normalize("NFKC", description).casefold().split())
+
+
+def expense_fingerprint(
+    amount_cents: Optional[int],
+    currency: Optional[str],
+    day: Optional[date],
+    description: Optional[str]
+) -> Optional[int]:
+    """
+    Signed 64-bit hash of an expense's amount, currency, date and normalized
+    description, or None while any of them is unset.
+    
+    Expenses of one user with equal fingerprints are probable duplicates.
+    """
+    if amount_cents is None or currency is None or day is None or description is None:
+        return None
+    key = f"{amount_cents}|{currency}|{day.isoformat()}|{normalize_description(description)}"
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big", signed=True)
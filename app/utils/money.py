@@ -0,0 +1,18 @@
+from decimal import Decimal
+from typing import Optional
+
+CENTS = Decimal("0.01")
+
+
+def to_cents(amount: Optional[Decimal]) -> Optional[int]:
+    """Convert a two-decimal amount to integer minor units."""
+    if amount is None:
+        return None
+    return int(Decimal(amount).quantize(CENTS).scaleb(2))
+
+
+def from_cents(cents: Optional[int]) -> Optional[Decimal]:
+    """Convert integer minor units back to a two-decimal amount."""
+    if cents is None:
+        return None
+    return Decimal(cents).scaleb(-2)
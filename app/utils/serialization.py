@@ -0,0 +1,124 @@
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from itertools import islice
+from fastapi import Response
+from pydantic import TypeAdapter
+from app.schemas import (
+    ExpenseRow, CategoryRow, CategoryStatsRow, SyncPayload, DailySpendRow, CategorySuggestionRow,
+    normalize_tag, MAX_TAG_LENGTH, MAX_TAGS_PER_EXPENSE
+)
+from app.utils.exceptions import BadRequestException
+
+# Adapters are expensive to build, so they are created once at import time.
+expense_rows_adapter = TypeAdapter(List[ExpenseRow])
+category_rows_adapter = TypeAdapter(List[CategoryRow])
+category_stats_rows_adapter = TypeAdapter(List[CategoryStatsRow])
+sync_payload_adapter = TypeAdapter(SyncPayload)
+daily_spend_rows_adapter = TypeAdapter(List[DailySpendRow])
+category_suggestions_adapter = TypeAdapter(List[CategorySuggestionRow])
+
+
+def parse_fields(fields: Optional[str], allowed: Sequence[str]) -> Tuple[str, ...]:
+    """
+    Parse a comma-separated sparse fieldset parameter.
+    
+    Args:
+        fields: Raw ``fields`` query value, or None for all fields
+        allowed: Selectable field names in response order
+        
+    Returns:
+        Requested field names in response order, without duplicates
+        
+    Raises:
+        BadRequestException: If a field is unknown or none are given
+    """
+    if fields is None:
+        return tuple(allowed)
+    
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested.difference(allowed)
+    if unknown:
+        raise BadRequestException(detail=f"Unknown field(s): {', '.join(sorted(unknown))}")
+    if not requested:
+        raise BadRequestException(detail="At least one field must be requested")
+    
+    return tuple(name for name in allowed if name in requested)
+
+
+def parse_tags(tags: Optional[str]) -> Tuple[str, ...]:
+    """
+    Parse a comma-separated tag filter parameter.
+    
+    Args:
+        tags: Raw ``tags`` query value, or None for no tag filter
+        
+    Returns:
+        Normalized tag names, without duplicates
+        
+    Raises:
+        BadRequestException: If a tag is too long or too many are given
+    """
+    if tags is None:
+        return ()
+    
+    names = tuple(dict.fromkeys(normalize_tag(name) for name in tags.split(",") if name.strip()))
+    if not names:
+        raise BadRequestException(detail="At least one tag must be given")
+    if len(names) > MAX_TAGS_PER_EXPENSE:
+        raise BadRequestException(detail=f"At most {MAX_TAGS_PER_EXPENSE} tags can be combined")
+    if any(len(name) > MAX_TAG_LENGTH for name in names):
+        raise BadRequestException(detail=f"Tags are at most {MAX_TAG_LENGTH} characters long")
+    
+    return names
+
+
+def render_json(
+    adapter: TypeAdapter,
+    content: Any,
+    status_code: int = 200,
+    headers: Optional[Dict[str, str]] = None
+) -> Response:
+    """
+    Serialize content with a pre-built TypeAdapter into a ready response.
+    
+    Skips FastAPI's response_model validation and generic JSON encoding,
+    while keeping Pydantic's exact Decimal and date formatting.
+    
+    Args:
+        adapter: TypeAdapter matching the shape of content
+        content: Plain Python data (dicts, lists, scalars)
+        status_code: HTTP status code of the response
+        headers: Optional extra response headers
+        
+    Returns:
+        Response with the pre-rendered JSON body
+    """
+    return Response(
+        content=adapter.dump_json(content),
+        status_code=status_code,
+        headers=headers,
+        media_type="application/json"
+    )
+
+
+def stream_json_array(adapter: TypeAdapter, rows: Iterable[Any], chunk_size: int = 500) -> Iterator[bytes]:
+    """
+    Render an iterable as a JSON array, one chunk of rows at a time.
+    
+    Args:
+        adapter: TypeAdapter for a list of the row type
+        rows: Rows to render; consumed lazily
+        chunk_size: Rows serialized per yielded chunk
+        
+    Yields:
+        Pieces of the JSON document, to be sent in order
+    """
+    iterator = iter(rows)
+    yield b"["
+    separator = b""
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            break
+        yield separator + adapter.dump_json(chunk)[1:-1]
+        separator = b","
+    yield b"]"
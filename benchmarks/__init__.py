@@ -0,0 +1,5 @@
+"""
+Benchmarks and load tests for the Expense Tracker API.
+
+Each module is runnable with ``python -m benchmarks.<name>`` from the project root.
+"""
@@ -0,0 +1,125 @@
+"""
+Benchmark for expense amount storage modes.
+
+Runs the expense list fast path and the monthly reports with amounts read
+from the NUMERIC column and from integer cents (``AMOUNT_STORAGE``). Both
+timings include the SQL query and JSON rendering. Bodies are checked to be
+byte-identical across modes before timing.
+
+Usage:
+    python -m benchmarks.bench_amounts --rows 50000
+"""
+import argparse
+import os
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Callable, Dict
+
+# The app engine is never connected to; the benchmark uses its own in-memory database.
+os.environ.setdefault("DATABASE_URL", "sqlite:///benchmark.db")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.config import get_settings
+from app.database import Base
+from app.models import User, Category, Expense
+from app.services import ExpenseService, ReportService
+from app.utils import expense_rows_adapter, to_cents
+
+settings = get_settings()
+
+MODES = ("numeric", "cents")
+
+
+def seed(session: Session, rows: int, categories: int) -> int:
+    user = User(email="bench@example.com", hashed_password="x")
+    session.add(user)
+    session.flush()
+    category_ids = []
+    for index in range(categories):
+        category = Category(name=f"Bench {index}", user_id=user.id)
+        session.add(category)
+        session.flush()
+        category_ids.append(category.id)
+    start = date(2024, 1, 1)
+    now = datetime(2024, 6, 1, 12, 30, 15, 123456)
+    mappings = []
+    for index in range(rows):
+        amount = Decimal(index % 50000) / 100 + Decimal("0.01")
+        mappings.append({
+            "amount": amount,
+            # bulk inserts skip ORM validators, so the mirror column is set here.
+            "amount_cents": to_cents(amount),
+            "date": start + timedelta(days=index % 365),
+            "description": f"Expense number {index}",
+            "user_id": user.id,
+            "category_id": category_ids[index % categories],
+            "created_at": now,
+            "updated_at": now,
+        })
+    session.bulk_insert_mappings(Expense, mappings)
+    session.commit()
+    return user.id
+
+
+def list_body(session: Session, user_id: int) -> bytes:
+    return expense_rows_adapter.dump_json(ExpenseService.get_user_expense_rows(session, user_id))
+
+
+def reports_body(session: Session, user_id: int) -> bytes:
+    parts = []
+    for month in range(1, 13):
+        parts.append(ReportService.get_monthly_report(session, user_id, 2024, month).model_dump_json())
+        for summary in ReportService.get_expenses_by_category(session, user_id, 2024, month):
+            parts.append(summary.model_dump_json())
+    return "\n".join(parts).encode()
+
+
+def best_of(fn: Callable[[], bytes], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark expense amount storage modes.")
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--categories", type=int, default=12)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    SessionLocal = sessionmaker(bind=engine, autoflush=False)
+
+    with SessionLocal() as session:
+        user_id = seed(session, args.rows, args.categories)
+
+    def run(path, mode):
+        def call():
+            settings.amount_storage = mode
+            with SessionLocal() as session:
+                return path(session, user_id)
+        return call
+
+    print(f"rows={args.rows} categories={args.categories}")
+    for label, path in (("list", list_body), ("reports", reports_body)):
+        bodies = {mode: run(path, mode)() for mode in MODES}
+        if len(set(bodies.values())) != 1:
+            raise SystemExit(f"{label}: output differs between storage modes")
+
+        timings: Dict[str, float] = {mode: best_of(run(path, mode), args.repeat) for mode in MODES}
+        for mode in MODES:
+            print(f"{label:<8} {mode:<8} {timings[mode] * 1000:8.1f} ms")
+        print(f"{label:<8} speedup  {timings['numeric'] / timings['cents']:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
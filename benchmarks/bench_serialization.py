@@ -0,0 +1,119 @@
+"""
+Benchmark for the GET /expenses serialization fast path.
+
+Compares the default FastAPI path (ORM entities validated through
+``List[ExpenseResponse]`` with ``from_attributes``, then generic JSON
+encoding) with the column-tuple path rendered through a cached TypeAdapter.
+Both timings include the SQL query. The two bodies are checked to be
+byte-identical before timing.
+
+Usage:
+    python -m benchmarks.bench_serialization --rows 10000
+"""
+import argparse
+import json
+import os
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Callable, List
+
+# The app engine is never connected to; the benchmark uses its own in-memory database.
+os.environ.setdefault("DATABASE_URL", "sqlite:///benchmark.db")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.models import User, Category, Expense
+from app.schemas import ExpenseResponse
+from app.services import ExpenseService
+from app.utils import expense_rows_adapter
+
+response_adapter = TypeAdapter(List[ExpenseResponse])
+
+
+def seed(session: Session, rows: int) -> int:
+    user = User(email="bench@example.com", hashed_password="x")
+    session.add(user)
+    session.flush()
+    category = Category(name="Bench", user_id=user.id)
+    session.add(category)
+    session.flush()
+    start = date(2024, 1, 1)
+    now = datetime(2024, 6, 1, 12, 30, 15, 123456)
+    session.bulk_insert_mappings(Expense, [
+        {
+            "amount": Decimal(index % 50000) / 100 + Decimal("0.01"),
+            "date": start + timedelta(days=index % 365),
+            "description": f"Expense number {index} – café",
+            "user_id": user.id,
+            "category_id": category.id,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for index in range(rows)
+    ])
+    session.commit()
+    return user.id
+
+
+def default_path(session: Session, user_id: int) -> bytes:
+    """What FastAPI does for response_model=List[ExpenseResponse]."""
+    expenses = ExpenseService.get_user_expenses(session, user_id)
+    validated = response_adapter.validate_python(expenses, from_attributes=True)
+    content = response_adapter.dump_python(validated, mode="json")
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def fast_path(session: Session, user_id: int) -> bytes:
+    rows = ExpenseService.get_user_expense_rows(session, user_id)
+    return expense_rows_adapter.dump_json(rows)
+
+
+def best_of(fn: Callable[[], bytes], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark expense list serialization.")
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    SessionLocal = sessionmaker(bind=engine, autoflush=False)
+
+    with SessionLocal() as session:
+        user_id = seed(session, args.rows)
+
+    def run(path):
+        def call():
+            with SessionLocal() as session:
+                return path(session, user_id)
+        return call
+
+    default_body = run(default_path)()
+    fast_body = run(fast_path)()
+    if default_body != fast_body:
+        raise SystemExit("Fast path output differs from the default response body")
+
+    default_time = best_of(run(default_path), args.repeat)
+    fast_time = best_of(run(fast_path), args.repeat)
+    print(f"rows={args.rows} body={len(fast_body):,} bytes (identical)")
+    print(f"default path   {default_time * 1000:8.1f} ms")
+    print(f"fast path      {fast_time * 1000:8.1f} ms")
+    print(f"speedup        {default_time / fast_time:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
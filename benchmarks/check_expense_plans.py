@@ -0,0 +1,233 @@
+"""
+Check the SQLite query plans of expense list filters.
+
+Seeds an in-memory database, runs ANALYZE and compiles each filter through
+ExpenseFilterService exactly as GET /expenses does. Each plan must reach
+expenses through one of the expected indexes (never a full ``SCAN``), and
+filters whose sort order an index provides must not sort in a temporary
+B-tree. Results are compared with the same filter evaluated in Python, and
+filters that would scan all of a user's expenses must be rejected. Exits
+non-zero on the first failed check, so it can run in CI.
+
+Usage:
+    python -m benchmarks.check_expense_plans
+    python -m benchmarks.check_expense_plans --rows 50000 --verbose
+"""
+import argparse
+import os
+import random
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Callable, List, Optional, Sequence, Tuple
+
+# The app engine is never connected to; the check uses its own in-memory database.
+os.environ.setdefault("DATABASE_URL", "sqlite:///benchmark.db")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.models import User, Category, Expense, Tag, ExpenseTag
+from app.schemas import ExpenseFilter
+from app.services import ExpenseFilterService
+from app.utils import BadRequestException, to_cents
+
+START = date(2023, 1, 1)
+NOW = datetime(2024, 6, 1)
+WORDS = ("coffee", "lunch", "taxi", "rent", "groceries", "cinema", "books", "flight")
+
+BY_DATE = "ix_expenses_user_id_date"
+BY_CATEGORY = "ix_expenses_user_id_category_id_date"
+BY_AMOUNT = "ix_expenses_user_id_amount_cents"
+BY_UPDATED = "ix_expenses_user_id_updated_at"
+BY_ID = "INTEGER PRIMARY KEY"
+
+
+class Case:
+    """A filter, the indexes its plan may use and whether the index provides its order."""
+
+    def __init__(
+        self,
+        name: str,
+        expense_filter: ExpenseFilter,
+        indexes: Sequence[str],
+        ordered: bool,
+        matches: Callable[[Expense], bool]
+    ):
+        self.name = name
+        self.expense_filter = expense_filter
+        self.indexes = indexes
+        self.ordered = ordered
+        self.matches = matches
+
+
+def seed(session: Session, rows: int, seed_value: int) -> Tuple[int, List[int], List[int]]:
+    rng = random.Random(seed_value)
+    users = [User(email=f"plans{index}@example.com", hashed_password="x") for index in range(2)]
+    session.add_all(users)
+    session.flush()
+    categories = [Category(name=f"Plan {index}", user_id=users[index % 2].id) for index in range(16)]
+    session.add_all(categories)
+    session.flush()
+    tags = [Tag(name=f"tag-{index}", user_id=users[0].id) for index in range(4)]
+    session.add_all(tags)
+    session.flush()
+
+    mappings = []
+    for index in range(rows):
+        user = users[0] if index % 10 else users[1]
+        amount = Decimal(rng.randint(1, 50000)) / 100
+        created = NOW - timedelta(minutes=rows - index)
+        mappings.append({
+            "id": index + 1,
+            "amount": amount,
+            # bulk inserts skip ORM validators, so the mirror column is set here.
+            "amount_cents": to_cents(amount),
+            "date": START + timedelta(days=rng.randrange(540)),
+            "description": f"{rng.choice(WORDS)} {index}",
+            "user_id": user.id,
+            "category_id": rng.choice([category.id for category in categories if category.user_id == user.id]),
+            "created_at": created,
+            "updated_at": created + timedelta(days=rng.choice((0, 0, 0, 30))),
+        })
+    session.bulk_insert_mappings(Expense, mappings)
+    session.bulk_insert_mappings(ExpenseTag, [
+        {"tag_id": tag.id, "expense_id": mapping["id"]}
+        for mapping in mappings if mapping["user_id"] == users[0].id
+        for tag in tags if rng.random() < 0.05
+    ])
+    session.commit()
+    session.execute(text("ANALYZE"))
+    return users[0].id, [category.id for category in categories if category.user_id == users[0].id], [tag.id for tag in tags]
+
+
+def cases(category_ids: List[int]) -> List[Case]:
+    first, second = category_ids[0], category_ids[1]
+    june = (date(2023, 6, 1), date(2023, 6, 30))
+
+    def in_june(expense: Expense) -> bool:
+        return june[0] <= expense.date <= june[1]
+
+    return [
+        Case("default order", ExpenseFilter(), [BY_DATE], True, lambda expense: True),
+        Case("date range", ExpenseFilter(from_date=june[0], to_date=june[1]), [BY_DATE], True, in_june),
+        Case(
+            "category and date range",
+            ExpenseFilter(category_ids=[first], from_date=june[0], to_date=june[1]),
+            [BY_CATEGORY], True,
+            lambda expense: expense.category_id == first and in_june(expense)
+        ),
+        Case(
+            "several categories",
+            ExpenseFilter(category_ids=[first, second]),
+            [BY_CATEGORY, BY_DATE], False,
+            lambda expense: expense.category_id in (first, second)
+        ),
+        Case(
+            "amount range by amount",
+            ExpenseFilter(min_amount=Decimal("10.00"), max_amount=Decimal("12.50"), sort="amount"),
+            [BY_AMOUNT], True,
+            lambda expense: 1000 <= expense.amount_cents <= 1250
+        ),
+        Case("largest first", ExpenseFilter(sort="-amount"), [BY_AMOUNT], True, lambda expense: True),
+        Case(
+            "updated window",
+            ExpenseFilter(updated_from=NOW, sort="-updated_at"),
+            [BY_UPDATED], True,
+            lambda expense: expense.updated_at >= NOW
+        ),
+        Case(
+            "description prefix in a date range",
+            ExpenseFilter(from_date=june[0], to_date=june[1], description_prefix="Taxi"),
+            [BY_DATE], True,
+            lambda expense: in_june(expense) and expense.description.startswith("taxi")
+        ),
+        Case(
+            "created window for a category",
+            ExpenseFilter(category_ids=[first], created_from=NOW - timedelta(days=3)),
+            [BY_CATEGORY], True,
+            lambda expense: expense.category_id == first and expense.created_at >= NOW - timedelta(days=3)
+        ),
+        Case(
+            "all of two tags",
+            ExpenseFilter(tags=["tag-0", "tag-1"], tag_mode="all"),
+            [BY_ID], False,
+            None
+        ),
+    ]
+
+
+REJECTED = (
+    ("description prefix alone", dict(description_prefix="taxi")),
+    ("created window alone", dict(created_from=NOW - timedelta(days=3))),
+    ("inverted date range", dict(from_date=date(2024, 1, 2), to_date=date(2024, 1, 1))),
+    ("inverted amount range", dict(min_amount=Decimal("5"), max_amount=Decimal("1"))),
+)
+
+
+def plan(session: Session, user_id: int, expense_filter: ExpenseFilter) -> Tuple[List[str], List[int]]:
+    query = ExpenseFilterService.order(
+        ExpenseFilterService.apply(session.query(Expense.id), user_id, expense_filter), expense_filter
+    )
+    sql = str(query.statement.compile(session.get_bind(), compile_kwargs={"literal_binds": True}))
+    details = [row[-1] for row in session.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+    return details, [row.id for row in query]
+
+
+def check(case: Case, details: List[str]) -> Optional[str]:
+    steps = [detail for detail in details if " expenses " in f"{detail} "]
+    if any(step.startswith("SCAN") for step in steps):
+        return "full scan of expenses"
+    if not any(index in step for step in steps for index in case.indexes):
+        return f"none of {', '.join(case.indexes)} used"
+    if case.ordered and any("TEMP B-TREE FOR ORDER BY" in detail for detail in details):
+        return "sorted in a temporary B-tree"
+    return None
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Check the query plans of expense list filters.")
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--verbose", action="store_true", help="Print every plan")
+    args = parser.parse_args(argv)
+
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    SessionLocal = sessionmaker(bind=engine, autoflush=False)
+
+    failures = 0
+    with SessionLocal() as session:
+        user_id, category_ids, _ = seed(session, args.rows, args.seed)
+        expenses = session.query(Expense).filter(Expense.user_id == user_id).all()
+
+        for case in cases(category_ids):
+            details, ids = plan(session, user_id, case.expense_filter)
+            problem = check(case, details)
+            if problem is None and case.matches is not None:
+                expected = {expense.id for expense in expenses if case.matches(expense)}
+                if set(ids) != expected:
+                    problem = f"{len(ids)} rows returned, {len(expected)} expected"
+            failures += problem is not None
+            print(f"{'FAIL' if problem else 'ok':<5} {case.name}" + (f": {problem}" if problem else ""))
+            if args.verbose or problem:
+                for detail in details:
+                    print(f"        {detail}")
+
+        for name, fields in REJECTED:
+            try:
+                ExpenseFilterService.validate(ExpenseFilter(**fields))
+            except BadRequestException:
+                print(f"{'ok':<5} rejects {name}")
+            else:
+                failures += 1
+                print(f"{'FAIL':<5} rejects {name}: accepted")
+
+    if failures:
+        raise SystemExit(f"{failures} check(s) failed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Check that embedding category names in expense reads does not cause N+1 queries.
+
+Seeds an in-memory database and calls GET /expenses?include=category and
+GET /expenses/{id}?include=category through the app, counting the SQL
+statements each request executes with a ``before_cursor_execute``
+listener. A list of one expense and a list of many must run the same
+number of statements, and every category_name must match the expense's
+category. Exits non-zero on the first failed check, so it can run in CI.
+
+Usage:
+    python -m benchmarks.check_expense_queries
+    python -m benchmarks.check_expense_queries --rows 500 --verbose
+"""
+import argparse
+import os
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Dict, List, Tuple
+
+# The app engine is never connected to; the check uses its own in-memory database.
+os.environ.setdefault("DATABASE_URL", "sqlite:///benchmark.db")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base, get_db
+from app.main import app
+from app.models import User, Category, Expense
+from app.utils import create_access_token, to_cents
+
+START = date(2024, 1, 1)
+NOW = datetime(2024, 6, 1)
+
+
+def seed(session: Session, rows: int) -> Tuple[Dict[str, int], Dict[int, str]]:
+    users = {"one": User(email="one@example.com", hashed_password="x"), "many": User(email="many@example.com", hashed_password="x")}
+    session.add_all(users.values())
+    session.flush()
+    categories = [Category(name=f"Query {index}", user_id=users[key].id) for index, key in enumerate(("one", "many", "many", "many"))]
+    session.add_all(categories)
+    session.flush()
+
+    owned = [(users["one"], categories[0], 1)] + [(users["many"], category, rows) for category in categories[1:]]
+    mappings = []
+    for user, category, count in owned:
+        for index in range(count):
+            amount = Decimal(index % 5000) / 100 + Decimal("0.01")
+            mappings.append({
+                "amount": amount,
+                # bulk inserts skip ORM validators, so the mirror column is set here.
+                "amount_cents": to_cents(amount),
+                "date": START + timedelta(days=index % 300),
+                "description": f"query {index}",
+                "user_id": user.id,
+                "category_id": category.id,
+                "created_at": NOW,
+                "updated_at": NOW,
+            })
+    session.bulk_insert_mappings(Expense, mappings)
+    session.commit()
+    return {key: user.id for key, user in users.items()}, {category.id: category.name for category in categories}
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Check the statement counts of expense reads with include=category.")
+    parser.add_argument("--rows", type=int, default=200, help="Expenses per category of the user with many")
+    parser.add_argument("--verbose", action="store_true", help="Print every statement")
+    args = parser.parse_args(argv)
+
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    SessionLocal = sessionmaker(bind=engine, autoflush=False)
+
+    with SessionLocal() as session:
+        user_ids, category_names = seed(session, args.rows)
+        expense_id = session.query(Expense.id).filter(Expense.user_id == user_ids["many"]).limit(1).scalar()
+
+    def override_get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    statements: List[str] = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    app.dependency_overrides[get_db] = override_get_db
+    client = TestClient(app)
+
+    def request(user: str, path: str) -> Tuple[int, object]:
+        token = create_access_token({"sub": str(user_ids[user])})
+        statements.clear()
+        response = client.get(path, headers={"Authorization": f"Bearer {token}"})
+        if response.status_code != 200:
+            raise SystemExit(f"GET {path} returned {response.status_code}: {response.text}")
+        if args.verbose:
+            for statement in statements:
+                print(f"        {' '.join(statement.split())[:120]}")
+        return len(statements), response.json()
+
+    # The FX rate table behind every ETag is loaded once per process; load it
+    # before counting so the first checked request does not pay for it.
+    request("one", "/expenses/")
+
+    failures = 0
+
+    def report(name: str, problem: str = None) -> None:
+        nonlocal failures
+        failures += problem is not None
+        print(f"{'FAIL' if problem else 'ok':<5} {name}" + (f": {problem}" if problem else ""))
+
+    def names_match(rows: List[dict]) -> bool:
+        return all(row["category_name"] == category_names[row["category_id"]] for row in rows)
+
+    for suffix in ("", "&fields=id,category_id"):
+        path = f"/expenses/?include=category{suffix}"
+        single, rows_one = request("one", path)
+        many, rows_many = request("many", path)
+        problem = None
+        if single != many:
+            problem = f"{single} statements for 1 row, {many} for {len(rows_many)}"
+        elif len(rows_one) != 1 or len(rows_many) != 3 * args.rows:
+            problem = f"{len(rows_one)} and {len(rows_many)} rows returned"
+        elif not names_match(rows_one + rows_many):
+            problem = "wrong category_name"
+        report(f"GET {path}: {many} statements for 1 and {len(rows_many)} rows", problem)
+
+    path = f"/expenses/{expense_id}?include=category"
+    plain, _ = request("many", f"/expenses/{expense_id}")
+    embedded, row = request("many", path)
+    problem = None
+    if embedded > plain:
+        problem = f"{embedded} statements, {plain} without include"
+    elif not names_match([row]):
+        problem = "wrong category_name"
+    report(f"GET {path}: {embedded} statements", problem)
+
+    app.dependency_overrides.clear()
+    if failures:
+        raise SystemExit(f"{failures} check(s) failed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+"""
+HTTP load-test harness with weighted workload profiles.
+
+Virtual users register, log in and seed a category, then repeatedly pick an
+operation from the selected profile's weighted mix until the run ends.
+Latencies are recorded per operation and summarised as throughput,
+p50/p95/p99 and error rate.
+
+The harness can launch uvicorn itself so that worker count and database
+pool size (``DB_POOL_SIZE`` / ``DB_MAX_OVERFLOW``) can be varied per run.
+
+Usage:
+    python -m benchmarks.loadtest --profile month-end --users 200 --duration 60 \\
+        --launch --workers 4 --pool-size 10 --max-overflow 20
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+# Operation name -> relative weight.
+PROFILES: Dict[str, Dict[str, int]] = {
+    "browse": {
+        "list_expenses": 45,
+        "list_categories": 20,
+        "create_expense": 10,
+        "monthly_report": 15,
+        "category_report": 10,
+    },
+    "month-end": {
+        "monthly_report": 40,
+        "category_report": 40,
+        "list_expenses": 15,
+        "create_expense": 5,
+    },
+    "write-heavy": {
+        "create_expense": 70,
+        "list_expenses": 20,
+        "monthly_report": 10,
+    },
+    "login-storm": {
+        "login": 70,
+        "list_categories": 20,
+        "list_expenses": 10,
+    },
+}
+
+
+@dataclass
+class OperationStats:
+    """Latency samples and error count for one operation."""
+    latencies_ms: List[float] = field(default_factory=list)
+    errors: int = 0
+
+    def record(self, elapsed_ms: float, ok: bool) -> None:
+        self.latencies_ms.append(elapsed_ms)
+        if not ok:
+            self.errors += 1
+
+    def percentile(self, q: float) -> float:
+        if not self.latencies_ms:
+            return 0.0
+        ordered = sorted(self.latencies_ms)
+        index = min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))
+        return ordered[index]
+
+
+class VirtualUser:
+    """A simulated client with its own account and auth token."""
+
+    def __init__(self, client: httpx.AsyncClient, email: str, password: str):
+        self.client = client
+        self.email = email
+        self.password = password
+        self.headers: Dict[str, str] = {}
+        self.category_id: Optional[int] = None
+        self.today = date.today()
+
+    async def setup(self) -> None:
+        """Register the account, log in and create a category to write into."""
+        await self.client.post("/auth/register", json={"email": self.email, "password": self.password})
+        response = await self.login()
+        response.raise_for_status()
+        response = await self.client.post(
+            "/categories/", json={"name": "Load test"}, headers=self.headers
+        )
+        response.raise_for_status()
+        self.category_id = response.json()["id"]
+
+    async def login(self) -> httpx.Response:
+        response = await self.client.post(
+            "/auth/login", data={"username": self.email, "password": self.password}
+        )
+        if response.status_code == 200:
+            self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        return response
+
+    async def list_expenses(self) -> httpx.Response:
+        return await self.client.get("/expenses/", headers=self.headers)
+
+    async def list_categories(self) -> httpx.Response:
+        return await self.client.get("/categories/", headers=self.headers)
+
+    async def create_expense(self) -> httpx.Response:
+        payload = {
+            "amount": f"{random.uniform(1, 200):.2f}",
+            "date": self.today.isoformat(),
+            "description": "Load test expense",
+            "category_id": self.category_id,
+        }
+        return await self.client.post("/expenses/", json=payload, headers=self.headers)
+
+    async def monthly_report(self) -> httpx.Response:
+        params = {"year": self.today.year, "month": self.today.month}
+        return await self.client.get("/reports/monthly", params=params, headers=self.headers)
+
+    async def category_report(self) -> httpx.Response:
+        params = {"year": self.today.year, "month": self.today.month}
+        return await self.client.get("/reports/monthly/by-category", params=params, headers=self.headers)
+
+    def operation(self, name: str) -> Callable[[], Awaitable[httpx.Response]]:
+        return getattr(self, name)
+
+
+async def run_virtual_user(
+    user: VirtualUser,
+    mix: Dict[str, int],
+    deadline: float,
+    think_time: float,
+    stats: Dict[str, OperationStats]
+) -> None:
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    while time.perf_counter() < deadline:
+        name = random.choices(names, weights=weights)[0]
+        started = time.perf_counter()
+        try:
+            response = await user.operation(name)()
+            ok = response.status_code < 400
+        except httpx.HTTPError:
+            ok = False
+        stats[name].record((time.perf_counter() - started) * 1000, ok)
+        if think_time:
+            await asyncio.sleep(random.uniform(0, 2 * think_time))
+
+
+async def run_load_test(
+    base_url: str,
+    profile: str,
+    users: int,
+    duration: float,
+    ramp_up: float,
+    think_time: float,
+    password: str
+) -> Dict[str, OperationStats]:
+    """
+    Run one load test against a running server.
+
+    Args:
+        base_url: Server base URL
+        profile: Name of the workload mix in PROFILES
+        users: Number of concurrent virtual users
+        duration: Measured run time in seconds (after setup)
+        ramp_up: Seconds over which virtual users are started
+        think_time: Mean pause between operations of one user, in seconds
+        password: Password for the virtual user accounts
+
+    Returns:
+        Per-operation statistics
+    """
+    mix = PROFILES[profile]
+    run_id = uuid.uuid4().hex[:8]
+    limits = httpx.Limits(max_connections=users, max_keepalive_connections=users)
+    stats: Dict[str, OperationStats] = defaultdict(OperationStats)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60.0) as client:
+        virtual_users = [
+            VirtualUser(client, f"vu-{run_id}-{index}@loadtest.example.com", password)
+            for index in range(users)
+        ]
+        await asyncio.gather(*(user.setup() for user in virtual_users))
+
+        deadline = time.perf_counter() + ramp_up + duration
+        tasks = []
+        for user in virtual_users:
+            if ramp_up:
+                await asyncio.sleep(ramp_up / users)
+            tasks.append(asyncio.create_task(
+                run_virtual_user(user, mix, deadline, think_time, stats)
+            ))
+        await asyncio.gather(*tasks)
+
+    return stats
+
+
+def summarize(stats: Dict[str, OperationStats], elapsed: float) -> List[dict]:
+    rows = []
+    for name in sorted(stats):
+        op = stats[name]
+        count = len(op.latencies_ms)
+        rows.append({
+            "operation": name,
+            "requests": count,
+            "rps": round(count / elapsed, 1),
+            "p50_ms": round(op.percentile(0.50), 1),
+            "p95_ms": round(op.percentile(0.95), 1),
+            "p99_ms": round(op.percentile(0.99), 1),
+            "error_rate": round(op.errors / count, 4) if count else 0.0,
+        })
+    return rows
+
+
+def print_table(rows: List[dict]) -> None:
+    header = f"{'operation':<18}{'requests':>10}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>9}"
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        print(
+            f"{row['operation']:<18}{row['requests']:>10}{row['rps']:>10}"
+            f"{row['p50_ms']:>10}{row['p95_ms']:>10}{row['p99_ms']:>10}{row['error_rate']:>9.2%}"
+        )
+
+
+def launch_server(port: int, workers: int, pool_size: int, max_overflow: int) -> subprocess.Popen:
+    """Start uvicorn in a subprocess and wait until /health answers."""
+    env = dict(os.environ, DB_POOL_SIZE=str(pool_size), DB_MAX_OVERFLOW=str(max_overflow))
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app",
+         "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+        env=env
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health").status_code == 200:
+                return process
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("uvicorn did not become healthy within 30 seconds")
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Run a mixed-workload HTTP load test.")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="browse")
+    parser.add_argument("--users", type=int, default=50, help="Concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=30.0, help="Measured seconds")
+    parser.add_argument("--ramp-up", type=float, default=0.0, help="Seconds to start all users")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Mean pause between requests")
+    parser.add_argument("--password", default="loadtest-password")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--launch", action="store_true", help="Start uvicorn for the run")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--pool-size", type=int, default=10)
+    parser.add_argument("--max-overflow", type=int, default=20)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args(argv)
+
+    server = None
+    base_url = args.base_url
+    if args.launch:
+        server = launch_server(args.port, args.workers, args.pool_size, args.max_overflow)
+        base_url = f"http://127.0.0.1:{args.port}"
+
+    try:
+        stats = asyncio.run(run_load_test(
+            base_url, args.profile, args.users, args.duration,
+            args.ramp_up, args.think_time, args.password
+        ))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    rows = summarize(stats, args.ramp_up + args.duration)
+    if args.json:
+        print(json.dumps({"profile": args.profile, "users": args.users, "results": rows}, indent=2))
+    else:
+        print(f"profile={args.profile} users={args.users} duration={args.duration}s")
+        print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
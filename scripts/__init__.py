@@ -0,0 +1,5 @@
+"""
+Operational scripts for the Expense Tracker API.
+
+Each module is runnable with ``python -m scripts.<name>`` from the project root.
+"""
@@ -0,0 +1,66 @@
+"""
+Move old expenses into cold storage, or bring an archived year back.
+
+Each user's expenses from years that ended more than ARCHIVE_AFTER_YEARS
+ago are written to one compressed Parquet file per year under ARCHIVE_DIR
+and deleted from the expenses table; lists, reports and statistics keep
+reading them from the files. Meant to run from cron, e.g. once a month.
+Every user and year is committed on its own, so the job can be re-run or
+resumed after a failure.
+
+Archived expenses are read-only. Restore a year to edit them again.
+
+Usage:
+    python -m scripts.archive_expenses
+    python -m scripts.archive_expenses --before-year 2023 --user-id 42
+    python -m scripts.archive_expenses --restore 2021 --user-id 42
+"""
+import argparse
+import os
+import time
+from datetime import date
+
+from app.config import get_settings
+from app.database import SessionLocal
+from app.models import Expense
+from app.services import ArchiveService
+
+settings = get_settings()
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Archive old expenses to Parquet files.")
+    parser.add_argument(
+        "--before-year", type=int,
+        help="Archive expenses dated before this year (default: this year minus ARCHIVE_AFTER_YEARS)"
+    )
+    parser.add_argument("--restore", type=int, metavar="YEAR", help="Move this archived year back into the database")
+    parser.add_argument("--user-id", type=int, action="append", help="Only process these users")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        if args.restore is not None:
+            user_ids = args.user_id
+            if not user_ids and os.path.isdir(settings.archive_dir):
+                user_ids = sorted(int(name) for name in os.listdir(settings.archive_dir) if name.isdigit())
+            user_ids = user_ids or []
+            moved = sum(ArchiveService.restore_year(db, user_id, args.restore) for user_id in user_ids)
+            action = f"Restored {moved:,} expenses of {args.restore}"
+        else:
+            before_year = args.before_year or date.today().year - settings.archive_after_years
+            query = db.query(Expense.user_id).filter(Expense.date < date(before_year, 1, 1)).distinct()
+            if args.user_id:
+                query = query.filter(Expense.user_id.in_(args.user_id))
+            user_ids = sorted(user_id for (user_id,) in query)
+            moved = sum(ArchiveService.archive_user(db, user_id, before_year) for user_id in user_ids)
+            action = f"Archived {moved:,} expenses dated before {before_year}"
+    finally:
+        db.close()
+
+    print(f"{action} for {len(user_ids):,} users in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
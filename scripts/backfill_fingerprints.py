@@ -0,0 +1,70 @@
+"""
+Compute expenses.fingerprint for rows written before the column existed.
+
+Duplicate detection only sees expenses that have a fingerprint. Run this once
+after upgrading to the duplicate-detection migration. Rows are processed in
+id order and each batch is committed separately, so the script can be
+interrupted and re-run. Occurrences of recurring expenses are skipped; they
+are deduplicated by their (recurring_id, date) key instead.
+
+Usage:
+    python -m scripts.backfill_fingerprints
+    python -m scripts.backfill_fingerprints --batch-size 50000
+"""
+import argparse
+import time
+
+from sqlalchemy import bindparam, select, update
+
+from app.database import SessionLocal
+from app.models import Expense
+from app.utils import expense_fingerprint, to_cents
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Backfill expense fingerprints.")
+    parser.add_argument("--batch-size", type=int, default=10000, help="Rows per transaction")
+    args = parser.parse_args(argv)
+
+    table = Expense.__table__
+    statement = (
+        update(table)
+        .where(table.c.id == bindparam("expense_id"))
+        .values(fingerprint=bindparam("expense_fingerprint"))
+    )
+
+    started = time.perf_counter()
+    updated = 0
+    cursor = 0
+    db = SessionLocal()
+    try:
+        while True:
+            rows = db.execute(
+                select(table.c.id, table.c.amount, table.c.currency, table.c.date, table.c.description)
+                .where(table.c.id > cursor, table.c.fingerprint.is_(None), table.c.recurring_id.is_(None))
+                .order_by(table.c.id)
+                .limit(args.batch_size)
+            ).all()
+            if not rows:
+                break
+
+            db.execute(statement, [
+                {
+                    "expense_id": row.id,
+                    "expense_fingerprint": expense_fingerprint(
+                        to_cents(row.amount), row.currency, row.date, row.description
+                    ),
+                }
+                for row in rows
+            ])
+            db.commit()
+            updated += len(rows)
+            cursor = rows[-1].id
+    finally:
+        db.close()
+
+    print(f"Fingerprinted {updated:,} expenses in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,356 @@
+"""
+Synthetic data generator for scale testing.
+
+Generates users, categories, expenses and tags with realistic distributions
+(long-tailed expense counts, heavy users, seasonal spending) and bulk-loads
+them into the configured database. PostgreSQL is loaded through ``COPY``;
+other backends fall back to batched ``executemany`` inserts.
+
+Output is fully determined by ``--seed``: every user draws from its own
+random stream, so the same seed always produces the same rows regardless
+of batch size.
+
+Usage:
+    python -m scripts.generate_data --users 10000 --seed 42
+"""
+import argparse
+import csv
+import io
+import math
+import random
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+from sqlalchemy import func, select, text
+from sqlalchemy.engine import Connection
+
+from app.database import Base, engine
+from app.models import User, Category, Expense, Tag
+from app.schemas import DEFAULT_CURRENCY
+from app.utils import hash_password, to_cents, expense_fingerprint
+
+# (name, median amount) pairs; earlier entries are more popular.
+CATEGORY_CATALOG: Sequence[Tuple[str, float]] = (
+    ("Groceries", 45.0),
+    ("Restaurants", 30.0),
+    ("Transport", 15.0),
+    ("Utilities", 90.0),
+    ("Rent", 1200.0),
+    ("Entertainment", 25.0),
+    ("Health", 60.0),
+    ("Shopping", 55.0),
+    ("Travel", 350.0),
+    ("Subscriptions", 12.0),
+    ("Education", 80.0),
+    ("Gifts", 40.0),
+    ("Home", 75.0),
+    ("Pets", 35.0),
+    ("Insurance", 150.0),
+    ("Coffee", 4.5),
+)
+
+DESCRIPTION_WORDS: Sequence[str] = (
+    "weekly", "monthly", "online", "store", "market", "order", "payment",
+    "refill", "ticket", "dinner", "lunch", "breakfast", "service", "fee",
+    "purchase", "delivery", "bill", "trip", "card", "cash",
+)
+
+# Tags a user may use; earlier entries are more popular.
+TAG_CATALOG: Sequence[str] = (
+    "reimbursable", "business", "shared", "trip-2024", "cash", "tax-deductible",
+    "trip-2023", "family", "work-lunch", "gift",
+)
+
+
+@dataclass(frozen=True)
+class GeneratorConfig:
+    """Parameters controlling the shape of the generated data set."""
+    users: int
+    seed: int = 42
+    start_date: date = date(2022, 1, 1)
+    end_date: date = date(2024, 12, 31)
+    categories_min: int = 3
+    categories_max: int = 10
+    expenses_mean: float = 200.0
+    expenses_sigma: float = 1.0
+    heavy_user_fraction: float = 0.02
+    heavy_user_multiplier: float = 25.0
+    seasonality: float = 0.3
+    tags_max: int = 5
+    tagged_fraction: float = 0.3
+    batch_size: int = 10000
+    password: str = "password"
+    email_domain: str = "loadtest.example.com"
+
+
+def seasonal_weight(day: date, amplitude: float) -> float:
+    """
+    Relative spending intensity for a given day.
+
+    Spending peaks in December, dips in late winter and is slightly higher
+    on weekends.
+
+    Args:
+        day: Calendar day
+        amplitude: Strength of the yearly cycle (0 disables seasonality)
+
+    Returns:
+        Weight in the range (0, 1 + amplitude + 0.15]
+    """
+    yearly = 1.0 + amplitude * math.cos(2 * math.pi * (day.month - 12) / 12)
+    weekend = 1.15 if day.weekday() >= 5 else 1.0
+    return yearly * weekend
+
+
+class DataGenerator:
+    """Deterministic row generator for users, categories, expenses and tags."""
+
+    def __init__(self, config: GeneratorConfig, hashed_password: str):
+        self.config = config
+        self.hashed_password = hashed_password
+        self.span_days = (config.end_date - config.start_date).days + 1
+        self.max_weight = (1.0 + config.seasonality) * 1.15
+        self.created_at = datetime.combine(config.end_date, datetime.min.time())
+        self.category_weights = [1.0 / (rank + 1) for rank in range(len(CATEGORY_CATALOG))]
+
+    def user_rng(self, user_index: int) -> random.Random:
+        """Return the independent random stream for one user."""
+        return random.Random(f"{self.config.seed}:{user_index}")
+
+    def pick_categories(self, rng: random.Random) -> List[Tuple[str, float]]:
+        """Pick a Zipf-weighted set of distinct categories for a user."""
+        count = rng.randint(self.config.categories_min, self.config.categories_max)
+        count = min(count, len(CATEGORY_CATALOG))
+        chosen: Dict[int, None] = {}
+        while len(chosen) < count:
+            index = rng.choices(range(len(CATEGORY_CATALOG)), weights=self.category_weights)[0]
+            chosen[index] = None
+        return [CATEGORY_CATALOG[index] for index in chosen]
+
+    def expense_count(self, rng: random.Random) -> int:
+        """Draw a long-tailed expense count, boosted for heavy users."""
+        mu = math.log(self.config.expenses_mean) - self.config.expenses_sigma ** 2 / 2
+        count = rng.lognormvariate(mu, self.config.expenses_sigma)
+        if rng.random() < self.config.heavy_user_fraction:
+            count *= self.config.heavy_user_multiplier
+        return max(1, int(count))
+
+    def expense_date(self, rng: random.Random) -> date:
+        """Draw a date using rejection sampling against the seasonal weight."""
+        while True:
+            day = self.config.start_date + timedelta(days=rng.randrange(self.span_days))
+            if rng.random() * self.max_weight <= seasonal_weight(day, self.config.seasonality):
+                return day
+
+    def generate(
+        self,
+        first_user_id: int,
+        first_category_id: int,
+        first_expense_id: int,
+        first_tag_id: int
+    ) -> Iterator[Tuple[str, tuple]]:
+        """
+        Yield ``(table, row)`` pairs for the whole data set.
+
+        Rows carry explicit primary keys so they can be bulk-loaded without
+        a round-trip per insert.
+
+        Args:
+            first_user_id: First free users.id
+            first_category_id: First free categories.id
+            first_expense_id: First free expenses.id
+            first_tag_id: First free tags.id
+        """
+        category_id = first_category_id
+        expense_id = first_expense_id
+        tag_id = first_tag_id
+        for user_index in range(self.config.users):
+            rng = self.user_rng(user_index)
+            user_id = first_user_id + user_index
+            email = f"user{self.config.seed}-{user_index}@{self.config.email_domain}"
+            yield "users", (user_id, email, self.hashed_password, self.created_at, self.created_at)
+
+            categories = self.pick_categories(rng)
+            category_ids = []
+            for name, _ in categories:
+                yield "categories", (category_id, name, None, user_id, self.created_at, self.created_at)
+                yield "category_closure", (category_id, category_id, 0)
+                category_ids.append(category_id)
+                category_id += 1
+
+            tag_ids = []
+            for name in TAG_CATALOG[:rng.randint(0, self.config.tags_max)]:
+                yield "tags", (tag_id, user_id, name, self.created_at)
+                tag_ids.append(tag_id)
+                tag_id += 1
+
+            weights = [1.0 / (rank + 1) for rank in range(len(categories))]
+            for _ in range(self.expense_count(rng)):
+                slot = rng.choices(range(len(categories)), weights=weights)[0]
+                name, median = categories[slot]
+                amount = Decimal(str(round(max(0.01, rng.lognormvariate(math.log(median), 0.6)), 2)))
+                description = f"{name} {rng.choice(DESCRIPTION_WORDS)} {rng.choice(DESCRIPTION_WORDS)}"
+                cents = to_cents(amount)
+                day = self.expense_date(rng)
+                yield "expenses", (
+                    expense_id, amount, cents, expense_fingerprint(cents, DEFAULT_CURRENCY, day, description), day,
+                    description, user_id, category_ids[slot], self.created_at, self.created_at
+                )
+                if tag_ids and rng.random() < self.config.tagged_fraction:
+                    for expense_tag_id in rng.sample(tag_ids, rng.randint(1, min(2, len(tag_ids)))):
+                        yield "expense_tags", (expense_tag_id, expense_id)
+                expense_id += 1
+
+
+TABLE_COLUMNS: Dict[str, Sequence[str]] = {
+    "users": ("id", "email", "hashed_password", "created_at", "updated_at"),
+    "categories": ("id", "name", "description", "user_id", "created_at", "updated_at"),
+    "category_closure": ("ancestor_id", "descendant_id", "depth"),
+    "tags": ("id", "user_id", "name", "created_at"),
+    "expenses": ("id", "amount", "amount_cents", "fingerprint", "date", "description", "user_id", "category_id", "created_at", "updated_at"),
+    "expense_tags": ("tag_id", "expense_id"),
+}
+
+
+class BulkLoader:
+    """Buffers generated rows per table and flushes them in batches."""
+
+    def __init__(self, connection: Connection, batch_size: int):
+        self.connection = connection
+        self.batch_size = batch_size
+        self.use_copy = connection.dialect.name == "postgresql"
+        self.buffers: Dict[str, List[tuple]] = {table: [] for table in TABLE_COLUMNS}
+        self.counts: Dict[str, int] = {table: 0 for table in TABLE_COLUMNS}
+
+    def add(self, table: str, row: tuple) -> None:
+        """Queue a row, flushing the table's buffer when it is full."""
+        buffer = self.buffers[table]
+        buffer.append(row)
+        if len(buffer) >= self.batch_size:
+            self.flush_all()
+
+    def flush_all(self) -> None:
+        """Flush every table in foreign-key order."""
+        for table in TABLE_COLUMNS:
+            self._flush(table)
+
+    def _flush(self, table: str) -> None:
+        rows = self.buffers[table]
+        if not rows:
+            return
+        columns = TABLE_COLUMNS[table]
+        if self.use_copy:
+            self._copy(table, columns, rows)
+        else:
+            self.connection.execute(
+                Base.metadata.tables[table].insert(),
+                [dict(zip(columns, row)) for row in rows]
+            )
+        self.counts[table] += len(rows)
+        self.buffers[table] = []
+
+    def _copy(self, table: str, columns: Sequence[str], rows: List[tuple]) -> None:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerows(rows)
+        buffer.seek(0)
+        cursor = self.connection.connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+                buffer
+            )
+        finally:
+            cursor.close()
+
+
+def next_id(connection: Connection, model) -> int:
+    """Return the first primary key above the current maximum."""
+    return (connection.execute(select(func.coalesce(func.max(model.id), 0))).scalar() or 0) + 1
+
+
+def reset_sequences(connection: Connection) -> None:
+    """Move PostgreSQL serial sequences past the explicitly loaded ids."""
+    if connection.dialect.name != "postgresql":
+        return
+    for table, columns in TABLE_COLUMNS.items():
+        if "id" not in columns:
+            continue
+        connection.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+            f"(SELECT COALESCE(MAX(id), 1) FROM {table}))"
+        ))
+
+
+def run(config: GeneratorConfig) -> Dict[str, int]:
+    """
+    Generate and load a data set in a single transaction.
+
+    Args:
+        config: Generator parameters
+
+    Returns:
+        Number of rows loaded per table
+    """
+    hashed_password = hash_password(config.password)
+    generator = DataGenerator(config, hashed_password)
+
+    with engine.begin() as connection:
+        loader = BulkLoader(connection, config.batch_size)
+        rows = generator.generate(
+            next_id(connection, User),
+            next_id(connection, Category),
+            next_id(connection, Expense),
+            next_id(connection, Tag)
+        )
+        for table, row in rows:
+            loader.add(table, row)
+        loader.flush_all()
+        reset_sequences(connection)
+
+    return loader.counts
+
+
+def parse_args(argv=None) -> GeneratorConfig:
+    parser = argparse.ArgumentParser(description="Generate synthetic expense data for scale testing.")
+    parser.add_argument("--users", type=int, required=True, help="Number of users to generate")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed (same seed, same data)")
+    parser.add_argument("--start-date", type=date.fromisoformat, default=date(2022, 1, 1))
+    parser.add_argument("--end-date", type=date.fromisoformat, default=date(2024, 12, 31))
+    parser.add_argument("--categories-min", type=int, default=3)
+    parser.add_argument("--categories-max", type=int, default=10)
+    parser.add_argument("--expenses-mean", type=float, default=200.0,
+                        help="Mean number of expenses per regular user")
+    parser.add_argument("--expenses-sigma", type=float, default=1.0,
+                        help="Log-normal sigma of the per-user expense count (long tail)")
+    parser.add_argument("--heavy-user-fraction", type=float, default=0.02)
+    parser.add_argument("--heavy-user-multiplier", type=float, default=25.0)
+    parser.add_argument("--seasonality", type=float, default=0.3,
+                        help="Amplitude of the yearly spending cycle (0 disables it)")
+    parser.add_argument("--tags-max", type=int, default=5, help="Most tags a user has")
+    parser.add_argument("--tagged-fraction", type=float, default=0.3,
+                        help="Share of expenses carrying one or two tags")
+    parser.add_argument("--batch-size", type=int, default=10000)
+    parser.add_argument("--password", default="password",
+                        help="Password shared by all generated users (hashed once)")
+    parser.add_argument("--email-domain", default="loadtest.example.com")
+    args = parser.parse_args(argv)
+    return GeneratorConfig(**vars(args))
+
+
+def main(argv=None) -> None:
+    config = parse_args(argv)
+    started = time.perf_counter()
+    counts = run(config)
+    elapsed = time.perf_counter() - started
+    total = sum(counts.values())
+    for table, count in counts.items():
+        print(f"{table:<12} {count:>12,}")
+    print(f"Loaded {total:,} rows in {elapsed:.1f}s ({total / elapsed * 60:,.0f} rows/min)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+Load exchange rates into the fx_rates table from a local CSV file.
+
+The file needs ``date``, ``currency`` and ``rate`` columns, with rates quoted
+as units of the currency per one unit of a pivot currency (as in the ECB
+reference rate files, where the pivot is EUR). Rows for the pivot itself are
+added at 1.0 for every date in the file. Existing rates for the same
+currency and date are replaced; other rows are left untouched.
+
+Users with expenses converted at a rate that changed (or is new) get their
+budgets' monthly spend rebuilt and their data version bumped, so cached
+reports, statistics and ETags are refreshed. Running API processes convert
+with the new rates once their in-memory rate table expires
+(``FX_CACHE_TTL_SECONDS``); ETags and cached statistics carry the rate
+table's version, so they change again at that point.
+
+Usage:
+    python -m scripts.load_fx_rates rates.csv --pivot EUR
+"""
+import argparse
+import csv
+import time
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from typing import Dict, Iterator, List, Tuple
+
+from sqlalchemy import and_, delete, or_, select, tuple_
+
+from app.database import SessionLocal, engine
+from app.models import Expense, FxRate, User
+from app.services import ArchiveService, BudgetService, DataVersionService, FxService
+
+RateKey = Tuple[str, date]
+
+
+def read_rates(path: str, pivot: str) -> Dict[RateKey, Decimal]:
+    """
+    Read a rates file into a {(currency, date): rate} mapping.
+
+    Raises:
+        SystemExit: If a row is malformed
+    """
+    rates: Dict[RateKey, Decimal] = {}
+    with open(path, newline="") as handle:
+        for line, row in enumerate(csv.DictReader(handle), start=2):
+            try:
+                currency = row["currency"].strip().upper()
+                day = date.fromisoformat(row["date"].strip())
+                rate = Decimal(row["rate"].strip())
+            except (KeyError, AttributeError, ValueError, InvalidOperation):
+                raise SystemExit(f"{path}:{line}: expected date,currency,rate")
+            if len(currency) != 3 or rate <= 0:
+                raise SystemExit(f"{path}:{line}: invalid currency or rate")
+            rates[(currency, day)] = rate
+            rates[(pivot, day)] = Decimal(1)
+    return rates
+
+
+def chunks(items: List[RateKey], size: int) -> Iterator[List[RateKey]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def load(rates: Dict[RateKey, Decimal], batch_size: int) -> Dict[str, date]:
+    """
+    Replace the given rates in a single transaction.
+
+    Returns:
+        Earliest date of a new or changed rate, per currency
+    """
+    changed: Dict[str, date] = {}
+    keys = sorted(rates)
+    with engine.begin() as connection:
+        for batch in chunks(keys, batch_size):
+            existing = {
+                (currency, day): rate for currency, day, rate in connection.execute(
+                    select(FxRate.currency, FxRate.rate_date, FxRate.rate).where(
+                        tuple_(FxRate.currency, FxRate.rate_date).in_(batch)
+                    )
+                )
+            }
+            for currency, day in batch:
+                if existing.get((currency, day)) != rates[(currency, day)] and day < changed.get(currency, date.max):
+                    changed[currency] = day
+            connection.execute(delete(FxRate).where(
+                tuple_(FxRate.currency, FxRate.rate_date).in_(batch)
+            ))
+            connection.execute(FxRate.__table__.insert(), [
+                {"currency": currency, "rate_date": day, "rate": rates[(currency, day)]}
+                for currency, day in batch
+            ])
+    return changed
+
+
+def refresh_users(changed: Dict[str, date]) -> int:
+    """
+    Rebuild the monthly spend and bump the data version of every user with
+    expenses converted at a changed rate, i.e. in or into a changed currency
+    on or after its first changed date (later days carry the rate forward).
+    Each user is committed separately.
+
+    Returns:
+        Number of users refreshed
+    """
+    if not changed:
+        return 0
+
+    FxService.invalidate()
+    with SessionLocal() as db:
+        affected = db.query(Expense.user_id).join(User, User.id == Expense.user_id).filter(
+            Expense.currency != User.base_currency,
+            or_(*(
+                and_(or_(Expense.currency == currency, User.base_currency == currency), Expense.date >= day)
+                for currency, day in changed.items()
+            ))
+        ).distinct()
+        user_ids = {user_id for (user_id,) in affected}
+
+        base_currencies = dict(db.query(User.id, User.base_currency))
+        for user_id in ArchiveService.user_ids():
+            base_currency = base_currencies.get(user_id)
+            if base_currency is None or user_id in user_ids:
+                continue
+            if any(
+                total.currency != base_currency and any(
+                    code in changed and total.date >= changed[code] for code in (total.currency, base_currency)
+                )
+                for total in ArchiveService.get_daily_totals(user_id)
+            ):
+                user_ids.add(user_id)
+
+        for user_id in sorted(user_ids):
+            BudgetService.rebuild_monthly_spend(
+                db, user_id, base_currencies[user_id], ArchiveService.get_daily_totals(user_id)
+            )
+            DataVersionService.bump(db, user_id)
+            db.commit()
+    return len(user_ids)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Load FX rates from a CSV file.")
+    parser.add_argument("path", help="CSV file with date,currency,rate columns")
+    parser.add_argument("--pivot", default="EUR", help="Currency the rates are quoted against")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    rates = read_rates(args.path, args.pivot.upper())
+    changed = load(rates, args.batch_size)
+    refreshed = refresh_users(changed)
+    currencies = {currency for currency, _ in rates}
+    print(
+        f"Loaded {len(rates):,} rates for {len(currencies)} currencies "
+        f"({len(changed)} changed, {refreshed:,} users refreshed) in {time.perf_counter() - started:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+Create the expenses of recurring expense occurrences that have come due.
+
+Meant to run from cron, e.g. daily shortly after midnight UTC. Rules are
+processed in batches, each committed on its own; expenses are unique per rule
+and date, so the job can be re-run or resumed after a failure without
+creating duplicates.
+
+Usage:
+    python -m scripts.materialize_recurring
+    python -m scripts.materialize_recurring --as-of 2024-01-31 --batch-size 10000
+"""
+import argparse
+import time
+from datetime import date
+
+from app.database import SessionLocal
+from app.services import RecurringService
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Materialize due recurring expenses.")
+    parser.add_argument("--as-of", type=date.fromisoformat, help="Last date to materialize (default: today, UTC)")
+    parser.add_argument("--batch-size", type=int, help="Rules per transaction (default: RECURRING_BATCH_SIZE)")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        result = RecurringService.materialize(db, args.as_of, args.batch_size)
+    finally:
+        db.close()
+
+    print(
+        f"Materialized {result.expenses:,} expenses from {result.rules:,} rules "
+        f"in {time.perf_counter() - started:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
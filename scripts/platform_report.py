@@ -0,0 +1,57 @@
+"""
+Print spend across all users as JSON: per category name, per signup month
+and the top spenders.
+
+Users are aggregated in ranges of --shard-users ids on --workers processes,
+each with its own connection to ANALYTICS_DATABASE_URL (or DATABASE_URL),
+and every worker sleeps --pause seconds after each range, so the job can run
+during business hours. With --checkpoint every finished range is appended
+to a file; re-running the same command after an interruption only computes
+the ranges that are missing.
+
+Usage:
+    python -m scripts.platform_report
+    python -m scripts.platform_report --from-date 2024-01-01 --to-date 2024-12-31 --currency EUR
+    python -m scripts.platform_report --workers 4 --pause 0.5 --checkpoint platform.jsonl
+"""
+import argparse
+import sys
+import time
+from datetime import date
+
+from app.database import SessionLocal
+from app.schemas import DEFAULT_CURRENCY
+from app.services import PlatformAnalyticsService
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Aggregate spend across all users.")
+    parser.add_argument("--from-date", type=date.fromisoformat, help="Only expenses from this date")
+    parser.add_argument("--to-date", type=date.fromisoformat, help="Only expenses up to this date")
+    parser.add_argument("--currency", default=DEFAULT_CURRENCY, help="Currency all amounts are converted into")
+    parser.add_argument("--top", type=int, default=10, help="Number of top spenders")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: PLATFORM_WORKERS)")
+    parser.add_argument("--shard-users", type=int, help="User ids per shard (default: PLATFORM_SHARD_USERS)")
+    parser.add_argument("--pause", type=float, help="Seconds a worker rests after each shard (default: PLATFORM_PAUSE_SECONDS)")
+    parser.add_argument("--checkpoint", help="File recording finished shards, resumed if it exists")
+    args = parser.parse_args(argv)
+
+    def progress(completed: int, total: int) -> None:
+        print(f"{completed:,}/{total:,} shards in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        report = PlatformAnalyticsService.run(
+            db, args.from_date, args.to_date, args.currency, args.top,
+            workers=args.workers, shard_users=args.shard_users, pause=args.pause,
+            checkpoint=args.checkpoint, progress=progress
+        )
+    finally:
+        db.close()
+
+    print(report.model_dump_json(indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Recompute the category_terms table behind category suggestions.
+
+category_terms is kept up to date by the API's expense writes. Run this once
+after upgrading to the auto-categorization migration, and after loading
+expenses with tools that write to the database directly (such as
+scripts.generate_data). Each user is rebuilt and committed separately.
+
+Usage:
+    python -m scripts.rebuild_category_terms
+    python -m scripts.rebuild_category_terms --user-id 42
+"""
+import argparse
+import time
+
+from app.database import SessionLocal
+from app.models import User
+from app.services import CategorizerService, DataVersionService
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Rebuild per-user category suggestion models.")
+    parser.add_argument("--user-id", type=int, action="append", help="Only rebuild these users")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        query = db.query(User.id).order_by(User.id)
+        if args.user_id:
+            query = query.filter(User.id.in_(args.user_id))
+        user_ids = [user_id for user_id, in query]
+
+        for user_id in user_ids:
+            CategorizerService.rebuild(db, user_id)
+            DataVersionService.bump(db, user_id)
+            db.commit()
+    finally:
+        db.close()
+
+    print(f"Rebuilt category models for {len(user_ids):,} users in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Recompute the monthly_spend table that backs budget status.
+
+monthly_spend is kept up to date by the API's expense writes. Run this once
+after upgrading to the budgets migration, and after loading expenses with
+tools that write to the database directly (such as scripts.generate_data).
+Each user is rebuilt and committed separately.
+
+Usage:
+    python -m scripts.rebuild_monthly_spend
+    python -m scripts.rebuild_monthly_spend --user-id 42
+"""
+import argparse
+import time
+
+from app.database import SessionLocal
+from app.models import User
+from app.services import ArchiveService, BudgetService
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Rebuild per-user monthly spend totals.")
+    parser.add_argument("--user-id", type=int, action="append", help="Only rebuild these users")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        query = db.query(User.id, User.base_currency).order_by(User.id)
+        if args.user_id:
+            query = query.filter(User.id.in_(args.user_id))
+        users = query.all()
+
+        for user_id, base_currency in users:
+            BudgetService.rebuild_monthly_spend(
+                db, user_id, base_currency, ArchiveService.get_daily_totals(user_id)
+            )
+            db.commit()
+    finally:
+        db.close()
+
+    print(f"Rebuilt monthly spend for {len(users):,} users in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
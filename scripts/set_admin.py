@@ -0,0 +1,36 @@
+"""
+Grant or revoke administrator access, which the /admin endpoints require.
+
+Usage:
+    python -m scripts.set_admin finance@example.com
+    python -m scripts.set_admin finance@example.com --revoke
+"""
+import argparse
+import sys
+
+from app.database import SessionLocal
+from app.models import User
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Grant or revoke administrator access.")
+    parser.add_argument("email", help="Email of the user")
+    parser.add_argument("--revoke", action="store_true", help="Revoke instead of granting")
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        updated = db.query(User).filter(User.email == args.email).update(
+            {User.is_admin: not args.revoke}, synchronize_session=False
+        )
+        db.commit()
+    finally:
+        db.close()
+
+    if not updated:
+        sys.exit(f"No user with email {args.email}")
+    print(f"{'Revoked' if args.revoke else 'Granted'} administrator access for {args.email}")
+
+
+if __name__ == "__main__":
+    main()